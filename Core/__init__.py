@@ -6,9 +6,31 @@ including leaderboard management, member compilation,
 and ticketing features.
 """
 
-# Import core modules to make them available when importing the package
-from .leaderboard import *
-from .compile_members import *
-from .ticketing import *
+import importlib
+
+# Submodules load on first attribute access (PEP 562) instead of at package
+# import, so `import Core` stays cheap and nothing touches cache files until
+# the bot actually needs them.
+_SUBMODULES = (
+    "persistence", "rank_index", "render_cache", "storage", "windows", "leaderboard",
+    "leaderboard_view", "bulk", "member_search", "member_records", "compile_members", "member_search_view",
+    "warmup", "ticket_expiry", "ticket_store", "ticket_queue",
+    "ticket_categories", "ticket_archive", "ticketing"
+)
+# the modules `Core` used to star-import; their public names still resolve on the package
+_LEGACY_EXPORTS = ("leaderboard", "compile_members", "ticketing")
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    # private and dunder probes (copy, pickle, pytest, ...) never import anything
+    if not name.startswith("_"):
+        for module_name in _LEGACY_EXPORTS:
+            module = importlib.import_module(f".{module_name}", __name__)
+            if hasattr(module, name):
+                return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __version__ = "1.0.0"
\ No newline at end of file
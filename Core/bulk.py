@@ -0,0 +1,146 @@
+"""
+Bulk win import/export for the leaderboard.
+Imports stream a CSV or JSONL attachment line by line (user_id, delta),
+validate every row, and only then apply the whole batch. Exports write
+the board to a temp file in rank-ordered chunks.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import re
+import tempfile
+from typing import AsyncIterable, Callable, Dict, List, Tuple
+
+import aiohttp
+from aiohttp import http_exceptions
+
+MAX_IMPORT_BYTES = 50 * 1024 * 1024
+MAX_REPORTED_ERRORS = 10
+EXPORT_CHUNK = 1000
+_INTEGER = re.compile(r"[+-]?[0-9]+")
+
+
+class LineTooLong(ValueError):
+    """An attachment line did not fit aiohttp's read buffer."""
+
+
+# what aiohttp raises for such a line: ValueError("Line is too long") in older
+# releases, http_exceptions.LineTooLong in newer ones
+_AIOHTTP_LINE_TOO_LONG = (ValueError, http_exceptions.LineTooLong)
+
+
+class ImportResult:
+    """Aggregated deltas plus any validation errors from one import file."""
+
+    def __init__(self):
+        self.deltas: Dict[int, int] = {}
+        self.rows = 0
+        self.error_count = 0
+        self.errors: List[str] = []
+
+    def error(self, line_no: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line_no}: {message}")
+
+
+def _parse_line(line: str, fmt: str) -> Tuple[str, str]:
+    if fmt == "jsonl":
+        row = json.loads(line)
+        if not isinstance(row, dict):
+            raise ValueError("expected a JSON object")
+        return row.get("user_id"), row.get("delta")
+    cols = next(csv.reader([line]))
+    if len(cols) != 2:
+        raise ValueError(f"expected 2 columns, got {len(cols)}")
+    return cols[0], cols[1]
+
+
+def _to_int(value, field: str) -> int:
+    """A JSON integer or a base-10 integer string; floats and anything else are rejected, not truncated."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and _INTEGER.fullmatch(value.strip()):
+        return int(value)
+    raise ValueError(f"{field} must be an integer, got {value!r}")
+
+
+async def parse_deltas(lines: AsyncIterable[bytes], fmt: str, is_known: Callable[[int], bool]) -> ImportResult:
+    """Stream ``user_id, delta`` rows, summing deltas per user.
+
+    Memory grows with the number of distinct users, not with the file.
+    A CSV header row is skipped. ``is_known`` rejects ids that are neither
+    guild members nor already on the board.
+    """
+    result = ImportResult()
+    line_no = 0
+    try:
+        async for raw in lines:
+            line_no += 1
+            line = raw.decode("utf-8-sig").strip()
+            if not line:
+                continue
+            try:
+                user_id, delta = _parse_line(line, fmt)
+                if fmt == "csv" and line_no == 1 and not str(user_id).strip().isdigit():
+                    continue  # header
+                user_id, delta = _to_int(user_id, "user_id"), _to_int(delta, "delta")
+            except (ValueError, TypeError) as e:
+                result.error(line_no, str(e) or "invalid row")
+                continue
+            if not is_known(user_id):
+                result.error(line_no, f"unknown member {user_id}")
+                continue
+            result.rows += 1
+            result.deltas[user_id] = result.deltas.get(user_id, 0) + delta
+            if line_no % 5000 == 0:
+                await asyncio.sleep(0)  # let the gateway breathe on big files
+    except LineTooLong:
+        # the rest of the stream cannot be split into lines reliably; stop here
+        result.error(line_no + 1, "line is too long")
+    return result
+
+
+async def stream_attachment_lines(url: str) -> AsyncIterable[bytes]:
+    """Yield an attachment's lines as they download; raises LineTooLong for an oversized line."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            try:
+                async for line in resp.content:
+                    yield line
+            except _AIOHTTP_LINE_TOO_LONG as e:
+                raise LineTooLong(str(e)) from e
+
+
+async def export_board(board, fmt: str = "csv"):
+    """Write ``rank, user_id, display_name, wins`` rows to a temp file and return it (rewound).
+
+    Rows come from the rank index one chunk at a time, yielding to the
+    loop in between, so the full sorted board is never built in memory.
+    """
+    out = tempfile.TemporaryFile(mode="w+b")
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    if fmt == "csv":
+        writer.writerow(["rank", "user_id", "display_name", "wins"])
+    start = 0
+    while True:
+        chunk = board.get_ranked(start, start + EXPORT_CHUNK)
+        if not chunk:
+            break
+        for rank, user_id, entry in chunk:
+            if fmt == "jsonl":
+                text.write(json.dumps({
+                    "rank": rank, "user_id": user_id, "display_name": entry["display_name"], "wins": entry["wins"]
+                }, ensure_ascii=False) + "\n")
+            else:
+                writer.writerow([rank, user_id, entry["display_name"], entry["wins"]])
+        start += EXPORT_CHUNK
+        await asyncio.sleep(0)
+    text.flush()
+    text.detach()
+    out.seek(0)
+    return out
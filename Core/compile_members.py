@@ -1,118 +1,318 @@
 """
 Member compilation and caching system for the Discord bot.
-Handles member intents, caching, and member management with JSON persistence.
+Handles member intents, caching, and member management with pluggable
+persistence (cache/members.ndjson by default, SQLite optionally).
 """
 
+import asyncio
+import time
 import discord
-import json
-import os
-from typing import Dict, Optional, List
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime
 
-CACHE_FILE = "cache/members.json"
+from .member_records import MemberDetails, MemberRecord, MemberView, RoleTable, record_size, table_size, to_timestamp
+from .member_search import PrefixIndex, TrigramIndex, normalize
+from .persistence import WriteBehind
+from .storage import MemberStore, get_member_store
 
 # Admin IDs (id you wanna add check the members.json)
 ADMIN_IDS = {696585146782187625,316595648738623488}
 
+# member events arrive in bursts (role sync, mass joins); coalesce their writes
+MEMBER_SAVE_DELAY = 5.0
+
+# members processed between yields to the event loop while compiling a guild
+MEMBER_CHUNK = 1000
+# minimum seconds between progress callbacks (each one edits a Discord message)
+PROGRESS_INTERVAL = 2.0
+
 class MemberCache:
     """Handles member caching and management for the Discord bot."""
 
-    def __init__(self):
-        self.members_dict: Dict[int, str] = {}
-        self.member_details: Dict[int, dict] = {}
+    def __init__(self, store: Optional[MemberStore] = None):
+        self._records: Dict[int, MemberRecord] = {}
+        self._roles = RoleTable()
+        self.member_details = MemberDetails(self._records, self._roles)
         self.last_updated: Optional[str] = None
-
-    def add_member(self, member: discord.Member) -> None:
+        self._store = store or get_member_store()
+        self._search = TrigramIndex()
+        self._prefix = PrefixIndex()  # autocomplete
+        self._role_members: Dict[str, Set[int]] = {}  # role name -> member ids
+        self._admins: Set[int] = set(ADMIN_IDS)
+        self._record_bytes = 0  # running sum of record_size() over _records
+        self._dirty: Set[int] = set()  # ids added, changed or removed since the last write
+        self._removed_while_loading: Optional[Set[int]] = None  # set only during load_cache_async
+        self._writer = WriteBehind(self._take_changes, self._write_changes, delay=MEMBER_SAVE_DELAY)
+
+    def _put(self, record: MemberRecord) -> None:
+        previous = self._records.get(record.id)
+        if previous is not None:
+            self._unindex(previous)
+            self._record_bytes -= record_size(previous)
+        self._records[record.id] = record
+        self._record_bytes += record_size(record)
+        self._index(record)
+
+    def _index(self, record: MemberRecord) -> None:
+        self._search.add(record.id, (record.name, record.display_name, record.nick))
+        self._prefix.add(record.id, (record.name, record.display_name, record.nick))
+        for role in self._roles.names_of(record.role_ids):
+            self._role_members.setdefault(role, set()).add(record.id)
+            if role == "Admin":
+                self._admins.add(record.id)
+
+    def _unindex(self, record: MemberRecord) -> None:
+        self._prefix.remove(record.id, (record.name, record.display_name, record.nick))
+        for role in self._roles.names_of(record.role_ids):
+            ids = self._role_members.get(role)
+            if ids is not None:
+                ids.discard(record.id)
+                if not ids:
+                    del self._role_members[role]
+        if record.id not in ADMIN_IDS:
+            self._admins.discard(record.id)
+
+    def _view(self, record: MemberRecord) -> MemberView:
+        return MemberView(record, self._roles)
+
+    def _mark_dirty(self, member_id: int) -> None:
+        self._dirty.add(member_id)
+        self._writer.mark_dirty()
+
+    def add_member(self, member: discord.Member) -> bool:
+        """Add or refresh a member; returns False if nothing changed."""
         roles = [role.name for role in member.roles if role.name != "@everyone"]
 
         # Force admin role if member ID matches ADMIN_IDS
         if member.id in ADMIN_IDS and "Admin" not in roles:
             roles.append("Admin")
 
-        self.members_dict[member.id] = member.name
-        self.member_details[member.id] = {
-            'id': member.id,
-            'name': member.name,
-            'display_name': member.display_name,
-            'discriminator': member.discriminator,
-            'nick': member.nick,
-            'joined_at': str(member.joined_at) if member.joined_at else None,
-            'created_at': str(member.created_at),
-            'roles': roles,
-            'is_bot': member.bot,
-            'status': str(member.status) if hasattr(member, 'status') else 'unknown'
-        }
+        record = MemberRecord(
+            member.id,
+            member.name,
+            member.display_name,
+            member.discriminator,
+            member.nick,
+            to_timestamp(member.joined_at),
+            to_timestamp(member.created_at),
+            self._roles.intern(roles),
+            member.bot,
+            str(member.status) if hasattr(member, 'status') else 'unknown'
+        )
+        if self._records.get(member.id) == record:
+            return False
+        self._put(record)
+        self._mark_dirty(member.id)
+        return True
 
     def remove_member(self, member_id: int) -> None:
-        self.members_dict.pop(member_id, None)
-        self.member_details.pop(member_id, None)
-
-    def update_member(self, member: discord.Member) -> None:
-        self.add_member(member)
+        record = self._records.pop(member_id, None)
+        if record is not None:
+            self._unindex(record)
+            self._record_bytes -= record_size(record)
+            self._mark_dirty(member_id)
+        self._search.remove(member_id)
+        if self._removed_while_loading is not None:
+            self._removed_while_loading.add(member_id)
+
+    def update_member(self, member: discord.Member) -> bool:
+        return self.add_member(member)
+
+    def remove_missing(self, seen: Set[int], still_present: Callable[[int], bool]) -> int:
+        """Drop cached members outside ``seen`` that ``still_present`` does not vouch for.
+
+        The second check spares members who joined after a reconciliation
+        pass walked past their guild.
+        """
+        gone = [mid for mid in self._records if mid not in seen and not still_present(mid)]
+        for member_id in gone:
+            self.remove_member(member_id)
+        return len(gone)
 
     def get_member_name(self, member_id: int) -> Optional[str]:
-        return self.members_dict.get(member_id)
+        record = self._records.get(member_id)
+        return record.name if record else None
 
-    def get_member_details(self, member_id: int) -> Optional[dict]:
-        return self.member_details.get(member_id)
+    def get_member_details(self, member_id: int) -> Optional[MemberView]:
+        record = self._records.get(member_id)
+        return self._view(record) if record else None
 
     def get_all_members(self) -> Dict[int, str]:
-        return self.members_dict.copy()
+        return {member_id: record.name for member_id, record in self._records.items()}
 
     def get_member_count(self) -> int:
-        return len(self.members_dict)
-
-    def search_members(self, query: str) -> List[dict]:
-        results = []
-        query_lower = query.lower()
-        for details in self.member_details.values():
-            if (query_lower in details['name'].lower()
-                or query_lower in details['display_name'].lower()
-                or (details['nick'] and query_lower in details['nick'].lower())):
-                results.append(details)
-        return results
-
-    def get_members_by_role(self, role_name: str) -> List[dict]:
-        return [
-            details for details in self.member_details.values()
-            if role_name in details['roles']
-        ]
+        return len(self._records)
+
+    def search_members(self, query: str, limit: Optional[int] = 25) -> List[MemberView]:
+        """Substring search over name, display name and nick.
+
+        Ranked exact match, then prefix, then substring; capped to ``limit``.
+        """
+        return [self._view(self._records[mid]) for mid in self._search.search(query, limit)]
+
+    def fuzzy_search_members(self, query: str, limit: int = 25) -> List[Tuple[MemberView, float]]:
+        """Typo-tolerant search: up to ``limit`` (details, score) pairs, best first.
+
+        Scores are 1.0 for an exact name, 0.6-1.0 for substrings and trigram
+        similarity otherwise.
+        """
+        return [(self._view(self._records[mid]), score) for mid, score in self._search.fuzzy(query, limit)]
+
+    def complete_members(self, prefix: str, limit: int = 25) -> List[MemberView]:
+        """Members whose name, display name or nick starts with ``prefix`` (for autocomplete)."""
+        return [self._view(self._records[mid]) for mid in self._prefix.complete(prefix, limit)]
+
+    def complete_roles(self, prefix: str, limit: int = 25) -> List[str]:
+        prefix = normalize(prefix)
+        return [role for role in sorted(self._role_members) if normalize(role).startswith(prefix)][:limit]
+
+    def get_members_by_role(self, role_name: str) -> List[MemberView]:
+        return [self._view(self._records[mid]) for mid in self._role_members.get(role_name, ())]
+
+    def get_member_ids_by_role(self, role_name: str) -> Set[int]:
+        return set(self._role_members.get(role_name, ()))
+
+    def get_roles(self) -> Dict[str, int]:
+        """Role name -> number of cached members holding it."""
+        return {role: len(ids) for role, ids in self._role_members.items()}
+
+    def query_roles(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+                    none_of: Iterable[str] = ()) -> List[MemberView]:
+        """Members holding every role in ``all_of``, at least one of ``any_of``
+        (if given) and none of ``none_of``.
+
+        e.g. ``query_roles(all_of=["Contestant"], none_of=["Finalist"])``.
+        Cost follows the size of the role sets involved, not the member count.
+        """
+        all_of, any_of = list(all_of), list(any_of)
+        if all_of:
+            sets = sorted((self._role_members.get(r, set()) for r in all_of), key=len)
+            ids = set(sets[0]).intersection(*sets[1:])
+        elif any_of:
+            ids = set()
+        else:
+            ids = set(self._records)
+        if any_of:
+            either = set().union(*(self._role_members.get(r, ()) for r in any_of))
+            ids = ids & either if all_of else either
+        for role in none_of:
+            ids -= self._role_members.get(role, set())
+        return [self._view(self._records[mid]) for mid in ids]
+
+    def is_admin(self, member_id: int) -> bool:
+        return member_id in self._admins
 
     def clear_cache(self) -> None:
-        self.members_dict.clear()
-        self.member_details.clear()
+        self._records.clear()
+        self._roles.clear()
+        self._search.clear()
+        self._prefix.clear()
+        self._role_members.clear()
+        self._admins = set(ADMIN_IDS)
+        self._record_bytes = 0
+        self._dirty.clear()
         self.last_updated = None
 
     def update_timestamp(self) -> None:
         self.last_updated = datetime.now().isoformat()
 
     def get_cache_info(self) -> dict:
+        size = self._record_bytes + table_size(self._records, self._roles)
         return {
             'member_count': self.get_member_count(),
             'last_updated': self.last_updated,
-            'cache_size_mb': len(str(self.member_details)) / (1024 * 1024)
+            'cache_size_mb': size / (1024 * 1024),
+            'bytes_per_member': size // len(self._records) if self._records else 0,
+            'distinct_roles': len(self._roles.names)
         }
 
     # ----------------
     # persistence
     # ----------------
+    def _take_changes(self) -> Tuple[List[dict], List[int], Optional[str]]:
+        upserts, deleted = [], []
+        for member_id in self._dirty:
+            record = self._records.get(member_id)
+            if record is None:
+                deleted.append(member_id)
+            else:
+                upserts.append(self._view(record).to_dict())
+        self._dirty.clear()
+        if upserts or deleted:
+            self.update_timestamp()
+        return upserts, deleted, self.last_updated
+
+    def _write_changes(self, changes: Tuple[List[dict], List[int], Optional[str]]) -> None:
+        upserts, deleted, last_updated = changes
+        if upserts or deleted:
+            self._store.save_changes(upserts, deleted, last_updated)
+
+    async def flush(self) -> None:
+        """Write pending member changes now (off the event loop)."""
+        await self._writer.flush()
+
+    def flush_sync(self) -> None:
+        self._writer.flush_sync()
+
+    def _write_snapshot(self, records: List[MemberRecord], last_updated: Optional[str]) -> None:
+        self._store.save_all([self._view(r).to_dict() for r in records], last_updated)
+
     def save_cache_to_file(self):
-        os.makedirs("cache", exist_ok=True)
-        data = {
-            "members_dict": {str(k): v for k, v in self.members_dict.items()},
-            "member_details": {str(k): v for k, v in self.member_details.items()},
-            "last_updated": self.last_updated
-        }
-        with open(CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        """Write a full snapshot; pending changes are folded in."""
+        self._dirty.clear()
+        self._write_snapshot(list(self._records.values()), self.last_updated)
+
+    async def save_cache_in_background(self) -> None:
+        """Like save_cache_to_file, but serialization and the write run on a worker thread."""
+        # records are replaced, never mutated, so the list is a consistent snapshot
+        self._dirty.clear()
+        records = list(self._records.values())
+        await asyncio.get_running_loop().run_in_executor(None, self._write_snapshot, records, self.last_updated)
 
     def load_cache_from_file(self):
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.members_dict = {int(k): v for k, v in data.get("members_dict", {}).items()}
-                self.member_details = {int(k): v for k, v in data.get("member_details", {}).items()}
-                self.last_updated = data.get("last_updated")
+        details, last_updated = self._store.load()
+        self.clear_cache()
+        for d in details:
+            self._put(MemberRecord.from_details(d, self._roles))
+        self.last_updated = last_updated
+
+    async def load_cache_async(self, chunk_size: int = MEMBER_CHUNK) -> Tuple[float, float]:
+        """Startup load that yields to the loop every ``chunk_size`` members.
+
+        Records are loaded first, then indexed in a second pass. Members
+        added, changed or removed by gateway events while this runs are
+        newer than the snapshot, so their snapshot rows are skipped. Returns
+        the seconds spent on (file load, index build).
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self.clear_cache()
+        # the map starts empty: anything in it before its row is read came from an event
+        # (_dirty is no use here, a write-behind flush clears it mid-load)
+        self._removed_while_loading = removed = set()
+        try:
+            # opening the snapshot replays the change log; keep that off the loop
+            details, last_updated = await loop.run_in_executor(None, self._store.load)
+            loaded_records: List[MemberRecord] = []
+            for n, d in enumerate(details, 1):
+                if d["id"] not in self._records and d["id"] not in removed:
+                    record = MemberRecord.from_details(d, self._roles)
+                    self._records[record.id] = record
+                    self._record_bytes += record_size(record)
+                    loaded_records.append(record)
+                if n % chunk_size == 0:
+                    await asyncio.sleep(0)
+            self.last_updated = self.last_updated or last_updated
+            loaded = time.perf_counter()
+
+            for n, record in enumerate(loaded_records, 1):
+                if self._records.get(record.id) is record:  # not replaced or removed by an event meanwhile
+                    self._index(record)
+                if n % chunk_size == 0:
+                    await asyncio.sleep(0)
+        finally:
+            self._removed_while_loading = None
+        return loaded - started, time.perf_counter() - loaded
 
 
 # Global instance
@@ -131,22 +331,112 @@ def setup_member_intents() -> discord.Intents:
     return intents
 
 
-async def cache_guild_members(guild: discord.Guild) -> None:
-    print(f"Caching members from {guild.name}...")
-    for member in guild.members:
-        member_cache.add_member(member)
-    member_cache.update_timestamp()
-    member_cache.save_cache_to_file()
-    print(f"✅ Cached {member_cache.get_member_count()} members from {guild.name}")
+def setup_member_listeners(bot) -> None:
+    """Keep the member cache current from gateway events instead of full rebuilds."""
 
+    async def on_member_join(member: discord.Member):
+        member_cache.add_member(member)
 
-async def cache_all_guilds_members(bot) -> None:
-    print("Starting member cache process...")
-    member_cache.clear_cache()
-    for guild in bot.guilds:
-        await cache_guild_members(guild)
-    print(f"✅ Member caching complete! Total: {member_cache.get_member_count()}")
+    async def on_member_update(before: discord.Member, after: discord.Member):
+        member_cache.add_member(after)
+
+    async def on_member_remove(member: discord.Member):
+        # one cache serves every guild; keep members that are still in another one
+        for guild in bot.guilds:
+            other = guild.get_member(member.id) if guild.id != member.guild.id else None
+            if other is not None:
+                member_cache.add_member(other)
+                return
+        member_cache.remove_member(member.id)
+
+    async def on_user_update(before: discord.User, after: discord.User):
+        # username changes arrive per user, not per guild member
+        for guild in bot.guilds:
+            member = guild.get_member(after.id)
+            if member is not None:
+                member_cache.add_member(member)
+                return
+
+    for listener in (on_member_join, on_member_update, on_member_remove, on_user_update):
+        bot.add_listener(listener)
+
+
+# progress(guild_index, guild_count, guild_name, members_done, members_total, members_per_sec)
+Progress = Callable[[int, int, str, int, int, float], Awaitable[None]]
+
+
+class _Compile:
+    """Counters for one compile pass, plus throttled progress reporting."""
+
+    def __init__(self, progress: Optional[Progress], guild_count: int):
+        self.progress = progress
+        self.guild_count = guild_count
+        self.seen: Set[int] = set()
+        self.added = self.updated = 0
+        self.started = time.perf_counter()
+        self._last_report = 0.0
+
+    async def report(self, index: int, guild: discord.Guild, done: int, force: bool = False) -> None:
+        now = time.perf_counter()
+        if self.progress is None or (not force and now - self._last_report < PROGRESS_INTERVAL):
+            return
+        self._last_report = now
+        rate = len(self.seen) / max(now - self.started, 1e-6)
+        try:
+            await self.progress(index, self.guild_count, guild.name, done, guild.member_count or done, rate)
+        except Exception as e:
+            print(f"⚠️ Progress update failed: {e}")
+
+
+async def _compile_guild(guild: discord.Guild, index: int, run: _Compile) -> None:
+    """Add or refresh one guild's members, yielding to the loop every MEMBER_CHUNK members."""
+    print(f"Caching members from {guild.name}...")
+    members = guild.members
+    for start in range(0, len(members), MEMBER_CHUNK):
+        for member in members[start:start + MEMBER_CHUNK]:
+            if member.id in run.seen:
+                continue  # already compiled from an earlier guild (first guild wins)
+            run.seen.add(member.id)
+            existed = member_cache.get_member_name(member.id) is not None
+            if member_cache.add_member(member):
+                if existed:
+                    run.updated += 1
+                else:
+                    run.added += 1
+        await asyncio.sleep(0)  # let heartbeats and other commands run
+        await run.report(index, guild, min(start + MEMBER_CHUNK, len(members)))
+    await run.report(index, guild, len(members), force=True)
+    print(f"✅ Cached {len(members)} members from {guild.name}")
+
+
+async def cache_guild_members(guild: discord.Guild, progress: Optional[Progress] = None) -> None:
+    """Add or refresh one guild's members (no removals; see cache_all_guilds_members)."""
+    await _compile_guild(guild, 1, _Compile(progress, 1))
+    await member_cache.flush()
+
+
+async def cache_all_guilds_members(bot, progress: Optional[Progress] = None) -> Tuple[int, int, int]:
+    """Reconcile the cache with every guild's live member list.
+
+    Gateway listeners keep the cache current, so this is a rare repair pass:
+    it diffs in chunks instead of wiping, then writes one snapshot (on a
+    worker thread) that compacts the change log. Returns (added, updated, removed).
+    """
+    print("Starting member reconciliation...")
+    guilds = list(bot.guilds)
+    run = _Compile(progress, len(guilds))
+    for index, guild in enumerate(guilds, 1):
+        await _compile_guild(guild, index, run)
+    removed = member_cache.remove_missing(
+        run.seen, lambda mid: any(g.get_member(mid) is not None for g in guilds)
+    )
+    member_cache.update_timestamp()
+    await member_cache.save_cache_in_background()
+    elapsed = time.perf_counter() - run.started
+    print(f"✅ Member reconciliation complete! Total: {member_cache.get_member_count()} "
+          f"(+{run.added} / ~{run.updated} / -{removed}) in {elapsed:.1f}s")
     print("Cache info:", member_cache.get_cache_info())
+    return run.added, run.updated, removed
 
 
 def load_cache_from_file():
@@ -155,8 +445,5 @@ def load_cache_from_file():
 
 def is_admin(user_id: int) -> bool:
     """Check if a member should be treated as admin."""
-    details = member_cache.get_member_details(user_id)
-    if not details:
-        return user_id in ADMIN_IDS
-    # Treat as admin if role list contains "Admin" OR member is in hardcoded ADMIN_IDS
-    return (user_id in ADMIN_IDS) or ("Admin" in details.get("roles", []))
\ No newline at end of file
+    # Admin set holds ADMIN_IDS plus every cached member with the "Admin" role
+    return member_cache.is_admin(user_id)
\ No newline at end of file
@@ -1,74 +1,290 @@
 """
 Leaderboard system for the Discord bot.
-Tracks wins, ranks, and persists data in JSON.
+Tracks wins and ranks per guild (all-time, rolling week/month and named
+seasons via per-day buckets), and persists each guild's table through a
+pluggable store (JSON snapshot + change log by default, SQLite optionally).
 Also can cache all human members from the server automatically.
 """
 
-import json
-import os
-from typing import Dict, Optional, List
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, List, Set, Tuple
 from datetime import datetime
 import discord
 
-LEADERBOARD_FILE = "cache/leaderboard.json"
+from .rank_index import RankIndex
+from .windows import BUCKET_RETENTION_DAYS, ROLLING_WINDOWS, DailyBuckets, WindowBoard, today
+from .storage import (
+    LEADERBOARD_FILE, LEADERBOARD_LOG_DIR, JsonLeaderboardStore, LeaderboardStore, get_leaderboard_store
+)
+
+# how many guild tables stay in memory, and how long an unused one may linger
+MAX_LOADED_GUILDS = 32
+GUILD_IDLE_SECONDS = 30 * 60
+
+# shared across guilds so a reloaded table never reuses an old version number
+_versions = itertools.count(1)
+
+
+class BoardClosedError(RuntimeError):
+    """A change was made to a table that GuildLeaderboards has already evicted."""
 
 
 class Leaderboard:
-    def __init__(self):
+    """One guild's scores."""
+
+    def __init__(self, store: LeaderboardStore):
         self.scores: Dict[int, dict] = {}  # {user_id: {"display_name": str, "wins": int}}
         self.last_updated: Optional[str] = None
+        self._index = RankIndex()  # kept in step with self.scores by every mutation
+        self.version = next(_versions)  # bumped by every mutation; keys render caches
+        self.daily: DailyBuckets = {}
+        self.seasons: Dict[str, list] = {}  # {name: [start_day, end_day or None]}
+        self._windows: Dict[str, WindowBoard] = {}  # built on first query, then kept in step
+        self._day = today()
+        self.closed = False  # set on eviction; a fresh table is loaded on the next lookup
+        self._store = store
+        self._store.bind(lambda: {
+            "scores": self.scores,
+            "last_updated": self.last_updated,
+            "daily": self.daily,
+            "seasons": self.seasons
+        })
         self.load_from_file()
 
     # ----------------
     # core operations
     # ----------------
+    def _check_open(self) -> None:
+        # writes to an evicted table would reach the log but not the table the next lookup loads;
+        # checked before anything is changed, since the eviction flush still snapshots this table
+        if self.closed:
+            raise BoardClosedError("leaderboard was evicted; fetch the guild's table again")
+
+    def _record(self, op: str, user_id: int, actor_id: Optional[int] = None, delta: int = 0) -> None:
+        """Index and record the current state of ``user_id`` (call store.touch after)."""
+        self._check_open()
+        self._apply(user_id, delta)
+        self._store.record(op, user_id, self.scores[user_id], actor_id, delta)
+
+    def _apply(self, user_id: int, delta: int = 0) -> None:
+        """Bring the rank index, day buckets and windows in line with ``user_id``'s entry."""
+        entry = self.scores[user_id]
+        self._index.set(user_id, entry["wins"])
+        if delta:
+            day = self._roll()
+            bucket = self.daily.setdefault(day, {})
+            bucket[user_id] = bucket.get(user_id, 0) + delta
+            for window in self._windows.values():
+                window.apply(day, user_id, delta)
+        self.version = next(_versions)
+
     def ensure_member(self, user_id: int, display_name: str) -> None:
         """Make sure a member exists in the leaderboard with 0 wins."""
+        self._check_open()
         if user_id not in self.scores:
             self.scores[user_id] = {"display_name": display_name, "wins": 0}
-            self.save_to_file()
+            self._record("join", user_id)
+            self._store.touch()
 
-    def add_win(self, user_id: int, display_name: str) -> None:
+    def ensure_members(self, members: Iterable[Tuple[int, str]]) -> int:
+        """Bulk version of ensure_member: apply every change, then persist once.
+
+        Existing entries keep their wins; their display name is refreshed.
+        Returns the number of members that were added.
+        """
+        self._check_open()
+        added = 0
+        changed = False
+        for user_id, display_name in members:
+            entry = self.scores.get(user_id)
+            if entry is None:
+                self.scores[user_id] = {"display_name": display_name, "wins": 0}
+                self._record("join", user_id)
+                added += 1
+                changed = True
+            elif entry["display_name"] != display_name:
+                entry["display_name"] = display_name
+                self._record("rename", user_id)
+                changed = True
+        if changed:
+            self._store.touch()
+        return added
+
+    def import_scores(self, scores: Dict[int, dict]) -> None:
+        """Copy ``{user_id: {"display_name", "wins"}}`` entries in, then persist once."""
+        self._check_open()
+        for user_id, entry in scores.items():
+            self.scores[user_id] = {"display_name": entry["display_name"], "wins": entry["wins"]}
+            self._record("import", user_id)
+        if scores:
+            self._store.touch()
+
+    def apply_deltas(self, deltas: Dict[int, int], names: Dict[int, str], actor_id: Optional[int] = None) -> int:
+        """Apply ``{user_id: delta}`` as one batch, then persist once.
+
+        Wins never go below 0. ``names`` supplies display names for users
+        not on the board yet. Returns the number of users changed.
+        """
+        self._check_open()
+        changes = []
+        for user_id, delta in deltas.items():
+            entry = self.scores.get(user_id)
+            if entry is None:
+                entry = self.scores[user_id] = {"display_name": names.get(user_id, str(user_id)), "wins": 0}
+            old = entry["wins"]
+            entry["wins"] = max(0, old + delta)
+            self._apply(user_id, entry["wins"] - old)
+            changes.append((user_id, entry, entry["wins"] - old))
+        if changes:
+            self._store.record_batch("bulk", changes, actor_id)
+            self._store.touch()
+        return len(changes)
+
+    def add_win(self, user_id: int, display_name: str, actor_id: Optional[int] = None) -> None:
         """Increase a user's wins by 1 (or create if missing)."""
+        self._check_open()
         self.ensure_member(user_id, display_name)
         self.scores[user_id]["wins"] += 1
-        self.save_to_file()
+        self._record("add", user_id, actor_id, delta=1)
+        self._store.touch()
 
-    def subtract_win(self, user_id: int, display_name: str) -> None:
+    def subtract_win(self, user_id: int, display_name: str, actor_id: Optional[int] = None) -> None:
         """Decrease a user's wins by 1, but not below 0."""
+        self._check_open()
         self.ensure_member(user_id, display_name)
         if self.scores[user_id]["wins"] > 0:
             self.scores[user_id]["wins"] -= 1
-            self.save_to_file()
+            self._record("sub", user_id, actor_id, delta=-1)
+            self._store.touch()
 
-    def set_wins(self, user_id: int, display_name: str, wins: int) -> None:
+    def set_wins(self, user_id: int, display_name: str, wins: int, actor_id: Optional[int] = None) -> None:
         """Set exact wins for a user."""
+        self._check_open()
         self.ensure_member(user_id, display_name)
+        old = self.scores[user_id]["wins"]
         self.scores[user_id]["wins"] = max(0, wins)
-        self.save_to_file()
+        self._record("set", user_id, actor_id, delta=self.scores[user_id]["wins"] - old)
+        self._store.touch()
 
     def get_member_stats(self, user_id: int) -> Optional[dict]:
         """Return stats for a member."""
         return self.scores.get(user_id)
 
-    def get_leaderboard(self, top_n: int = 10) -> List[dict]:
-        """Return the top N members sorted by wins."""
-        return sorted(
-            self.scores.values(),
-            key=lambda x: x["wins"],
-            reverse=True
-        )[:top_n]
-
-    def get_rank(self, user_id: int) -> Optional[int]:
-        """Return the rank of a user (1 = highest wins)."""
-        sorted_scores = sorted(
-            self.scores.items(),
-            key=lambda x: x[1]["wins"],
-            reverse=True
-        )
-        for idx, (uid, _) in enumerate(sorted_scores, start=1):
-            if uid == user_id:
-                return idx
+    def get_leaderboard(self, top_n: int = 10, window: Optional[str] = None) -> List[dict]:
+        """Return the top N members sorted by wins (all-time, or within ``window``)."""
+        return [entry for _, _, entry in self.get_ranked(0, top_n, window)]
+
+    def get_ranked(self, start: int, stop: int, window: Optional[str] = None) -> List[Tuple[int, int, dict]]:
+        """Return ``(rank, user_id, entry)`` for board positions ``start``..``stop - 1`` (0-based)."""
+        if window is None:
+            return [(rank, uid, self.scores[uid]) for rank, uid, _ in self._index.range(start, stop)]
+        board = self.get_window(window)
+        if board is None:
+            return []
+        return [
+            (rank, uid, {"display_name": self.scores[uid]["display_name"], "wins": wins})
+            for rank, uid, wins in board.index.range(start, stop)
+        ]
+
+    def get_rank(self, user_id: int, window: Optional[str] = None) -> Optional[int]:
+        """Return the rank of a user (1 = highest wins).
+
+        Tied users share a rank (competition ranking: 1, 2, 2, 4). Within a
+        window, users without wins in it have no rank.
+        """
+        if window is None:
+            return self._index.rank(user_id)
+        board = self.get_window(window)
+        return board.index.rank(user_id) if board else None
+
+    def count(self, window: Optional[str] = None) -> int:
+        """Number of ranked members (all-time, or with wins inside ``window``)."""
+        if window is None:
+            return len(self._index)
+        board = self.get_window(window)
+        return len(board.index) if board else 0
+
+    def get_position(self, user_id: int, window: Optional[str] = None) -> Optional[int]:
+        """0-based position of a user in the board's ordering (ties broken as in get_ranked)."""
+        if window is None:
+            return self._index.position(user_id)
+        board = self.get_window(window)
+        return board.index.position(user_id) if board else None
+
+    def get_window_wins(self, user_id: int, window: str) -> int:
+        board = self.get_window(window)
+        return max(board.totals.get(user_id, 0), 0) if board else 0
+
+    # ----------------
+    # time windows
+    # ----------------
+    def _roll(self) -> int:
+        """Advance to today: drop expired buckets and slide rolling windows."""
+        day = today()
+        if day != self._day:
+            self._day = day
+            for old in [d for d in self.daily if d < day - BUCKET_RETENTION_DAYS]:
+                del self.daily[old]
+            for name, days in ROLLING_WINDOWS.items():
+                if name in self._windows:
+                    self._windows[name].slide(day - days + 1)
+            self.version = next(_versions)
+        return day
+
+    def get_window(self, name: str) -> Optional[WindowBoard]:
+        """Return the window board for "week", "month", "season" (current) or a season name."""
+        day = self._roll()
+        if name == "season":
+            name = self.current_season()
+            if name is None:
+                return None
+        board = self._windows.get(name)
+        if board is None:
+            if name in ROLLING_WINDOWS:
+                board = WindowBoard(self.daily, day - ROLLING_WINDOWS[name] + 1)
+            elif name in self.seasons:
+                start, end = self.seasons[name]
+                board = WindowBoard(self.daily, start, end)
+            else:
+                return None
+            self._windows[name] = board
+        return board
+
+    def current_season(self) -> Optional[str]:
+        """The most recently started season, if any."""
+        if not self.seasons:
+            return None
+        return max(self.seasons, key=lambda name: self.seasons[name][0])
+
+    def start_season(self, name: str) -> None:
+        """Start a season today, ending any season still open."""
+        if name in ROLLING_WINDOWS or name == "season":
+            raise ValueError(f"'{name}' is reserved")
+        self._check_open()
+        day = self._roll()
+        for other, (start, end) in self.seasons.items():
+            if end is None:
+                self.seasons[other] = [start, max(start, day - 1)]
+                self._windows.pop(other, None)
+        self.seasons[name] = [day, None]
+        self._windows.pop(name, None)
+        self.version = next(_versions)
+        self._store.touch()
+
+    def end_season(self) -> Optional[str]:
+        """End the open season today; returns its name."""
+        self._check_open()
+        day = self._roll()
+        for name, (start, end) in self.seasons.items():
+            if end is None:
+                self.seasons[name] = [start, day]
+                self._windows.pop(name, None)
+                self.version = next(_versions)
+                self._store.touch()
+                return name
         return None
 
     # ----------------
@@ -76,46 +292,172 @@ class Leaderboard:
     # ----------------
     async def cache_guild_members(self, guild: discord.Guild) -> None:
         """Add all human members in a guild to the leaderboard."""
-        count = 0
-        for member in guild.members:
-            if not member.bot:
-                self.ensure_member(member.id, member.display_name)
-                count += 1
+        self._check_open()
+        added = self.ensure_members(
+            (member.id, member.display_name) for member in guild.members if not member.bot
+        )
         self.last_updated = datetime.now().isoformat()
-        self.save_to_file()
-        print(f"✅ Cached {count} members from {guild.name}")
-
-    async def cache_all_guilds(self, bot) -> None:
-        """Add all human members from all guilds to the leaderboard."""
-        print("Starting leaderboard cache process...")
-        self.scores.clear()
-        for guild in bot.guilds:
-            await self.cache_guild_members(guild)
-        print(f"✅ Leaderboard caching complete! Total members: {len(self.scores)}")
-        print("Last updated:", self.last_updated)
+        self._store.touch()
+        print(f"✅ Cached {added} new members from {guild.name}")
 
     # ----------------
     # persistence
     # ----------------
+    async def flush(self) -> None:
+        """Persist pending changes now (off the event loop)."""
+        await self._store.flush()
+
     def save_to_file(self):
-        os.makedirs("cache", exist_ok=True)
-        data = {
-            "scores": {str(k): v for k, v in self.scores.items()},
-            "last_updated": self.last_updated
-        }
-        with open(LEADERBOARD_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        """Persist pending changes synchronously (used on shutdown)."""
+        self._store.flush_sync()
 
     def load_from_file(self):
-        if os.path.exists(LEADERBOARD_FILE):
-            with open(LEADERBOARD_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                raw = data.get("scores", {})
-                self.scores = {int(k): v for k, v in raw.items()}
-                self.last_updated = data.get("last_updated")
+        state = self._store.load()
+        self.scores, self.last_updated = state["scores"], state["last_updated"]
+        self.daily, self.seasons = state["daily"], state["seasons"]
+        for old in [d for d in self.daily if d < self._day - BUCKET_RETENTION_DAYS]:
+            del self.daily[old]
+        self._windows.clear()
+        self._index.build((uid, v["wins"]) for uid, v in self.scores.items())
+        self.version = next(_versions)
+
+    def close(self) -> None:
+        self.closed = True
+        self._store.close()
+
+
+class GuildLeaderboards:
+    """Per-guild Leaderboard tables, loaded on first use and evicted when cold.
+
+    Tables live in an LRU: at most ``max_loaded`` stay in memory, and any
+    table unused for ``idle_seconds`` is flushed and dropped on the next
+    lookup. Every change is recorded by the store as it happens, so a
+    reloaded table always reflects what an evicted one held. An evicted
+    table is closed: changes to it raise BoardClosedError, so commands that
+    await between lookup and change must look the table up again.
+    """
+
+    def __init__(self, max_loaded: int = MAX_LOADED_GUILDS, idle_seconds: float = GUILD_IDLE_SECONDS):
+        self.max_loaded = max_loaded
+        self.idle_seconds = idle_seconds
+        self._boards: "OrderedDict[int, Tuple[Leaderboard, float]]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Task] = {}
+        self._legacy: Optional[Dict[int, dict]] = None
+        self._closing: Set[asyncio.Task] = set()  # evicted tables still being flushed
+
+    def get(self, guild: discord.Guild) -> Leaderboard:
+        """Return the guild's table, loading it on the calling thread if needed.
+
+        On the event loop use ``fetch``, which loads a cold table off the loop.
+        """
+        now = time.monotonic()
+        entry = self._boards.pop(guild.id, None)
+        board = entry[0] if entry else self._load(guild)
+        self._boards[guild.id] = (board, now)
+        self._evict(now)
+        return board
+
+    async def fetch(self, guild: discord.Guild) -> Leaderboard:
+        """Return the guild's table; a cold one is parsed on a worker thread.
+
+        Concurrent fetches of the same cold guild share one load.
+        """
+        if guild.id not in self._boards:
+            loading = self._loading.get(guild.id)
+            if loading is None:
+                loading = asyncio.get_running_loop().create_task(self._load_in_background(guild))
+                self._loading[guild.id] = loading
+            # shielded: a cancelled command must not cancel a load other commands wait on
+            await asyncio.shield(loading)
+        return self.get(guild)
+
+    async def _load_in_background(self, guild: discord.Guild) -> None:
+        try:
+            board = await asyncio.get_running_loop().run_in_executor(None, self._load, guild)
+        finally:
+            self._loading.pop(guild.id, None)
+        if guild.id in self._boards:
+            board.close()  # loaded synchronously by get() meanwhile; that one wins
+        else:
+            self._boards[guild.id] = (board, time.monotonic())
+
+    def loaded(self) -> List[int]:
+        return list(self._boards)
+
+    def _load(self, guild: discord.Guild) -> Leaderboard:
+        board = Leaderboard(get_leaderboard_store(guild.id))
+        if not board.scores:
+            board.import_scores(self._legacy_scores(guild))
+        return board
+
+    def _legacy_scores(self, guild: discord.Guild) -> Dict[int, dict]:
+        """Entries of the pre-sharding global board that belong to ``guild``."""
+        if self._legacy is None:
+            store = JsonLeaderboardStore(LEADERBOARD_FILE, LEADERBOARD_LOG_DIR)
+            self._legacy = store.load()["scores"]
+            store.close()
+        return {uid: entry for uid, entry in self._legacy.items() if guild.get_member(uid) is not None}
+
+    def _evict(self, now: float) -> None:
+        while self._boards:
+            guild_id, (board, last_used) = next(iter(self._boards.items()))
+            if len(self._boards) <= self.max_loaded and now - last_used < self.idle_seconds:
+                break
+            del self._boards[guild_id]
+            self._drop(board)
+
+    def _drop(self, board: Leaderboard) -> None:
+        board.closed = True
+
+        async def _flush_and_close():
+            try:
+                await board.flush()
+            finally:
+                board.close()
+        try:
+            task = asyncio.get_running_loop().create_task(_flush_and_close())
+        except RuntimeError:
+            board.save_to_file()
+            board.close()
+            return
+        # the loop only keeps weak references to tasks
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def preload(self, guilds: Iterable[discord.Guild]) -> int:
+        """Load up to ``max_loaded`` guild tables on worker threads (startup warm-up).
+
+        Returns how many were loaded. A table a command loaded meanwhile wins.
+        """
+        loaded = 0
+        for guild in list(guilds)[:self.max_loaded]:
+            if guild.id not in self._boards:
+                await self.fetch(guild)
+                loaded += 1
+        return loaded
+
+    async def cache_all_guilds(self, bot) -> None:
+        """Merge each guild's human members into that guild's table (wins are kept)."""
+        print("Starting leaderboard cache process...")
+        total = 0
+        for guild in bot.guilds:
+            board = await self.fetch(guild)
+            await board.cache_guild_members(guild)
+            await board.flush()
+            total += len(board.scores)
+        print(f"✅ Leaderboard caching complete! Total members: {total} across {len(bot.guilds)} guilds")
+
+    async def flush(self) -> None:
+        for board, _ in list(self._boards.values()):
+            await board.flush()
+
+    def save_to_file(self):
+        """Persist every loaded table synchronously (used on shutdown)."""
+        for board, _ in self._boards.values():
+            board.save_to_file()
 
 
 # ----------------
 # global instance
 # ----------------
-leaderboard = Leaderboard()
\ No newline at end of file
+leaderboards = GuildLeaderboards()
\ No newline at end of file
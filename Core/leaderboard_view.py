@@ -0,0 +1,86 @@
+"""
+Paginated leaderboard embeds with button navigation.
+Each page is a rank-range query on the guild's board; the view only
+remembers which page it is on.
+"""
+
+import discord
+from discord.ui import View, button
+
+from .leaderboard import Leaderboard, leaderboards
+from .render_cache import leaderboard_renders
+from .windows import today
+
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 25  # Discord allows at most 25 fields per embed
+
+
+def window_title(board: Leaderboard, window) -> str:
+    if window == "season":
+        return f"Season: {board.current_season() or 'none'}"
+    return {"week": "Last 7 days", "month": "Last 30 days"}.get(window, "All time")
+
+
+def page_count(board: Leaderboard, window, page_size: int) -> int:
+    return max(1, -(-board.count(window) // page_size))
+
+
+def render_page(board: Leaderboard, guild_id: int, window, page: int, page_size: int) -> discord.Embed:
+    """Build (or reuse) the embed for one page of the board."""
+    def render():
+        rows = board.get_ranked(page * page_size, (page + 1) * page_size, window)
+        if not rows:
+            return discord.Embed(description="Leaderboard is empty.", color=discord.Color.red())
+        embed = discord.Embed(title=f"🏆 Leaderboard — {window_title(board, window)}", color=discord.Color.gold())
+        for rank, _, entry in rows:
+            embed.add_field(name=f"{rank}. {entry['display_name']}", value=f"{entry['wins']} wins", inline=False)
+        embed.set_footer(text=f"Page {page + 1}/{page_count(board, window, page_size)}")
+        return embed
+
+    # unchanged board -> same version -> reuse the embed built last time
+    key = (guild_id, page_size, page, board.version, window, today())
+    return leaderboard_renders.get_or_render(key, render)
+
+
+class LeaderboardPager(View):
+    """Prev/next/my-position buttons over one guild's board."""
+
+    def __init__(self, guild: discord.Guild, window=None, page_size: int = PAGE_SIZE, page: int = 0):
+        super().__init__(timeout=300)
+        self.guild = guild
+        self.window = window
+        self.page_size = page_size
+        self.page = page
+
+    def render(self, board: Leaderboard) -> discord.Embed:
+        pages = page_count(board, self.window, self.page_size)
+        self.page = min(max(self.page, 0), pages - 1)
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= pages - 1
+        return render_page(board, self.guild.id, self.window, self.page, self.page_size)
+
+    async def _show(self, interaction: discord.Interaction):
+        board = await leaderboards.fetch(self.guild)
+        await interaction.response.edit_message(embed=self.render(board), view=self)
+
+    @button(label="Prev", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def prev_page(self, interaction: discord.Interaction, btn: discord.ui.Button):
+        self.page -= 1
+        await self._show(interaction)
+
+    @button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, btn: discord.ui.Button):
+        self.page += 1
+        await self._show(interaction)
+
+    @button(label="My position", style=discord.ButtonStyle.primary, emoji="📍")
+    async def my_position(self, interaction: discord.Interaction, btn: discord.ui.Button):
+        position = (await leaderboards.fetch(self.guild)).get_position(interaction.user.id, self.window)
+        if position is None:
+            await interaction.response.send_message(
+                "❌ You're not on this leaderboard yet.",
+                ephemeral=True
+            )
+            return
+        self.page = position // self.page_size
+        await self._show(interaction)
@@ -0,0 +1,188 @@
+"""
+Compact member records for the member cache.
+Each member is one slotted object: role names are interned to small ids
+(and identical role combinations share one tuple), timestamps are epoch
+seconds. ``MemberView`` exposes a record through the old details-dict API.
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+DETAIL_KEYS = (
+    'id', 'name', 'display_name', 'discriminator', 'nick', 'joined_at',
+    'created_at', 'roles', 'is_bot', 'status'
+)
+
+
+def to_timestamp(value: Union[None, int, str, datetime]) -> Optional[int]:
+    """Epoch seconds from a datetime, an ISO/``str(datetime)`` string or an int."""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def from_timestamp(value: Optional[int]) -> Optional[str]:
+    if value is None:
+        return None
+    return str(datetime.fromtimestamp(value, timezone.utc))
+
+
+class RoleTable:
+    """Interns role names to small ints and role-id combinations to shared tuples."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._combos: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+
+    def intern(self, role_names: Iterable[str]) -> Tuple[int, ...]:
+        role_ids = []
+        for name in role_names:
+            role_id = self.ids.get(name)
+            if role_id is None:
+                role_id = self.ids[name] = len(self.names)
+                self.names.append(sys.intern(name))
+            role_ids.append(role_id)
+        key = tuple(role_ids)
+        return self._combos.setdefault(key, key)
+
+    def names_of(self, role_ids: Tuple[int, ...]) -> List[str]:
+        return [self.names[i] for i in role_ids]
+
+    def clear(self) -> None:
+        self.ids.clear()
+        self.names.clear()
+        self._combos.clear()
+
+
+class MemberRecord:
+    __slots__ = (
+        'id', 'name', 'display_name', 'discriminator', 'nick', 'joined_at',
+        'created_at', 'role_ids', 'is_bot', 'status'
+    )
+
+    def __init__(self, id: int, name: str, display_name: str, discriminator: str, nick: Optional[str],
+                 joined_at: Optional[int], created_at: Optional[int], role_ids: Tuple[int, ...],
+                 is_bot: bool, status: str):
+        self.id = id
+        self.name = name
+        # most members have no server nickname; share the string instead of a copy
+        self.display_name = name if display_name == name else display_name
+        self.discriminator = sys.intern(discriminator)
+        self.nick = nick
+        self.joined_at = joined_at
+        self.created_at = created_at
+        self.role_ids = role_ids
+        self.is_bot = is_bot
+        self.status = sys.intern(status)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MemberRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
+
+    @classmethod
+    def from_details(cls, details: Mapping, roles: RoleTable) -> "MemberRecord":
+        return cls(
+            details['id'], details['name'], details['display_name'], details.get('discriminator', '0'),
+            details.get('nick'), to_timestamp(details.get('joined_at')), to_timestamp(details.get('created_at')),
+            roles.intern(details.get('roles', ())), details.get('is_bot', False), details.get('status', 'unknown')
+        )
+
+
+class MemberView(Mapping):
+    """Read-only details dict over a MemberRecord; built on access, holds no copies."""
+
+    __slots__ = ('record', '_roles')
+
+    def __init__(self, record: MemberRecord, roles: RoleTable):
+        self.record = record
+        self._roles = roles
+
+    def __getitem__(self, key: str):
+        record = self.record
+        if key == 'roles':
+            return self._roles.names_of(record.role_ids)
+        if key in ('joined_at', 'created_at'):
+            return from_timestamp(getattr(record, key))
+        if key in DETAIL_KEYS:
+            return getattr(record, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(DETAIL_KEYS)
+
+    def to_dict(self) -> dict:
+        """Details dict as the stores persist it: like ``dict(view)``, but timestamps stay epoch seconds."""
+        record = self.record
+        return {
+            'id': record.id,
+            'name': record.name,
+            'display_name': record.display_name,
+            'discriminator': record.discriminator,
+            'nick': record.nick,
+            'joined_at': record.joined_at,
+            'created_at': record.created_at,
+            'roles': self._roles.names_of(record.role_ids),
+            'is_bot': record.is_bot,
+            'status': record.status
+        }
+
+    def __len__(self) -> int:
+        return len(DETAIL_KEYS)
+
+    def __repr__(self) -> str:
+        return f"MemberView({dict(self)!r})"
+
+
+class MemberDetails(Mapping):
+    """``{member_id: MemberView}`` over the record table, for the old ``member_details`` API."""
+
+    __slots__ = ('_records', '_roles')
+
+    def __init__(self, records: Dict[int, MemberRecord], roles: RoleTable):
+        self._records = records
+        self._roles = roles
+
+    def __getitem__(self, member_id: int) -> MemberView:
+        return MemberView(self._records[member_id], self._roles)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+def record_size(record: MemberRecord) -> int:
+    """Bytes owned by one record: the slotted object, its id, timestamps and name strings.
+
+    Interned/shared objects (role tuples, status, discriminator) are
+    accounted once in ``table_size`` or not at all.
+    """
+    size = sys.getsizeof(record) + sys.getsizeof(record.id) + sys.getsizeof(record.name)
+    if record.display_name is not record.name:
+        size += sys.getsizeof(record.display_name)
+    if record.nick is not None:
+        size += sys.getsizeof(record.nick)
+    for stamp in (record.joined_at, record.created_at):
+        if stamp is not None:
+            size += sys.getsizeof(stamp)
+    return size
+
+
+def table_size(records: Dict[int, MemberRecord], roles: RoleTable) -> int:
+    """Bytes for the containers and the shared role data."""
+    size = sys.getsizeof(records) + sys.getsizeof(roles.ids) + sys.getsizeof(roles.names)
+    size += sys.getsizeof(roles._combos)
+    size += sum(sys.getsizeof(name) for name in roles.names)
+    size += sum(sys.getsizeof(combo) for combo in roles._combos)
+    return size
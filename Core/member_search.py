@@ -0,0 +1,222 @@
+"""
+Search indexes for the member cache.
+A trigram inverted index narrows substring queries to a small candidate
+set before the final check, instead of lowercasing every member's names
+on every query. The same postings answer typo-tolerant fuzzy queries by
+trigram similarity.
+"""
+
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# fuzzy matches scoring below this are dropped
+FUZZY_MIN_SCORE = 0.1
+# candidates (by shared-trigram count) that get an exact similarity score, per result wanted
+FUZZY_CANDIDATES_PER_RESULT = 8
+# pending prefix-index inserts above this are merged with one sort instead of one insort each
+PREFIX_INSORT_LIMIT = 64
+
+
+def normalize(text: Optional[str]) -> str:
+    return text.casefold() if text else ""
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def padded_trigrams(text: str) -> Set[str]:
+    """Trigrams plus word-boundary grams ("  j", " jo", "hn "), so short names still share grams."""
+    return trigrams(f"  {text} ")
+
+
+class TrigramIndex:
+    """Maps each trigram of a member's names to the member ids containing it.
+
+    Names are stored normalized once at insert time, and indexed by their
+    trigrams plus word-boundary grams. Substring queries of three or more
+    characters intersect posting sets (smallest first); shorter queries
+    fall back to a scan over the pre-normalized names.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._texts: Dict[int, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, member_id: int, names: Iterable[Optional[str]]) -> None:
+        texts = tuple(t for t in (normalize(n) for n in names) if t)
+        if self._texts.get(member_id) == texts:
+            return
+        self.remove(member_id)
+        self._texts[member_id] = texts
+        for gram in set().union(*(padded_trigrams(t) for t in texts)):
+            self._postings.setdefault(gram, set()).add(member_id)
+
+    def remove(self, member_id: int) -> None:
+        texts = self._texts.pop(member_id, None)
+        if not texts:
+            return
+        for gram in set().union(*(padded_trigrams(t) for t in texts)):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(member_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._texts.clear()
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        if len(query) < 3:
+            return self._texts.keys()
+        postings = []
+        for gram in trigrams(query):
+            ids = self._postings.get(gram)
+            if not ids:
+                return ()
+            postings.append(ids)
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Return matching member ids ranked exact > prefix > substring, then by name."""
+        query = normalize(query)
+        if not query:
+            return []
+        scored = []
+        for member_id in self._candidates(query):
+            best = None
+            for text in self._texts[member_id]:
+                if text == query:
+                    best = 0
+                    break
+                if text.startswith(query):
+                    best = 1
+                elif best is None and query in text:
+                    best = 2
+            if best is not None:
+                scored.append((best, self._texts[member_id][0], member_id))
+        scored.sort()
+        if limit is not None:
+            scored = scored[:limit]
+        return [member_id for _, _, member_id in scored]
+
+    def _similarity(self, query: str, grams: Set[str], text: str) -> float:
+        """1.0 for an exact match, 0.6-1.0 for a substring (closer lengths score higher),
+        otherwise Jaccard similarity of the trigram sets."""
+        if text == query:
+            return 1.0
+        if query in text:
+            return 0.6 + 0.4 * len(query) / len(text)
+        text_grams = padded_trigrams(text)
+        shared = len(grams & text_grams)
+        return shared / (len(grams) + len(text_grams) - shared)
+
+    def fuzzy(self, query: str, limit: int = 25,
+              min_score: float = FUZZY_MIN_SCORE) -> List[Tuple[int, float]]:
+        """Return up to ``limit`` (member_id, score) pairs, best first, tolerating typos.
+
+        Members are counted by how many of the query's trigrams they share
+        (one pass over the query's posting sets); only the strongest
+        candidates get an exact similarity score.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        grams = padded_trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids:
+                shared.update(ids)
+        candidates = heapq.nlargest(limit * FUZZY_CANDIDATES_PER_RESULT, shared.items(), key=lambda kv: kv[1])
+        scored = []
+        for member_id, _ in candidates:
+            score = self._best_score(member_id, query, grams)
+            if score >= min_score:
+                scored.append((score, member_id))
+        best = heapq.nlargest(limit, scored, key=lambda sm: (sm[0], -len(self._texts[sm[1]][0])))
+        return [(member_id, score) for score, member_id in best]
+
+    def _best_score(self, member_id: int, query: str, grams: Set[str]) -> float:
+        return max(self._similarity(query, grams, text) for text in self._texts[member_id])
+
+
+class PrefixIndex:
+    """Sorted ``(normalized name, member_id)`` pairs for prefix completion.
+
+    A lookup is one bisect plus a short forward scan, which keeps
+    autocomplete inside its response deadline. Inserts are buffered and
+    merged on the next lookup: a few at a time by insort, a bulk load
+    (startup, reconciliation) with a single sort.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, int]] = []
+        self._pending: List[Tuple[str, int]] = []
+
+    def __len__(self) -> int:
+        self._settle()
+        return len(self._entries)
+
+    def add(self, member_id: int, names: Iterable[Optional[str]]) -> None:
+        for text in {normalize(n) for n in names}:
+            if text:
+                self._pending.append((text, member_id))
+
+    def remove(self, member_id: int, names: Iterable[Optional[str]]) -> None:
+        self._settle()
+        entries = self._entries
+        for text in {normalize(n) for n in names}:
+            i = bisect_left(entries, (text, member_id))
+            if i < len(entries) and entries[i] == (text, member_id):
+                del entries[i]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._pending.clear()
+
+    def _settle(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        entries = self._entries
+        if len(pending) <= PREFIX_INSORT_LIMIT:
+            for entry in pending:
+                i = bisect_left(entries, entry)
+                if i == len(entries) or entries[i] != entry:
+                    entries.insert(i, entry)
+            return
+        entries.extend(pending)
+        entries.sort()
+        # re-indexing the same member twice leaves adjacent duplicates
+        self._entries = [e for i, e in enumerate(entries) if i == 0 or e != entries[i - 1]]
+
+    def complete(self, prefix: str, limit: int = 25) -> List[int]:
+        """Member ids with a name starting with ``prefix``, in name order, each once."""
+        self._settle()
+        prefix = normalize(prefix)
+        entries = self._entries
+        found: List[int] = []
+        seen: Set[int] = set()
+        i = bisect_left(entries, (prefix,))
+        while i < len(entries) and len(found) < limit:
+            text, member_id = entries[i]
+            if not text.startswith(prefix):
+                break
+            if member_id not in seen:
+                seen.add(member_id)
+                found.append(member_id)
+            i += 1
+        return found
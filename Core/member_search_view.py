@@ -0,0 +1,65 @@
+"""
+Paginated member search results with button navigation.
+The ranked hits are computed once per query; the view only pages
+through them and reads each member's current details when rendering.
+"""
+
+from typing import List, Tuple
+
+import discord
+from discord.ui import View, button
+
+from .compile_members import get_member_cache
+
+SEARCH_PAGE_SIZE = 10
+SEARCH_MAX_RESULTS = 50
+
+
+def render_results(query: str, hits: List[Tuple[int, float]], page: int, page_size: int) -> discord.Embed:
+    pages = max(1, -(-len(hits) // page_size))
+    embed = discord.Embed(title=f"🔍 Members matching “{query}”", color=discord.Color.green())
+    cache = get_member_cache()
+    start = page * page_size
+    for n, (member_id, score) in enumerate(hits[start:start + page_size], start + 1):
+        details = cache.get_member_details(member_id)
+        if details is None:
+            continue  # left since the search ran
+        nick = f" · nick {details['nick']}" if details['nick'] else ""
+        embed.add_field(
+            name=f"{n}. {details['display_name']}",
+            value=f"@{details['name']}{nick} · match {score:.0%}",
+            inline=False
+        )
+    embed.set_footer(text=f"Page {page + 1}/{pages} · {len(hits)} results")
+    return embed
+
+
+class SearchPager(View):
+    """Prev/next buttons over one query's ranked hits."""
+
+    def __init__(self, query: str, hits: List[Tuple[int, float]], page_size: int = SEARCH_PAGE_SIZE):
+        super().__init__(timeout=300)
+        self.query = query
+        self.hits = hits
+        self.page_size = page_size
+        self.page = 0
+
+    def render(self) -> discord.Embed:
+        pages = max(1, -(-len(self.hits) // self.page_size))
+        self.page = min(max(self.page, 0), pages - 1)
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= pages - 1
+        return render_results(self.query, self.hits, self.page, self.page_size)
+
+    async def _show(self, interaction: discord.Interaction):
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @button(label="Prev", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def prev_page(self, interaction: discord.Interaction, btn: discord.ui.Button):
+        self.page -= 1
+        await self._show(interaction)
+
+    @button(label="More results", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, btn: discord.ui.Button):
+        self.page += 1
+        await self._show(interaction)
@@ -0,0 +1,17 @@
+"""
+Import the JSON caches (each guild's cache/leaderboards/<guild_id>.json
++ its change log, the member snapshot + its change log) into the SQLite
+database used when COMPILED_STORAGE=sqlite.
+
+The pre-sharding global board (cache/leaderboard.json) is not migrated.
+It is still read on either backend to seed a guild that has no table
+yet, with the entries of that guild's current members.
+
+Usage:  python -m Core.migrate
+"""
+
+from .storage import SQLITE_FILE, migrate_json_to_sqlite
+
+if __name__ == "__main__":
+    n_scores, n_members = migrate_json_to_sqlite()
+    print(f"✅ Migrated {n_scores} leaderboard entries and {n_members} members into {SQLITE_FILE}")
@@ -0,0 +1,262 @@
+"""
+Persistence helpers shared by the caches.
+Atomic JSON writes, a debounced write-behind that keeps file I/O off the
+event loop, and an append-only change log compacted by snapshots.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+
+def atomic_write_json(path: str, data: Any) -> None:
+    """Write compact JSON to ``path`` via a temp file and an atomic rename."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # unique temp name so overlapping writers of the same file never collide
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_lines(path: str, lines: Iterable[str]) -> None:
+    """Write ``lines`` (each without its newline) to ``path`` via a temp file and an atomic rename."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+            for line in lines:
+                f.write(line)
+                f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class WriteBehind:
+    """Coalesces many "something changed" signals into one delayed write.
+
+    ``snapshot`` runs on the event loop and must return a copy that is safe
+    to serialize while the cache keeps changing; ``write`` runs in the
+    default executor. Without a running loop (scripts, startup) writes
+    happen immediately.
+    """
+
+    def __init__(self, snapshot: Callable[[], Any], write: Callable[[Any], None], delay: float = 5.0):
+        self._snapshot = snapshot
+        self._write = write
+        self.delay = delay
+        self.dirty = False
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self) -> None:
+        self.dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()
+            return
+        if self._handle is None:
+            self._handle = loop.call_later(self.delay, lambda: loop.create_task(self._flush_later()))
+
+    def _cancel_timer(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    async def flush(self) -> None:
+        """Write pending changes now, in the executor."""
+        self._cancel_timer()
+        async with self._lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            data = self._snapshot()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+            except Exception:
+                self.dirty = True
+                raise
+
+    async def _flush_later(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"❌ Failed to persist cache: {e}")
+
+    def flush_sync(self) -> None:
+        """Write pending changes on the calling thread (shutdown path)."""
+        self._cancel_timer()
+        if self.dirty:
+            self.dirty = False
+            self._write(self._snapshot())
+
+
+class AppendLog:
+    """Append-only JSONL log split into numbered segment files.
+
+    A position is ``(segment, offset)``: everything before it is covered by
+    a snapshot, everything after it is replayed on startup. Old segments are
+    never rewritten, so they double as an audit trail.
+    """
+
+    def __init__(self, directory: str, rotate_bytes: int = 1 << 20):
+        self.directory = directory
+        self.rotate_bytes = rotate_bytes
+        self._file = None
+        segments = self._segments()
+        self.segment = segments[-1] if segments else 1
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:06d}.jsonl")
+
+    def _segments(self) -> List[int]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(name[:-6]) for name in os.listdir(self.directory)
+                      if name.endswith(".jsonl") and name[:-6].isdigit())
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(self._path(self.segment), "ab")
+        return self._file
+
+    def append(self, record: dict) -> None:
+        f = self._open()
+        f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n")
+        f.flush()
+
+    def position(self) -> Tuple[int, int]:
+        return self.segment, self._open().tell()
+
+    def checkpoint(self) -> Tuple[int, int]:
+        """Start a new segment if the current one is large, then return the position."""
+        if self._open().tell() >= self.rotate_bytes:
+            self.close()
+            self.segment += 1
+        return self.position()
+
+    def replay(self, segment: int = 0, offset: int = 0) -> Iterator[dict]:
+        """Yield records written after ``(segment, offset)``.
+
+        A torn record at the end of the newest segment (crash mid-write) is
+        cut off so later appends start on a clean line.
+        """
+        self.close()
+        segments = [s for s in self._segments() if s >= segment]
+        for seg in segments:
+            path = self._path(seg)
+            start = offset if seg == segment else 0
+            with open(path, "rb") as f:
+                f.seek(start)
+                good = start
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("truncated record")
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    good += len(line)
+                    yield record
+            if good < os.path.getsize(path):
+                if seg == segments[-1]:
+                    with open(path, "r+b") as f:
+                        f.truncate(good)
+                print(f"⚠️ Dropped torn record in {path} at byte {good}")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SnapshotLog:
+    """A snapshot file plus the AppendLog of changes made since it was written.
+
+    Changes are durable once appended; the snapshot only compacts the log.
+    Each snapshot stores the log position it covers, so ``load`` (or
+    ``replay`` for custom formats) yields just the records written after it.
+    With ``state``, JSON snapshots of ``state()`` are written by a
+    WriteBehind after ``delay`` seconds; without it the owner writes the
+    snapshot itself and puts ``checkpoint()`` in it.
+    """
+
+    def __init__(self, path: str, log_dir: str, label: str,
+                 state: Optional[Callable[[], dict]] = None, delay: float = 30.0):
+        self.path = path
+        self.label = label  # "Replayed 3 <label> log records"
+        self._log = AppendLog(log_dir)
+        # appends may come from worker threads while the loop takes a checkpoint
+        self._lock = threading.Lock()
+        self._state = state
+        self._writer = WriteBehind(self._snapshot, self._write, delay=delay) if state else None
+
+    def append(self, record: dict) -> None:
+        with self._lock:
+            self._log.append({"ts": datetime.now().isoformat(), **record})
+
+    def checkpoint(self) -> List[int]:
+        """Log position for a snapshot taken now: it covers every record written so far."""
+        with self._lock:
+            return list(self._log.checkpoint())
+
+    def load(self) -> Tuple[Optional[dict], Iterator[dict]]:
+        """The JSON snapshot (None if none was written yet) and the log records after it."""
+        data = None
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        return data, self.replay((data or {}).get("log_position", (0, 0)))
+
+    def replay(self, position: Iterable[int] = (0, 0)) -> Iterator[dict]:
+        """Log records written after ``position``; consume them before appending again."""
+        replayed = 0
+        with self._lock:
+            for record in self._log.replay(*position):
+                replayed += 1
+                yield record
+        if replayed:
+            print(f"Replayed {replayed} {self.label} log records")
+            if self._writer is not None:
+                # the next snapshot folds the replayed tail in
+                self._writer.dirty = True
+
+    def _snapshot(self) -> dict:
+        data = self._state()
+        data["log_position"] = self.checkpoint()
+        return data
+
+    def _write(self, data: dict) -> None:
+        atomic_write_json(self.path, data)
+
+    def touch(self) -> None:
+        """Schedule a snapshot."""
+        self._writer.mark_dirty()
+
+    async def flush(self) -> None:
+        await self._writer.flush()
+
+    def flush_sync(self) -> None:
+        self._writer.flush_sync()
+
+    def close(self) -> None:
+        with self._lock:
+            self._log.close()
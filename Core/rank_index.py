@@ -0,0 +1,270 @@
+"""
+Ranked index for the leaderboard.
+Keeps a Fenwick tree over win counts so rank lookups and top-N slices
+don't have to sort every entry on each command. Tied users are kept in
+user-id order in chunked sorted lists, so finding a user or a page inside
+a huge tie (everyone on 0 wins) is a bisect, not a walk.
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# ids per chunk of a tie group; a chunk past twice this size is split in two
+TIE_CHUNK = 512
+
+
+class _TieGroup:
+    """Sorted user ids sharing one win count.
+
+    Ids sit in sorted chunks found by bisecting the chunks' last ids, and a
+    Fenwick tree over chunk lengths maps positions to chunks and back, so
+    add, remove, index and the start of a slice are O(log n) plus a list
+    insert or delete of at most ``2 * TIE_CHUNK`` items.
+    """
+
+    __slots__ = ("_chunks", "_maxes", "_tree", "_len")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        ids = sorted(ids)
+        self._chunks: List[List[int]] = [ids[i:i + TIE_CHUNK] for i in range(0, len(ids), TIE_CHUNK)]
+        self._len = len(ids)
+        self._reindex()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _reindex(self) -> None:
+        """Rebuild chunk maxes and the length tree in O(chunks) (after a split or an emptied chunk)."""
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        n = len(self._chunks)
+        tree = [0] * (n + 1)
+        for i, chunk in enumerate(self._chunks, 1):
+            tree[i] += len(chunk)
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _bump(self, chunk: int, delta: int) -> None:
+        tree = self._tree
+        i = chunk + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _before(self, chunk: int) -> int:
+        """Number of ids in the chunks before ``chunk``."""
+        tree = self._tree
+        total = 0
+        while chunk > 0:
+            total += tree[chunk]
+            chunk -= chunk & -chunk
+        return total
+
+    def _locate(self, k: int) -> Tuple[int, int]:
+        """Return ``(chunk, offset)`` of position ``k``."""
+        tree = self._tree
+        n = len(tree) - 1
+        chunk = 0
+        step = 1 << (n.bit_length() - 1) if n else 0
+        while step:
+            nxt = chunk + step
+            if nxt <= n and tree[nxt] <= k:
+                chunk = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return chunk, k
+
+    def add(self, user_id: int) -> None:
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([user_id])
+            self._reindex()
+            return
+        i = min(bisect_left(self._maxes, user_id), len(self._chunks) - 1)
+        chunk = self._chunks[i]
+        insort(chunk, user_id)
+        if len(chunk) > 2 * TIE_CHUNK:
+            self._chunks[i:i + 1] = [chunk[:TIE_CHUNK], chunk[TIE_CHUNK:]]
+            self._reindex()
+        else:
+            self._maxes[i] = chunk[-1]
+            self._bump(i, 1)
+
+    def remove(self, user_id: int) -> None:
+        i = bisect_left(self._maxes, user_id)
+        chunk = self._chunks[i]
+        del chunk[bisect_left(chunk, user_id)]
+        self._len -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+            self._bump(i, -1)
+        else:
+            del self._chunks[i]
+            self._reindex()
+
+    def index(self, user_id: int) -> int:
+        """0-based position of ``user_id``, which must be in the group."""
+        i = bisect_left(self._maxes, user_id)
+        return self._before(i) + bisect_left(self._chunks[i], user_id)
+
+    def slice(self, start: int, stop: int) -> Iterator[int]:
+        """Ids at positions ``start``..``stop - 1``."""
+        i, offset = self._locate(start)
+        remaining = stop - start
+        while remaining > 0 and i < len(self._chunks):
+            part = self._chunks[i][offset:offset + remaining]
+            yield from part
+            remaining -= len(part)
+            i += 1
+            offset = 0
+
+
+class RankIndex:
+    """Order-statistics over ``{user_id: wins}``.
+
+    Ties use competition ranking ("1224"): a user's rank is one more than
+    the number of users with strictly more wins, so tied users share a rank.
+    Inside a tie, users are listed by user id.
+    """
+
+    def __init__(self):
+        self._size = 64
+        self._tree: List[int] = [0] * (self._size + 1)
+        self._buckets: Dict[int, _TieGroup] = {}  # {wins: user ids with that many wins}
+        self._wins: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._wins)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._wins
+
+    # ----------------
+    # fenwick tree
+    # ----------------
+    def _grow(self, wins: int) -> None:
+        while self._size <= wins:
+            self._size *= 2
+        self._tree = [0] * (self._size + 1)
+        for w, bucket in self._buckets.items():
+            self._add(w, len(bucket))
+
+    def _add(self, wins: int, delta: int) -> None:
+        i = wins + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_at_most(self, wins: int) -> int:
+        i = min(wins + 1, self._size)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _find(self, k: int) -> int:
+        """Return the smallest win count with at least ``k`` users at or below it."""
+        pos = 0
+        step = 1 << (self._size.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= self._size and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos  # index pos + 1 holds wins == pos
+
+    # ----------------
+    # updates
+    # ----------------
+    def set(self, user_id: int, wins: int) -> None:
+        old = self._wins.get(user_id)
+        if old == wins:
+            return
+        if old is not None:
+            self._discard(user_id, old)
+        if wins >= self._size:
+            self._grow(wins)
+        self._wins[user_id] = wins
+        bucket = self._buckets.get(wins)
+        if bucket is None:
+            bucket = self._buckets[wins] = _TieGroup()
+        bucket.add(user_id)
+        self._add(wins, 1)
+
+    def remove(self, user_id: int) -> None:
+        old = self._wins.pop(user_id, None)
+        if old is not None:
+            self._discard(user_id, old)
+
+    def _discard(self, user_id: int, wins: int) -> None:
+        bucket = self._buckets[wins]
+        bucket.remove(user_id)
+        if not bucket:
+            del self._buckets[wins]
+        self._add(wins, -1)
+
+    def clear(self) -> None:
+        self._size = 64
+        self._tree = [0] * (self._size + 1)
+        self._buckets.clear()
+        self._wins.clear()
+
+    def build(self, items: Iterable[Tuple[int, int]]) -> None:
+        """Rebuild from ``(user_id, wins)`` pairs in O(n log n + max_wins)."""
+        self.clear()
+        ids: Dict[int, List[int]] = {}
+        for user_id, wins in items:
+            self._wins[user_id] = wins
+            ids.setdefault(wins, []).append(user_id)
+        self._buckets = {wins: _TieGroup(group) for wins, group in ids.items()}
+        self._grow(max(self._buckets, default=0))
+
+    # ----------------
+    # queries
+    # ----------------
+    def wins_of(self, user_id: int) -> Optional[int]:
+        return self._wins.get(user_id)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """Return the competition rank of a user (1 = most wins)."""
+        wins = self._wins.get(user_id)
+        if wins is None:
+            return None
+        return len(self._wins) - self._count_at_most(wins) + 1
+
+    def position(self, user_id: int) -> Optional[int]:
+        """Return the 0-based position of a user in descending order.
+
+        O(log W) to find the tie group, plus O(log n) inside it.
+        """
+        wins = self._wins.get(user_id)
+        if wins is None:
+            return None
+        above = len(self._wins) - self._count_at_most(wins)
+        return above + self._buckets[wins].index(user_id)
+
+    def range(self, start: int, stop: int) -> List[Tuple[int, int, int]]:
+        """Return ``(rank, user_id, wins)`` for positions ``start``..``stop - 1``.
+
+        Positions are 0-based in descending order. Only the requested slice
+        is materialized: each distinct win count costs one O(log W) descent
+        and one O(log n) seek into its tie group.
+        """
+        total = len(self._wins)
+        stop = min(stop, total)
+        pos = max(start, 0)
+        out = []
+        while pos < stop:
+            wins = self._find(total - pos)
+            above = total - self._count_at_most(wins)
+            bucket = self._buckets[wins]
+            for user_id in bucket.slice(pos - above, stop - above):
+                out.append((above + 1, user_id, wins))
+                pos += 1
+        return out
+
+    def top(self, n: int) -> List[Tuple[int, int, int]]:
+        return self.range(0, n)
@@ -0,0 +1,52 @@
+"""
+Render cache for command output.
+Keys include the data version they were rendered from, so an entry is
+never stale: a change bumps the version and the old entry just ages out.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class RenderCache:
+    """Small LRU of rendered payloads with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], T]) -> T:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = render()
+            self._entries[key] = value
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._entries)
+        }
+
+
+# rendered //leaderboard embeds, keyed by (guild_id, top_n, page, version)
+leaderboard_renders = RenderCache(max_entries=128)
+# rank description strings, keyed by (command, guild_id, user_id, version)
+rank_strings = RenderCache(max_entries=4096)
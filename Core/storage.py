@@ -0,0 +1,600 @@
+"""
+Storage backends for the leaderboard and the member cache.
+The JSON files under cache/ are the default; set COMPILED_STORAGE=sqlite
+to keep both in a SQLite database (WAL mode) instead. Either backend is
+storage only: ranks, top-N pages, role filters and name lookups are
+answered by the in-memory indexes built from the loaded rows.
+
+Migrate existing JSON files with:  python -m Core.migrate
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .persistence import SnapshotLog, atomic_write_lines
+from .windows import BUCKET_RETENTION_DAYS, today
+
+# pre-sharding global board; only read to seed guilds that have no table yet
+LEADERBOARD_FILE = "cache/leaderboard.json"
+LEADERBOARD_LOG_DIR = "cache/leaderboard_log"
+LEADERBOARDS_DIR = "cache/leaderboards"  # one <guild_id>.json + <guild_id>_log/ per guild
+MEMBERS_FILE = "cache/members.ndjson"
+LEGACY_MEMBERS_FILE = "cache/members.json"  # pre-v2 snapshot, read only while no members.ndjson exists
+MEMBERS_LOG_DIR = "cache/members_log"  # member upserts/removals since the last snapshot
+MEMBERS_FORMAT_VERSION = 2
+# v2 snapshot row layout; timestamps are epoch seconds, roles index the header's role table
+# and display_name is null when it equals name
+MEMBER_ROW_FIELDS = (
+    "id", "name", "display_name", "discriminator", "nick", "joined_at",
+    "created_at", "roles", "is_bot", "status"
+)
+SQLITE_FILE = "cache/compiled.db"
+STORAGE_BACKEND = os.getenv("COMPILED_STORAGE", "json")
+
+# every change is already durable in the log, so snapshots can be lazy
+SAVE_DEBOUNCE_SECONDS = 30.0
+
+# state callback handed to leaderboard stores; returns (and load() yields) a dict of
+# scores {user_id: entry}, last_updated, daily {day: {user_id: delta}} and seasons {name: [start, end]}
+LeaderboardState = Callable[[], dict]
+
+
+def empty_state() -> dict:
+    return {"scores": {}, "last_updated": None, "daily": {}, "seasons": {}}
+
+
+# ----------------
+# interfaces
+# ----------------
+class LeaderboardStore:
+    """Where a Leaderboard keeps its scores.
+
+    ``record`` is called once per changed member (``delta`` is the change
+    in wins, bucketed by day) and ``touch`` once per batch of changes; the
+    store decides when the data actually hits disk.
+    """
+
+    def bind(self, state: LeaderboardState) -> None:
+        self._state = state
+
+    def load(self) -> dict:
+        raise NotImplementedError
+
+    def record(self, op: str, user_id: int, entry: dict, actor_id: Optional[int] = None, delta: int = 0) -> None:
+        raise NotImplementedError
+
+    def record_batch(self, op: str, changes: List[Tuple[int, dict, int]], actor_id: Optional[int] = None) -> None:
+        """Record ``(user_id, entry, delta)`` changes that must land together."""
+        for user_id, entry, delta in changes:
+            self.record(op, user_id, entry, actor_id, delta)
+
+    def touch(self) -> None:
+        raise NotImplementedError
+
+    async def flush(self) -> None:
+        raise NotImplementedError
+
+    def flush_sync(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release file handles once the board is dropped from memory."""
+
+
+class MemberStore:
+    """Where a MemberCache keeps member details."""
+
+    def load(self) -> Tuple[Iterable[dict], Optional[str]]:
+        """Member details (possibly a lazy, single-pass iterator) and last_updated."""
+        raise NotImplementedError
+
+    def save_all(self, details: List[dict], last_updated: Optional[str]) -> None:
+        raise NotImplementedError
+
+    def save_changes(self, upserts: List[dict], deleted: List[int], last_updated: Optional[str]) -> None:
+        """Persist only the members that changed or left since the last save."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release file handles on shutdown."""
+
+
+# ----------------
+# JSON backend
+# ----------------
+class JsonLeaderboardStore(LeaderboardStore):
+    """Snapshot in leaderboard.json plus an append-only JSONL change log."""
+
+    def __init__(self, path: str = LEADERBOARD_FILE, log_dir: str = LEADERBOARD_LOG_DIR,
+                 delay: float = SAVE_DEBOUNCE_SECONDS):
+        self.path = path
+        self._snapshots = SnapshotLog(path, log_dir, "leaderboard", self._snapshot, delay)
+
+    def load(self) -> dict:
+        """Load the latest snapshot, then replay the log tail written after it."""
+        state = empty_state()
+        data, records = self._snapshots.load()
+        if data is not None:
+            state["scores"] = {int(k): v for k, v in data.get("scores", {}).items()}
+            state["last_updated"] = data.get("last_updated")
+            state["daily"] = {
+                int(day): {int(uid): n for uid, n in bucket.items()}
+                for day, bucket in data.get("daily", {}).items()
+            }
+            state["seasons"] = data.get("seasons", {})
+
+        for record in records:
+            day = date.fromisoformat(record["ts"][:10]).toordinal()
+            if "batch" in record:
+                changes = record["batch"]
+            else:
+                changes = [(record["user_id"], record["display_name"], record["wins"], record.get("delta", 0))]
+            for user_id, display_name, wins, delta in changes:
+                state["scores"][user_id] = {"display_name": display_name, "wins": wins}
+                if delta:
+                    bucket = state["daily"].setdefault(day, {})
+                    bucket[user_id] = bucket.get(user_id, 0) + delta
+        return state
+
+    def record(self, op: str, user_id: int, entry: dict, actor_id: Optional[int] = None, delta: int = 0) -> None:
+        record = {
+            "op": op,
+            "user_id": user_id,
+            "display_name": entry["display_name"],
+            "wins": entry["wins"],
+            "by": actor_id
+        }
+        if delta:
+            record["delta"] = delta
+        self._snapshots.append(record)
+
+    def record_batch(self, op: str, changes: List[Tuple[int, dict, int]], actor_id: Optional[int] = None) -> None:
+        # one log line for the whole batch: a torn write drops all of it on replay, never half
+        self._snapshots.append({
+            "op": op,
+            "by": actor_id,
+            "batch": [[uid, entry["display_name"], entry["wins"], delta] for uid, entry, delta in changes]
+        })
+
+    def touch(self) -> None:
+        self._snapshots.touch()
+
+    async def flush(self) -> None:
+        await self._snapshots.flush()
+
+    def flush_sync(self) -> None:
+        self._snapshots.flush_sync()
+
+    def close(self) -> None:
+        self._snapshots.close()
+
+    def _snapshot(self) -> dict:
+        state = self._state()
+        return {
+            "scores": {str(k): dict(v) for k, v in state["scores"].items()},
+            "last_updated": state["last_updated"],
+            "daily": {
+                str(day): {str(uid): n for uid, n in bucket.items()}
+                for day, bucket in state["daily"].items()
+            },
+            "seasons": dict(state["seasons"])
+        }
+
+
+class JsonMemberStore(MemberStore):
+    """members.ndjson snapshot plus a JSONL log of member changes made since it.
+
+    Snapshot format (version 2): a header line with the format version,
+    last_updated, log position and role-name table, then one compact JSON
+    array per member in MEMBER_ROW_FIELDS order. Rows are parsed as they
+    are consumed, so loading never holds the whole file. A legacy
+    members.json is read when no snapshot exists yet.
+    """
+
+    def __init__(self, path: str = MEMBERS_FILE, log_dir: str = MEMBERS_LOG_DIR,
+                 legacy_path: str = LEGACY_MEMBERS_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._snapshots = SnapshotLog(path, log_dir, "member")
+        # snapshots are written from the loop and from worker threads (reconciliation)
+        self._lock = threading.Lock()
+
+    def load(self) -> Tuple[Iterable[dict], Optional[str]]:
+        """Open the snapshot, replay member changes logged after it, and stream the merged result."""
+        rows: Iterable[dict] = ()
+        last_updated, position = None, (0, 0)
+        header = self._read_header()
+        if header is not None:
+            rows = self._iter_rows(header)
+            last_updated, position = header.get("last_updated"), header.get("log_position", (0, 0))
+        elif os.path.exists(self.legacy_path):
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            rows = list(data.get("member_details", {}).values())
+            last_updated, position = data.get("last_updated"), data.get("log_position", (0, 0))
+
+        changed: Dict[int, dict] = {}
+        deleted = set()
+        for record in self._snapshots.replay(position):
+            for d in record.get("upsert", ()):
+                changed[d["id"]] = d
+                deleted.discard(d["id"])
+            for member_id in record.get("delete", ()):
+                changed.pop(member_id, None)
+                deleted.add(member_id)
+            last_updated = record.get("last_updated", last_updated)
+        return self._merge(rows, changed, deleted), last_updated
+
+    @staticmethod
+    def _merge(rows: Iterable[dict], changed: Dict[int, dict], deleted: set) -> Iterator[dict]:
+        for d in rows:
+            if d["id"] not in changed and d["id"] not in deleted:
+                yield d
+        yield from changed.values()
+
+    def _read_header(self) -> Optional[dict]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            header = json.loads(f.readline() or b"{}")
+        if header.get("format") != "members" or header.get("version") != MEMBERS_FORMAT_VERSION:
+            print(f"⚠️ {self.path} has unsupported format {header.get('format')!r} "
+                  f"v{header.get('version')}; falling back to {self.legacy_path}")
+            return None
+        return header
+
+    def _iter_rows(self, header: dict) -> Iterator[dict]:
+        roles = header["roles"]
+        with open(self.path, "rb") as f:
+            f.readline()  # header
+            for line in f:
+                if not line.strip():
+                    continue
+                mid, name, display_name, discriminator, nick, joined_at, created_at, role_ids, is_bot, status = \
+                    json.loads(line)
+                yield {
+                    "id": mid,
+                    "name": name,
+                    "display_name": name if display_name is None else display_name,
+                    "discriminator": discriminator,
+                    "nick": nick,
+                    "joined_at": joined_at,
+                    "created_at": created_at,
+                    "roles": [roles[i] for i in role_ids],
+                    "is_bot": is_bot,
+                    "status": status
+                }
+
+    def save_all(self, details: List[dict], last_updated: Optional[str]) -> None:
+        with self._lock:
+            role_ids: Dict[str, int] = {}
+            for d in details:
+                for role in d.get("roles", ()):
+                    role_ids.setdefault(role, len(role_ids))
+            header = {
+                "format": "members",
+                "version": MEMBERS_FORMAT_VERSION,
+                "fields": list(MEMBER_ROW_FIELDS),
+                "roles": list(role_ids),
+                "last_updated": last_updated,
+                "log_position": self._snapshots.checkpoint()
+            }
+            atomic_write_lines(self.path, itertools.chain(
+                [json.dumps(header, ensure_ascii=False)],
+                (json.dumps(self._row(d, role_ids), separators=(",", ":"), ensure_ascii=False) for d in details)
+            ))
+
+    @staticmethod
+    def _row(d: dict, role_ids: Dict[str, int]) -> list:
+        return [
+            d["id"], d["name"], None if d["display_name"] == d["name"] else d["display_name"],
+            d.get("discriminator", "0"), d.get("nick"), d.get("joined_at"), d.get("created_at"),
+            [role_ids[role] for role in d.get("roles", ())], d.get("is_bot", False), d.get("status", "unknown")
+        ]
+
+    def save_changes(self, upserts: List[dict], deleted: List[int], last_updated: Optional[str]) -> None:
+        # one log line per flush: a torn write drops the whole batch on replay, never half
+        self._snapshots.append({"upsert": upserts, "delete": deleted, "last_updated": last_updated})
+
+    def close(self) -> None:
+        self._snapshots.close()
+
+
+# ----------------
+# SQLite backend
+# ----------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS guild_scores (
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    display_name TEXT NOT NULL,
+    wins INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS daily_wins (
+    guild_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, day, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS win_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    op TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    display_name TEXT,
+    wins INTEGER NOT NULL,
+    actor_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS members (
+    id INTEGER PRIMARY KEY,
+    details TEXT NOT NULL
+);
+"""
+
+
+def _report_error(future: Future) -> None:
+    if future.exception() is not None:
+        print(f"❌ SQLite write failed: {future.exception()}")
+
+
+class SqliteDatabase:
+    """One SQLite connection owned by a dedicated worker thread.
+
+    Every statement runs on that thread, so callers on the event loop only
+    ever wait on a future and the connection is never shared.
+    """
+
+    def __init__(self, path: str = SQLITE_FILE):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.conn: Optional[sqlite3.Connection] = None
+        self.submit(self._connect)
+
+    def _connect(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue ``fn(*args)`` on the database thread without waiting."""
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(_report_error)
+        return future
+
+    def call(self, fn: Callable, *args):
+        """Run ``fn(*args)`` on the database thread and block for the result."""
+        return self._executor.submit(fn, *args).result()
+
+    async def run(self, fn: Callable, *args):
+        """Run ``fn(*args)`` on the database thread and await the result."""
+        return await asyncio.wrap_future(self._executor.submit(fn, *args))
+
+    def close(self) -> None:
+        def _close():
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+        self._executor.submit(_close)
+        self._executor.shutdown(wait=True)
+
+
+class SqliteLeaderboardStore(LeaderboardStore):
+    """One guild's rows in guild_scores, with row-level upserts and a win_log audit table."""
+
+    def __init__(self, db: SqliteDatabase, guild_id: int):
+        self.db = db
+        self.guild_id = guild_id
+        self._meta_key = f"leaderboard_updated:{guild_id}"
+        self._seasons_key = f"seasons:{guild_id}"
+        self._pending: List[tuple] = []
+        self._pending_daily: List[tuple] = []
+
+    def load(self) -> dict:
+        def _load():
+            conn = self.db.conn
+            state = empty_state()
+            rows = conn.execute(
+                "SELECT user_id, display_name, wins FROM guild_scores WHERE guild_id = ?", (self.guild_id,)
+            ).fetchall()
+            state["scores"] = {uid: {"display_name": name, "wins": wins} for uid, name, wins in rows}
+            meta = conn.execute("SELECT value FROM meta WHERE key = ?", (self._meta_key,)).fetchone()
+            state["last_updated"] = meta[0] if meta else None
+            seasons = conn.execute("SELECT value FROM meta WHERE key = ?", (self._seasons_key,)).fetchone()
+            state["seasons"] = json.loads(seasons[0]) if seasons else {}
+            with conn:
+                conn.execute("DELETE FROM daily_wins WHERE guild_id = ? AND day < ?",
+                             (self.guild_id, today() - BUCKET_RETENTION_DAYS))
+            for day, uid, wins in conn.execute(
+                "SELECT day, user_id, wins FROM daily_wins WHERE guild_id = ?", (self.guild_id,)
+            ):
+                state["daily"].setdefault(day, {})[uid] = wins
+            return state
+        return self.db.call(_load)
+
+    def record(self, op: str, user_id: int, entry: dict, actor_id: Optional[int] = None, delta: int = 0) -> None:
+        self._pending.append(
+            (datetime.now().isoformat(), op, self.guild_id, user_id, entry["display_name"], entry["wins"], actor_id)
+        )
+        if delta:
+            self._pending_daily.append((self.guild_id, today(), user_id, delta))
+
+    def touch(self) -> None:
+        rows, self._pending = self._pending, []
+        daily, self._pending_daily = self._pending_daily, []
+        state = self._state()
+        self.db.submit(self._write_rows, rows, daily, state["last_updated"], json.dumps(state["seasons"]))
+
+    def _write_rows(self, rows: List[tuple], daily: List[tuple], last_updated: Optional[str], seasons: str) -> None:
+        with self.db.conn as conn:
+            conn.executemany(
+                "INSERT INTO daily_wins (guild_id, day, user_id, wins) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(guild_id, day, user_id) DO UPDATE SET wins = wins + excluded.wins",
+                daily
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (self._seasons_key, seasons))
+            conn.executemany(
+                "INSERT INTO guild_scores (guild_id, user_id, display_name, wins) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(guild_id, user_id) DO UPDATE SET "
+                "display_name = excluded.display_name, wins = excluded.wins",
+                [(gid, uid, name, wins) for _, _, gid, uid, name, wins, _ in rows]
+            )
+            conn.executemany(
+                "INSERT INTO win_log (ts, op, guild_id, user_id, display_name, wins, actor_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (self._meta_key, last_updated))
+
+    async def flush(self) -> None:
+        self.touch()
+        await self.db.run(lambda: None)
+
+    def flush_sync(self) -> None:
+        self.touch()
+        self.db.call(lambda: None)
+
+    def close(self) -> None:
+        self.touch()
+
+    def replace(self, state: dict) -> None:
+        """Overwrite the guild's scores, day buckets and meta with ``state`` (migration).
+
+        Buckets are replaced rather than added to and nothing goes to
+        win_log, so importing the same state twice changes nothing.
+        """
+        self.db.call(self._replace, state)
+
+    def _replace(self, state: dict) -> None:
+        with self.db.conn as conn:
+            conn.executemany(
+                "INSERT INTO guild_scores (guild_id, user_id, display_name, wins) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(guild_id, user_id) DO UPDATE SET "
+                "display_name = excluded.display_name, wins = excluded.wins",
+                [(self.guild_id, uid, entry["display_name"], entry["wins"]) for uid, entry in state["scores"].items()]
+            )
+            conn.execute("DELETE FROM daily_wins WHERE guild_id = ?", (self.guild_id,))
+            conn.executemany(
+                "INSERT INTO daily_wins (guild_id, day, user_id, wins) VALUES (?, ?, ?, ?)",
+                [(self.guild_id, day, uid, wins)
+                 for day, bucket in state["daily"].items() for uid, wins in bucket.items()]
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         (self._seasons_key, json.dumps(state["seasons"])))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         (self._meta_key, state["last_updated"]))
+
+
+class SqliteMemberStore(MemberStore):
+    """Member rows keyed by id; the cache's own indexes are rebuilt from them on load."""
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def load(self) -> Tuple[Iterable[dict], Optional[str]]:
+        def _load():
+            rows = self.db.conn.execute("SELECT details FROM members").fetchall()
+            meta = self.db.conn.execute("SELECT value FROM meta WHERE key = 'members_updated'").fetchone()
+            return [json.loads(details) for details, in rows], (meta[0] if meta else None)
+        return self.db.call(_load)
+
+    def save_all(self, details: List[dict], last_updated: Optional[str]) -> None:
+        """Upsert every member and drop rows for members no longer present."""
+        self.db.submit(self._save_all, details, last_updated)
+
+    def save_changes(self, upserts: List[dict], deleted: List[int], last_updated: Optional[str]) -> None:
+        self.db.submit(self._save_changes, upserts, deleted, last_updated)
+
+    def _upsert_rows(self, conn: sqlite3.Connection, details: List[dict]) -> None:
+        conn.executemany(
+            "INSERT INTO members (id, details) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET details = excluded.details",
+            [(d["id"], json.dumps(d, ensure_ascii=False)) for d in details]
+        )
+
+    def _save_changes(self, upserts: List[dict], deleted: List[int], last_updated: Optional[str]) -> None:
+        with self.db.conn as conn:
+            self._upsert_rows(conn, upserts)
+            conn.executemany("DELETE FROM members WHERE id = ?", [(mid,) for mid in deleted])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('members_updated', ?)", (last_updated,))
+
+    def _save_all(self, details: List[dict], last_updated: Optional[str]) -> None:
+        with self.db.conn as conn:
+            self._upsert_rows(conn, details)
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM keep_ids")
+            conn.executemany("INSERT INTO keep_ids (id) VALUES (?)", [(d["id"],) for d in details])
+            conn.execute("DELETE FROM members WHERE id NOT IN (SELECT id FROM keep_ids)")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('members_updated', ?)", (last_updated,))
+
+
+# ----------------
+# backend selection
+# ----------------
+_database: Optional[SqliteDatabase] = None
+
+
+def get_database() -> SqliteDatabase:
+    global _database
+    if _database is None:
+        _database = SqliteDatabase()
+    return _database
+
+
+def get_leaderboard_store(guild_id: int) -> LeaderboardStore:
+    if STORAGE_BACKEND == "sqlite":
+        return SqliteLeaderboardStore(get_database(), guild_id)
+    return JsonLeaderboardStore(
+        os.path.join(LEADERBOARDS_DIR, f"{guild_id}.json"),
+        os.path.join(LEADERBOARDS_DIR, f"{guild_id}_log")
+    )
+
+
+def get_member_store() -> MemberStore:
+    if STORAGE_BACKEND == "sqlite":
+        return SqliteMemberStore(get_database())
+    return JsonMemberStore()
+
+
+def migrate_json_to_sqlite(db_path: str = SQLITE_FILE) -> Tuple[int, int]:
+    """Import every guild's leaderboard (+ its log) and the member snapshot (+ its log) into SQLite.
+
+    Only the per-guild tables under LEADERBOARDS_DIR are imported, not the legacy LEADERBOARD_FILE.
+    """
+    db = SqliteDatabase(db_path)
+
+    n_scores = 0
+    guild_ids = []
+    if os.path.isdir(LEADERBOARDS_DIR):
+        guild_ids = [int(name[:-5]) for name in os.listdir(LEADERBOARDS_DIR)
+                     if name.endswith(".json") and name[:-5].isdigit()]
+    for guild_id in guild_ids:
+        source = JsonLeaderboardStore(
+            os.path.join(LEADERBOARDS_DIR, f"{guild_id}.json"),
+            os.path.join(LEADERBOARDS_DIR, f"{guild_id}_log")
+        )
+        state = source.load()
+        source.close()
+        SqliteLeaderboardStore(db, guild_id).replace(state)
+        n_scores += len(state["scores"])
+
+    details, members_updated = JsonMemberStore().load()
+    details = list(details)
+    db.call(SqliteMemberStore(db)._save_all, details, members_updated)
+    db.close()
+    return n_scores, len(details)
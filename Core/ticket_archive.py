@@ -0,0 +1,157 @@
+"""
+Ticket transcripts.
+Before a ticket channel is deleted its history is streamed, one page at
+a time, into a gzip-compressed JSONL file under cache/transcripts/. An
+append-only index file maps ticket ids (channel ids) to their archives,
+so fetching a transcript never scans the archive directory.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import discord
+
+TRANSCRIPTS_DIR = "cache/transcripts"
+TRANSCRIPT_INDEX = "cache/transcripts/index.jsonl"
+# archives running at once; a mass expiry queues behind these instead of flooding history fetches
+ARCHIVE_WORKERS = 2
+# messages held in memory before being compressed and written (one history API page)
+HISTORY_PAGE = 100
+
+
+def message_row(message: discord.Message) -> dict:
+    return {
+        "id": message.id,
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "ts": message.created_at.isoformat(),
+        "edited": message.edited_at.isoformat() if message.edited_at else None,
+        "content": message.content,
+        "attachments": [a.url for a in message.attachments]
+    }
+
+
+class TranscriptArchive:
+    """Streams ticket channels into ``<dir>/<guild_id>/<ticket_id>.jsonl.gz`` and indexes them."""
+
+    def __init__(self, directory: str = TRANSCRIPTS_DIR, index_path: str = TRANSCRIPT_INDEX,
+                 workers: int = ARCHIVE_WORKERS):
+        self.directory = directory
+        self.index_path = index_path
+        self._slots = asyncio.Semaphore(workers)
+        self._index: Optional[Dict[int, dict]] = None  # loaded on first lookup
+        self._index_lock = threading.Lock()
+        self._running: Dict[int, asyncio.Task] = {}  # channel id -> archive in progress
+
+    def path_for(self, guild_id: int, ticket_id: int) -> str:
+        return os.path.join(self.directory, str(guild_id), f"{ticket_id}.jsonl.gz")
+
+    async def archive(self, channel: discord.TextChannel, owner_id: Optional[int] = None,
+                      reason: str = "closed") -> Optional[dict]:
+        """Write the channel's transcript; returns its index entry, or None if archiving failed.
+
+        Callers delete the channel either way; a failure is logged, not raised.
+        A channel already being archived (e.g. closed while expiring) is not
+        archived twice: the second caller waits for the first run's entry.
+        """
+        running = self._running.get(channel.id)
+        if running is None:
+            running = asyncio.ensure_future(self._archive_in_slot(channel, owner_id, reason))
+            self._running[channel.id] = running
+            running.add_done_callback(lambda _: self._running.pop(channel.id, None))
+        return await asyncio.shield(running)
+
+    async def _archive_in_slot(self, channel: discord.TextChannel, owner_id: Optional[int],
+                               reason: str) -> Optional[dict]:
+        async with self._slots:
+            try:
+                return await self._archive(channel, owner_id, reason)
+            except Exception as e:
+                print(f"❌ Failed to archive ticket #{channel.name} ({channel.id}): {e}")
+                return None
+
+    async def _archive(self, channel: discord.TextChannel, owner_id: Optional[int], reason: str) -> dict:
+        loop = asyncio.get_running_loop()
+        path = self.path_for(channel.guild.id, channel.id)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix=".tmp")
+        os.close(fd)
+        count = 0
+        try:
+            f = await loop.run_in_executor(None, lambda: gzip.open(tmp_path, "wt", encoding="utf-8"))
+            try:
+                page: List[dict] = []
+                async for message in channel.history(limit=None, oldest_first=True):
+                    page.append(message_row(message))
+                    if len(page) >= HISTORY_PAGE:
+                        await loop.run_in_executor(None, self._write_page, f, page)
+                        count += len(page)
+                        page = []
+                if page:
+                    await loop.run_in_executor(None, self._write_page, f, page)
+                    count += len(page)
+            finally:
+                await loop.run_in_executor(None, f.close)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        entry = {
+            "ticket_id": channel.id,
+            "guild_id": channel.guild.id,
+            "owner_id": owner_id,
+            "channel": channel.name,
+            "messages": count,
+            "archived_at": datetime.utcnow().isoformat(),
+            "reason": reason,
+            "path": path
+        }
+        await loop.run_in_executor(None, self._append_index, entry)
+        print(f"✅ Archived {count} messages from #{channel.name}")
+        return entry
+
+    @staticmethod
+    def _write_page(f, page: List[dict]) -> None:
+        f.write("".join(json.dumps(row, separators=(",", ":"), ensure_ascii=False) + "\n" for row in page))
+
+    def _append_index(self, entry: dict) -> None:
+        with self._index_lock:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+            if self._index is not None:
+                self._index[entry["ticket_id"]] = entry
+
+    def _load_index(self) -> Dict[int, dict]:
+        with self._index_lock:
+            if self._index is None:
+                index = {}
+                if os.path.exists(self.index_path):
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            try:
+                                entry = json.loads(line)
+                            except ValueError:
+                                continue  # torn last line after a crash
+                            index[entry["ticket_id"]] = entry
+                self._index = index
+            return self._index
+
+    def lookup(self, ticket_id: int) -> Optional[dict]:
+        """Index entry for a ticket id (its channel id), or None."""
+        entry = self._load_index().get(ticket_id)
+        if entry is None or not os.path.exists(entry["path"]):
+            return None
+        return entry
+
+
+# Global instance used by ticket expiry, the close button and //transcript
+transcript_archive = TranscriptArchive()
@@ -0,0 +1,275 @@
+"""
+Ticket category pool.
+Discord caps a category at 50 channels, so tickets are spread over
+"Tickets", "Tickets 2", "Tickets 3", ... Fill counts are kept in memory
+per guild: placing a ticket is O(1) (lowest-numbered category with room
+first, so overflow categories drain), the next category is created in
+the background before the open ones run out, and overflow categories
+are removed again once they are empty.
+"""
+
+import asyncio
+import heapq
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import discord
+
+CATEGORY_CAPACITY = 50  # Discord's channels-per-category limit
+# create the next category once fewer free slots than this remain
+CATEGORY_HEADROOM = 5
+BASE_NAME = "Tickets"
+_NAME = re.compile(rf"{BASE_NAME}(?: (\d+))?")
+# a full category is reported as Invalid Form Body with this message on parent_id
+INVALID_FORM_BODY = 50035
+_CATEGORY_FULL = re.compile(r"In parent_id: Maximum number of channels in category", re.IGNORECASE)
+
+
+def category_name(number: int) -> str:
+    return BASE_NAME if number == 1 else f"{BASE_NAME} {number}"
+
+
+def category_number(name: str) -> Optional[int]:
+    """1 for "Tickets", n for "Tickets n", None for anything else."""
+    match = _NAME.fullmatch(name)
+    if match is None:
+        return None
+    return int(match.group(1) or 1)
+
+
+def is_category_full(error: discord.HTTPException) -> bool:
+    """Whether Discord refused a channel because its category holds CATEGORY_CAPACITY channels."""
+    return error.code == INVALID_FORM_BODY and _CATEGORY_FULL.search(error.text or "") is not None
+
+
+class CategoryPool:
+    """One guild's ticket categories with their fill counts.
+
+    ``_open`` is a min-heap of (number, category id) over the categories
+    with room; entries for categories that filled up or left stay in it
+    until they reach the top (lazy deletion), so placement peeks instead
+    of scanning.
+    """
+
+    def __init__(self):
+        self.categories: Dict[int, discord.CategoryChannel] = {}
+        self.counts: Dict[int, int] = {}
+        self.numbers: Dict[int, int] = {}
+        self._open: List[Tuple[int, int]] = []
+        self._has_room: Set[int] = set()
+        self.free = 0
+
+    @classmethod
+    def build(cls, guild: discord.Guild) -> "CategoryPool":
+        """One pass over the guild's categories; only done when the pool is (re)built."""
+        pool = cls()
+        for category in guild.categories:
+            number = category_number(category.name)
+            if number is not None and number not in pool.numbers.values():
+                pool.add(category, number, len(category.channels))
+        return pool
+
+    def add(self, category: discord.CategoryChannel, number: int, count: int = 0) -> None:
+        """Track a category; one already in the pool (e.g. seen by a rebuild) is left as is."""
+        if category.id in self.categories:
+            return
+        self.categories[category.id] = category
+        self.numbers[category.id] = number
+        self.counts[category.id] = count
+        if count < CATEGORY_CAPACITY:
+            self._reopen(category.id)
+            self.free += CATEGORY_CAPACITY - count
+
+    def _reopen(self, category_id: int) -> None:
+        if category_id not in self._has_room:
+            self._has_room.add(category_id)
+            heapq.heappush(self._open, (self.numbers[category_id], category_id))
+
+    def remove(self, category_id: int) -> None:
+        if category_id in self.categories:
+            self.free -= max(CATEGORY_CAPACITY - self.counts[category_id], 0)
+            del self.categories[category_id], self.numbers[category_id], self.counts[category_id]
+            self._has_room.discard(category_id)
+
+    def place(self) -> Optional[discord.CategoryChannel]:
+        """Reserve a slot in a category with room; None if every category is full."""
+        while self._open and self._open[0][1] not in self._has_room:
+            heapq.heappop(self._open)
+        if not self._open:
+            return None
+        category_id = self._open[0][1]
+        self.occupy(category_id)
+        return self.categories[category_id]
+
+    def occupy(self, category_id: int) -> None:
+        """A channel entered the category."""
+        if category_id in self.counts:
+            self.counts[category_id] += 1
+            self.free -= 1
+            if self.counts[category_id] >= CATEGORY_CAPACITY:
+                self._has_room.discard(category_id)
+
+    def release(self, category_id: int) -> None:
+        """A channel left the category (deleted, moved, or its creation failed)."""
+        if self.counts.get(category_id, 0) > 0:
+            self.counts[category_id] -= 1
+            self.free += 1
+            self._reopen(category_id)
+
+    def mark_full(self, category_id: int) -> None:
+        """Discord refused a channel here; stop placing into it until a channel leaves."""
+        if category_id in self.counts:
+            self.free -= max(CATEGORY_CAPACITY - self.counts[category_id], 0)
+            self.counts[category_id] = CATEGORY_CAPACITY
+            self._has_room.discard(category_id)
+
+    def next_number(self) -> int:
+        used = set(self.numbers.values())
+        return next(n for n in range(1, len(used) + 2) if n not in used)
+
+
+class TicketCategories:
+    """Category pools for every guild, built lazily on the first ticket."""
+
+    def __init__(self):
+        self._pools: Dict[int, CategoryPool] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._growing: Dict[int, asyncio.Task] = {}
+
+    def pool(self, guild: discord.Guild) -> CategoryPool:
+        pool = self._pools.get(guild.id)
+        if pool is None:
+            pool = self._pools[guild.id] = CategoryPool.build(guild)
+        return pool
+
+    async def acquire(self, guild: discord.Guild) -> discord.CategoryChannel:
+        """A category with room for one more ticket, creating one if all are full."""
+        pool = self.pool(guild)
+        category = pool.place()
+        if category is None:
+            await self._grow(guild)
+            pool = self.pool(guild)
+            category = pool.place()
+            if category is None:
+                raise RuntimeError("no ticket category has room")
+        if pool.free < CATEGORY_HEADROOM and guild.id not in self._growing:
+            task = asyncio.get_running_loop().create_task(self._grow_ahead(guild))
+            self._growing[guild.id] = task
+        return category
+
+    def release(self, guild_id: int, category_id: int) -> None:
+        pool = self._pools.get(guild_id)
+        if pool is not None:
+            pool.release(category_id)
+
+    async def create_channel(self, guild: discord.Guild, name: str, overwrites: dict) -> discord.TextChannel:
+        """Create a ticket channel in the pool; a category Discord reports as full is skipped once.
+
+        Any other error (permissions, rate limits, outages, a rejected name)
+        gives the reserved slot back and is raised.
+        """
+        for attempt in range(2):
+            category = await self.acquire(guild)
+            try:
+                return await guild.create_text_channel(name=name, category=category, overwrites=overwrites)
+            except discord.HTTPException as e:
+                if not is_category_full(e):
+                    self.release(guild.id, category.id)
+                    raise
+                # filled by channels created outside the bot
+                self.pool(guild).mark_full(category.id)
+                if attempt:
+                    raise
+            except BaseException:
+                self.release(guild.id, category.id)
+                raise
+        raise AssertionError("unreachable")
+
+    async def _grow(self, guild: discord.Guild) -> None:
+        lock = self._locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:  # one category at a time per guild
+            pool = self.pool(guild)
+            if pool.free >= CATEGORY_HEADROOM:
+                return
+            number = pool.next_number()
+            # creating a category requires Manage Channels
+            category = await guild.create_category(category_name(number))
+            self.pool(guild).add(category, number)
+            print(f"✅ Created ticket category {category.name} in {guild.name}")
+
+    async def _grow_ahead(self, guild: discord.Guild) -> None:
+        try:
+            await self._grow(guild)
+        except Exception as e:
+            print(f"⚠️ Could not create a spare ticket category in {guild.name}: {e}")
+        finally:
+            self._growing.pop(guild.id, None)
+
+    async def _prune(self, guild: discord.Guild, category_id: int) -> None:
+        """Delete an empty overflow category if the others still leave enough headroom."""
+        pool = self._pools.get(guild.id)
+        if pool is None or pool.numbers.get(category_id, 1) == 1 or pool.counts.get(category_id):
+            return
+        if pool.free - CATEGORY_CAPACITY < CATEGORY_HEADROOM:
+            return
+        category = pool.categories[category_id]
+        pool.remove(category_id)
+        try:
+            await category.delete(reason="Empty overflow ticket category")
+        except discord.NotFound:
+            pass
+        except Exception as e:
+            print(f"⚠️ Could not remove empty ticket category {category.name}: {e}")
+
+    def channel_added(self, guild_id: int, category_id: Optional[int]) -> None:
+        pool = self._pools.get(guild_id)
+        if pool is not None:
+            pool.occupy(category_id)
+
+    def channel_removed(self, guild: discord.Guild, category_id: Optional[int]) -> None:
+        pool = self._pools.get(guild.id)
+        if pool is None or category_id not in pool.counts:
+            return
+        pool.release(category_id)
+        if pool.counts[category_id] == 0:
+            asyncio.get_running_loop().create_task(self._prune(guild, category_id))
+
+    def knows(self, guild_id: int, category_id: int) -> bool:
+        pool = self._pools.get(guild_id)
+        return pool is not None and category_id in pool.categories
+
+    def forget(self, guild_id: int) -> None:
+        """Rebuild the guild's pool on its next ticket (categories were changed by hand)."""
+        self._pools.pop(guild_id, None)
+
+
+# Global instance shared by the Ticketing cog and the //ticket command
+ticket_categories = TicketCategories()
+
+
+def setup_ticket_category_listeners(bot) -> None:
+    """Keep the pools' fill counts current from channel events."""
+
+    async def on_guild_channel_create(channel: discord.abc.GuildChannel):
+        # categories the pool creates itself are already known
+        if isinstance(channel, discord.CategoryChannel) and not ticket_categories.knows(channel.guild.id, channel.id):
+            ticket_categories.forget(channel.guild.id)
+
+    async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if isinstance(after, discord.CategoryChannel):
+            if before.name != after.name:
+                ticket_categories.forget(after.guild.id)
+        elif before.category_id != after.category_id:
+            ticket_categories.channel_removed(before.guild, before.category_id)
+            ticket_categories.channel_added(after.guild.id, after.category_id)
+
+    async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+        if isinstance(channel, discord.CategoryChannel):
+            # pruned categories have already left the pool
+            if ticket_categories.knows(channel.guild.id, channel.id):
+                ticket_categories.forget(channel.guild.id)
+        else:
+            ticket_categories.channel_removed(channel.guild, channel.category_id)
+
+    for listener in (on_guild_channel_create, on_guild_channel_update, on_guild_channel_delete):
+        bot.add_listener(listener)
@@ -0,0 +1,142 @@
+"""
+Deadline scheduler for ticket expiry.
+A min-heap of deadlines drives one task that sleeps until the earliest
+one is due, instead of loops that wake every few minutes and scan every
+open ticket.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+Action = Callable[[], Awaitable[None]]
+
+# longest single sleep; bounds the damage of a wall-clock jump
+MAX_SLEEP_SECONDS = 3600.0
+
+
+class ExpiryScheduler:
+    """Runs one action per key when its deadline (epoch seconds) passes.
+
+    ``schedule`` pushes onto the heap (O(log n)); rescheduling a key just
+    schedules it again. ``cancel`` drops the key's live entry in O(1) and
+    leaves the heap entry to be skipped when it surfaces (lazy deletion);
+    the heap is rebuilt once stale entries outnumber live ones, so it
+    never grows past twice the number of open tickets.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._live: Dict[Hashable, Tuple[float, int, Action]] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._firing: Set[asyncio.Task] = set()  # strong refs until each action finishes
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._live
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        entry = self._live.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key: Hashable, deadline: float, action: Action) -> None:
+        """Run ``action()`` at ``deadline``; replaces any earlier schedule for ``key``."""
+        seq = next(self._seq)
+        self._live[key] = (deadline, seq, action)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        self._compact()
+        if self._heap[0][1] == seq:
+            self._wake()  # new earliest deadline: re-arm the sleeper
+
+    def cancel(self, key: Hashable) -> bool:
+        if self._live.pop(key, None) is None:
+            return False
+        self._compact()
+        return True
+
+    def clear(self) -> None:
+        self._live.clear()
+        self._heap.clear()
+
+    def _compact(self) -> None:
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [(d, s, k) for k, (d, s, _) in self._live.items()]
+            heapq.heapify(self._heap)
+
+    def _stale(self, entry: Tuple[float, int, Hashable]) -> bool:
+        live = self._live.get(entry[2])
+        return live is None or live[1] != entry[1]
+
+    def pop_due(self, now: Optional[float] = None) -> List[Tuple[Hashable, Action]]:
+        """Remove and return every (key, action) whose deadline has passed."""
+        now = self._clock() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._stale(entry):
+                due.append((entry[2], self._live.pop(entry[2])[2]))
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        while self._heap and self._stale(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    # ----------------
+    # runner
+    # ----------------
+    def _wake(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # not running yet; start() picks the heap up as it is
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        else:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the runner (safe to call repeatedly; also done by the first schedule())."""
+        self._wake()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @staticmethod
+    async def _fire(key: Hashable, action: Action) -> None:
+        try:
+            await action()
+        except Exception as e:
+            print(f"❌ Expiry action for {key} failed: {e}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # each action runs on its own; a slow one (archiving a transcript) doesn't hold up the rest
+            for key, action in self.pop_due():
+                task = loop.create_task(self._fire(key, action))
+                self._firing.add(task)
+                task.add_done_callback(self._firing.discard)
+            deadline = self.next_deadline()
+            timeout = MAX_SLEEP_SECONDS if deadline is None else min(
+                max(deadline - self._clock(), 0.0), MAX_SLEEP_SECONDS
+            )
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+# one scheduler for every ticket code path, keyed by ticket channel id
+ticket_expiry = ExpiryScheduler()
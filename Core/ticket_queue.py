@@ -0,0 +1,137 @@
+"""
+Ticket creation pipeline.
+Creations run through a FIFO queue with a few slots, so a burst of
+//ticket at a deadline is paced instead of hammering channel creation,
+and a user can only have one creation in flight. The admin-role
+overwrites are cached per guild and dropped when roles change (ticket
+categories are handled by Core/ticket_categories.py).
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Set
+
+import discord
+
+# channel creations in flight at once; discord.py waits out 429s, this keeps bursts from hitting them
+TICKET_CREATE_CONCURRENCY = 3
+
+Overwrites = Dict[object, discord.PermissionOverwrite]
+# on_queued(position): position is 1 for "next in line"
+OnQueued = Callable[[int], Awaitable[None]]
+
+
+def _allow() -> discord.PermissionOverwrite:
+    return discord.PermissionOverwrite(view_channel=True, send_messages=True)
+
+
+class TicketQueue:
+    """Per-user in-flight guard, bounded FIFO of creations and the per-guild template cache."""
+
+    def __init__(self, concurrency: int = TICKET_CREATE_CONCURRENCY):
+        self.concurrency = concurrency
+        self._running = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._in_flight: Set[int] = set()
+        self._templates: Dict[int, Overwrites] = {}
+
+    def in_flight(self, user_id: int) -> bool:
+        return user_id in self._in_flight
+
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, user_id: int, on_queued: Optional[OnQueued] = None) -> AsyncIterator[None]:
+        """Hold one creation slot for ``user_id``.
+
+        The user is marked in flight before the first await, so checking
+        ``in_flight`` (and the ticket store) right before entering cannot
+        race with a second invocation.
+        """
+        self._in_flight.add(user_id)
+        try:
+            await self._acquire(on_queued)
+            try:
+                yield
+            finally:
+                self._release()
+        finally:
+            self._in_flight.discard(user_id)
+
+    async def _acquire(self, on_queued: Optional[OnQueued]) -> None:
+        if self._running < self.concurrency and not self._waiters:
+            self._running += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if on_queued is not None:
+            try:
+                await on_queued(len(self._waiters))
+            except Exception as e:
+                print(f"⚠️ Queue position update failed: {e}")
+        try:
+            await waiter  # _release hands its slot over; _running is unchanged
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # slot was handed to us as we got cancelled
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    # ----------------
+    # per-guild template
+    # ----------------
+    def template(self, guild: discord.Guild) -> Overwrites:
+        """The overwrites every ticket in ``guild`` shares: hide @everyone, allow the bot and Administrator roles."""
+        overwrites = self._templates.get(guild.id)
+        if overwrites is None:
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(view_channel=False),
+                guild.me: _allow()
+            }
+            for role in guild.roles:
+                if role.permissions.administrator:
+                    overwrites[role] = _allow()
+            self._templates[guild.id] = overwrites
+        return overwrites
+
+    def ticket_overwrites(self, guild: discord.Guild, author: discord.abc.User) -> Overwrites:
+        overwrites = dict(self.template(guild))
+        overwrites[author] = _allow()
+        return overwrites
+
+    def invalidate(self, guild_id: int) -> None:
+        self._templates.pop(guild_id, None)
+
+
+# Global instance shared by the Ticketing cog and the //ticket command
+ticket_queue = TicketQueue()
+
+
+def setup_ticket_queue_listeners(bot) -> None:
+    """Drop a guild's cached template when its Administrator roles change."""
+
+    async def on_guild_role_create(role: discord.Role):
+        if role.permissions.administrator:
+            ticket_queue.invalidate(role.guild.id)
+
+    async def on_guild_role_update(before: discord.Role, after: discord.Role):
+        if before.permissions.administrator != after.permissions.administrator:
+            ticket_queue.invalidate(after.guild.id)
+
+    async def on_guild_role_delete(role: discord.Role):
+        if role.permissions.administrator:
+            ticket_queue.invalidate(role.guild.id)
+
+    for listener in (on_guild_role_create, on_guild_role_update, on_guild_role_delete):
+        bot.add_listener(listener)
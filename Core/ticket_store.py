@@ -0,0 +1,137 @@
+"""
+Durable store of open tickets.
+Every open and close is appended to a JSONL log as it happens; a small
+debounced snapshot (cache/tickets.json) folds the log in. After a
+restart the bot still knows each ticket's owner, channel, guild and
+expiry.
+"""
+
+from collections.abc import MutableMapping
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, Optional
+
+from .member_records import to_timestamp
+from .persistence import SnapshotLog
+
+TICKETS_FILE = "cache/tickets.json"
+TICKETS_LOG_DIR = "cache/tickets_log"
+# opens/closes are logged immediately; the snapshot only compacts the log
+TICKET_SAVE_DELAY = 30.0
+
+
+def _from_timestamp(value: int) -> datetime:
+    # tickets keep expiry as naive UTC, like datetime.utcnow()
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+class TicketStore(MutableMapping):
+    """``{owner_id: {"channel_id", "guild_id", "expires"}}``.
+
+    Assigning a ticket logs an open, deleting or popping it logs a close,
+    so the dict API the ticket commands already used stays the write path.
+    """
+
+    def __init__(self, path: str = TICKETS_FILE, log_dir: str = TICKETS_LOG_DIR,
+                 delay: float = TICKET_SAVE_DELAY):
+        self.path = path
+        self._tickets: Dict[int, dict] = {}
+        self._owners: Dict[int, int] = {}  # channel id -> owner id
+        self._snapshots = SnapshotLog(path, log_dir, "ticket", self._snapshot, delay)
+
+    def __getitem__(self, owner_id: int) -> dict:
+        return self._tickets[owner_id]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._tickets)
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __setitem__(self, owner_id: int, ticket: dict) -> None:
+        self._put(owner_id, ticket)
+        self._append({"op": "open", "ticket": self._row(owner_id, ticket)})
+
+    def __delitem__(self, owner_id: int) -> None:
+        self._drop(owner_id)
+        self._append({"op": "close", "owners": [owner_id]})
+
+    def owner_of(self, channel_id: int) -> Optional[int]:
+        return self._owners.get(channel_id)
+
+    def remove_many(self, owner_ids: Iterable[int]) -> int:
+        """Forget several tickets with a single log record."""
+        owner_ids = [oid for oid in owner_ids if oid in self._tickets]
+        for owner_id in owner_ids:
+            self._drop(owner_id)
+        if owner_ids:
+            self._append({"op": "close", "owners": owner_ids})
+        return len(owner_ids)
+
+    def _put(self, owner_id: int, ticket: dict) -> None:
+        previous = self._tickets.get(owner_id)
+        if previous is not None:
+            self._owners.pop(previous["channel_id"], None)
+        self._tickets[owner_id] = ticket
+        self._owners[ticket["channel_id"]] = owner_id
+
+    def _drop(self, owner_id: int) -> None:
+        ticket = self._tickets.pop(owner_id)
+        self._owners.pop(ticket["channel_id"], None)
+
+    def _append(self, record: dict) -> None:
+        self._snapshots.append(record)
+        self._snapshots.touch()
+
+    @staticmethod
+    def _row(owner_id: int, ticket: dict) -> list:
+        return [owner_id, ticket["channel_id"], ticket.get("guild_id"), to_timestamp(ticket["expires"])]
+
+    @staticmethod
+    def _ticket(row: list) -> dict:
+        """Parse a ``_row`` row; raises ValueError for any other layout."""
+        if not isinstance(row, list) or len(row) != 4:
+            raise ValueError(f"malformed ticket row {row!r}")
+        _, channel_id, guild_id, expires = row
+        return {"channel_id": channel_id, "guild_id": guild_id, "expires": _from_timestamp(expires)}
+
+    def _load_row(self, row: list) -> None:
+        try:
+            self._put(row[0], self._ticket(row))
+        except ValueError as e:
+            print(f"⚠️ Skipped {e}")
+
+    # ----------------
+    # persistence
+    # ----------------
+    def load(self) -> int:
+        """Read the snapshot and replay the log tail; returns the number of open tickets."""
+        self._tickets.clear()
+        self._owners.clear()
+        data, records = self._snapshots.load()
+        for row in (data or {}).get("tickets", ()):
+            self._load_row(row)
+
+        for record in records:
+            if record["op"] == "open":
+                self._load_row(record["ticket"])
+            else:
+                for owner_id in record["owners"]:
+                    if owner_id in self._tickets:
+                        self._drop(owner_id)
+        return len(self._tickets)
+
+    def _snapshot(self) -> dict:
+        return {"tickets": [self._row(owner_id, t) for owner_id, t in self._tickets.items()]}
+
+    async def flush(self) -> None:
+        await self._snapshots.flush()
+
+    def flush_sync(self) -> None:
+        self._snapshots.flush_sync()
+
+    def close(self) -> None:
+        self._snapshots.close()
+
+
+# Global instance shared by the Ticketing cog and the //ticket command
+ticket_store = TicketStore()
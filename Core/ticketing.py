@@ -2,65 +2,140 @@
 Ticketing Cog.
 - Admins can toggle ticketing on/off.
 - Users can create a private ticket channel with $ticket.
-- Ticket channels auto-delete after 2 days.
+- Ticket channels auto-delete after 2 days (see Core/ticket_expiry.py).
+- Open tickets are persisted (Core/ticket_store.py) and re-armed on startup.
+- Transcripts are archived before a ticket channel is deleted (Core/ticket_archive.py).
 All bot responses in this cog are embeds.
 """
 
 import discord
-from discord.ext import commands, tasks
-from datetime import datetime, timedelta
+from discord.ext import commands
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
 from Core import compile_members
-from discord.ui import View, button
+from Core.ticket_archive import transcript_archive
+from Core.ticket_expiry import ticket_expiry
+from Core.ticket_queue import setup_ticket_queue_listeners, ticket_queue
+from Core.ticket_categories import setup_ticket_category_listeners, ticket_categories
+from Core.ticket_store import TicketStore, ticket_store
+from discord.ui import DynamicItem, View
+
+TICKET_LIFETIME = timedelta(days=2)
+
+
+async def expire_ticket(bot, active_tickets: TicketStore, author_id: int, channel_id: int):
+    """Delete an expired ticket channel and forget it (unless the user has a newer ticket)."""
+    if active_tickets.owner_of(channel_id) == author_id:
+        active_tickets.pop(author_id, None)
+    ch = bot.get_channel(channel_id)
+    if ch:
+        await transcript_archive.archive(ch, author_id, reason="expired")
+        try:
+            await ch.delete(reason="Ticket expired (2 days)")
+        except Exception:
+            pass
+
+
+def schedule_ticket_expiry(bot, active_tickets: TicketStore, author_id: int, channel_id: int, expires: datetime):
+    """Arm the expiry for one ticket; ``expires`` is naive UTC like the stored value."""
+    deadline = expires.replace(tzinfo=timezone.utc).timestamp()
+    ticket_expiry.schedule(
+        channel_id, deadline, lambda: expire_ticket(bot, active_tickets, author_id, channel_id)
+    )
+
+
+# matches "ticket:close:<channel_id>", and the static id that buttons sent
+# before ticket ids were encoded (resolved from the channel clicked in)
+CLOSE_TICKET_TEMPLATE = r"ticket:close:(?P<channel_id>[0-9]+)|close_ticket_button"
+
 
-class CloseTicketView(View):
-    def __init__(self, active_tickets: dict, channel_id: int, author_id: int):
-        super().__init__(timeout=None)  # required for persistence
-        self.active_tickets = active_tickets
+class CloseTicketButton(DynamicItem[discord.ui.Button], template=CLOSE_TICKET_TEMPLATE):
+    """The "Close Ticket" button. Registered once with ``bot.add_dynamic_items``;
+    each click is routed here by custom_id, so no per-ticket view is kept."""
+
+    def __init__(self, channel_id: int):
+        super().__init__(discord.ui.Button(
+            label="Close Ticket",
+            style=discord.ButtonStyle.red,
+            emoji="🗑️",
+            custom_id=f"ticket:close:{channel_id}"
+        ))
         self.channel_id = channel_id
-        self.author_id = author_id
 
-    @button(
-        label="Close Ticket",
-        style=discord.ButtonStyle.red,
-        emoji="🗑️",
-        custom_id="close_ticket_button"  # 👈 required for persistence
-    )
-    async def close_ticket(self, interaction: discord.Interaction, btn: discord.ui.Button):
-        if interaction.user.id != self.author_id and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                "❌ Only the ticket creator or an admin can close this ticket.",
-                ephemeral=True
-            )
-            return
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match["channel_id"] or interaction.channel_id))
+
+    async def callback(self, interaction: discord.Interaction):
+        await close_ticket(interaction, self.channel_id)
 
-        channel = interaction.guild.get_channel(self.channel_id)
-        if channel:
-            await interaction.response.send_message("✅ Closing ticket...", ephemeral=True)
-            try:
-                await channel.delete(reason=f"Closed by {interaction.user}")
-            except Exception as e:
-                await interaction.followup.send(f"❌ Failed to close ticket: {e}", ephemeral=True)
 
-        # remove from active store
-        self.active_tickets.pop(self.author_id, None)
+def close_ticket_view(channel_id: int) -> View:
+    """View carrying the close button for a new ticket's welcome message."""
+    view = View(timeout=None)
+    view.add_item(CloseTicketButton(channel_id))
+    # stopped views are not stored per message; the dynamic item handles clicks
+    view.stop()
+    return view
+
+
+async def close_ticket(interaction: discord.Interaction, channel_id: int, store: TicketStore = ticket_store):
+    owner_id = store.owner_of(channel_id)
+    if interaction.user.id != owner_id and not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message(
+            "❌ Only the ticket creator or an admin can close this ticket.",
+            ephemeral=True
+        )
+        return
+
+    # remove from active store
+    if owner_id is not None:
+        store.pop(owner_id, None)
+    ticket_expiry.cancel(channel_id)
+
+    channel = interaction.guild.get_channel(channel_id)
+    if channel:
+        await interaction.response.send_message("✅ Closing ticket...", ephemeral=True)
+        await transcript_archive.archive(channel, owner_id, reason=f"closed by {interaction.user}")
+        try:
+            await channel.delete(reason=f"Closed by {interaction.user}")
+        except Exception as e:
+            await interaction.followup.send(f"❌ Failed to close ticket: {e}", ephemeral=True)
+
+
+def reconcile_tickets(bot, store: TicketStore = ticket_store) -> Tuple[int, int, int]:
+    """Startup pass over the stored tickets, against the channels already in the gateway cache.
+
+    Tickets whose channel (or guild) is gone are dropped with one log
+    record; the rest get their expiry re-armed, and overdue ones expire
+    right away. No API calls besides those deletions (close buttons need
+    no re-arming: CloseTicketButton resolves any ticket from its custom_id).
+    Returns (open, dropped, overdue).
+    """
+    store.load()  # a few hundred rows at most
+    now = datetime.utcnow()
+    gone, overdue = [], 0
+    for owner_id, data in list(store.items()):
+        guild = bot.get_guild(data["guild_id"]) if data.get("guild_id") else None
+        if guild is not None and guild.unavailable:
+            continue  # outage, not a deleted channel; keep the ticket as is
+        channel = guild.get_channel(data["channel_id"]) if guild else bot.get_channel(data["channel_id"])
+        if channel is None:
+            gone.append(owner_id)
+            continue
+        if data["expires"] <= now:
+            overdue += 1
+        schedule_ticket_expiry(bot, store, owner_id, data["channel_id"], data["expires"])
+    dropped = store.remove_many(gone)
+    return len(store) - overdue, dropped, overdue
 
 
 class Ticketing(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.enabled = False
-        self.active_tickets = {}  # user_id -> {channel_id, expires}
-        # don't start loop here; start on_ready
-
-    # start cleanup when bot ready
-    @commands.Cog.listener()
-    async def on_ready(self):
-        if not self.cleanup_task.is_running():
-            self.cleanup_task.start()
-
-    def cog_unload(self):
-        if self.cleanup_task.is_running():
-            self.cleanup_task.cancel()
+        self.active_tickets = ticket_store  # user_id -> {channel_id, guild_id, expires}
+        # expiry is armed per ticket on the shared ticket_expiry scheduler
 
     # ----------------
     # admin toggle
@@ -96,33 +171,29 @@ class Ticketing(commands.Cog):
             ))
             return
 
+        if ticket_queue.in_flight(ctx.author.id):
+            await ctx.send(embed=discord.Embed(
+                description="⏳ Your ticket is already being created.",
+                color=discord.Color.orange()
+            ))
+            return
+
+        async def announce_position(position: int):
+            await ctx.send(embed=discord.Embed(
+                description=f"⏳ You're **#{position}** in the ticket queue.",
+                color=discord.Color.orange()
+            ))
+
         guild = ctx.guild
-        category = discord.utils.get(guild.categories, name="Tickets")
-        if not category:
-            category = await guild.create_category("Tickets")
-
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            ctx.author: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        }
-
-        # allow server admins (roles with administrator) to view
-        for role in guild.roles:
-            if role.permissions.administrator:
-                overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-
-        channel = await guild.create_text_channel(
-            name=f"ticket-{ctx.author.name}",
-            category=category,
-            overwrites=overwrites
-        )
+        async with ticket_queue.slot(ctx.author.id, announce_position):
+            # admin overwrites are cached per guild; the pool picks a category with room
+            channel = await ticket_categories.create_channel(
+                guild, f"ticket-{ctx.author.name}", ticket_queue.ticket_overwrites(guild, ctx.author)
+            )
 
-        expires = datetime.utcnow() + timedelta(days=2)
-        self.active_tickets[ctx.author.id] = {"channel_id": channel.id, "expires": expires}
-        # attach the CloseTicketView
-        view = CloseTicketView(self.bot, self.active_tickets, channel.id, ctx.author.id)
-        self.bot.add_view(view)  # persistent after restart
+            expires = datetime.utcnow() + TICKET_LIFETIME
+            self.active_tickets[ctx.author.id] = {"channel_id": channel.id, "guild_id": guild.id, "expires": expires}
+            schedule_ticket_expiry(self.bot, self.active_tickets, ctx.author.id, channel.id, expires)
 
         await channel.send(
             embed=discord.Embed(
@@ -133,7 +204,7 @@ class Ticketing(commands.Cog):
                 ),
                 color=discord.Color.blue()
             ),
-            view=view  # ✅ button is attached here
+            view=close_ticket_view(channel.id)  # ✅ button is attached here
         )
 
         await ctx.send(embed=discord.Embed(
@@ -141,31 +212,10 @@ class Ticketing(commands.Cog):
             color=discord.Color.green()
         ))
 
-    # ----------------
-    # cleanup loop
-    # ----------------
-    @tasks.loop(minutes=10)
-    async def cleanup_task(self):
-        now = datetime.utcnow()
-        to_remove = []
-        for uid, data in list(self.active_tickets.items()):
-            if data["expires"] <= now:
-                ch = self.bot.get_channel(data["channel_id"])
-                if ch:
-                    try:
-                        await ch.delete(reason="Ticket expired (2 days)")
-                    except Exception:
-                        pass
-                to_remove.append(uid)
-
-        for uid in to_remove:
-            self.active_tickets.pop(uid, None)
-
-    @cleanup_task.before_loop
-    async def before_cleanup(self):
-        await self.bot.wait_until_ready()
-
 
 # helper to install cog easily from main
 def setup_ticketing(bot):
+    bot.add_dynamic_items(CloseTicketButton)
+    setup_ticket_queue_listeners(bot)
+    setup_ticket_category_listeners(bot)
     bot.add_cog(Ticketing(bot))
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Startup warm-up for the bot's caches.
+After login the member cache and the guild leaderboards load, and the
+stored tickets are reconciled, in a background task. Commands wait briefly on a readiness gate and are told
+the bot is warming up if it takes longer. Phase timings are kept for a
+startup report.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from discord.ext import commands
+
+# how long a command waits on the gate before getting the "warming up" reply
+WARMUP_WAIT_SECONDS = 5.0
+
+
+class WarmingUp(commands.CheckFailure):
+    """Raised by the readiness gate when a command arrives before warm-up finished."""
+
+
+class Warmup:
+    """Readiness gate plus a phase-by-phase startup timing report.
+
+    ``started`` is a ``time.perf_counter()`` taken as early as possible in
+    the process; every phase and the first command are measured against it.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.timings: Dict[str, float] = {}  # phase -> seconds, in order
+        self.ready = asyncio.Event()
+        self.first_command: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def mark(self, phase: str, seconds: float) -> None:
+        self.timings[phase] = seconds
+
+    def since_start(self) -> float:
+        return time.perf_counter() - self.started
+
+    def start(self, bot) -> None:
+        """Start the warm-up task once (on_ready also fires on reconnects)."""
+        if self._task is None:
+            self.mark("login", self.since_start() - sum(self.timings.values()))
+            self._task = asyncio.get_running_loop().create_task(self._run(bot))
+
+    async def _run(self, bot) -> None:
+        # imported here so `import Core.warmup` stays light
+        from .compile_members import get_member_cache
+        from .leaderboard import leaderboards
+        from .ticketing import reconcile_tickets
+
+        try:
+            load_s, index_s = await get_member_cache().load_cache_async()
+            self.mark("members file load", load_s)
+            self.mark("members index build", index_s)
+
+            t = time.perf_counter()
+            boards = await leaderboards.preload(bot.guilds)
+            self.mark(f"leaderboards load ({boards} guilds)", time.perf_counter() - t)
+        except Exception as e:
+            print(f"❌ Warm-up failed, caches will load on demand: {e}")
+        try:
+            t = time.perf_counter()
+            open_, dropped, overdue = reconcile_tickets(bot)
+            self.mark(f"tickets reconcile ({open_} open, {dropped} gone, {overdue} overdue)",
+                      time.perf_counter() - t)
+        except Exception as e:
+            print(f"❌ Ticket reconcile failed: {e}")
+        finally:
+            self.mark("time to ready", self.since_start())
+            self.ready.set()
+            print(self.report())
+
+    async def wait(self, timeout: float = WARMUP_WAIT_SECONDS) -> bool:
+        """True once warm-up is done; False if it is still running after ``timeout``."""
+        if self.ready.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def command_done(self) -> None:
+        if self.first_command is None:
+            self.first_command = self.since_start()
+            print(f"✅ First command completed {self.first_command:.2f}s after start")
+
+    def report(self) -> str:
+        lines = ["Startup timings:"]
+        lines += [f"  {phase}: {seconds:.2f}s" for phase, seconds in self.timings.items()]
+        if self.first_command is not None:
+            lines.append(f"  first command: {self.first_command:.2f}s")
+        return "\n".join(lines)
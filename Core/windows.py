@@ -0,0 +1,67 @@
+"""
+Time-windowed leaderboards (rolling week/month, named seasons).
+Wins are kept as per-day buckets; a window sums a bounded range of
+buckets once and is then updated incrementally as wins change and as
+days roll off its start.
+"""
+
+from datetime import date
+from typing import Dict, Optional
+
+from .rank_index import RankIndex
+
+# buckets older than this are dropped; also the longest season we can rank
+BUCKET_RETENTION_DAYS = 400
+
+# rolling windows: name -> length in days (today included)
+ROLLING_WINDOWS = {"week": 7, "month": 30}
+
+DailyBuckets = Dict[int, Dict[int, int]]  # {day ordinal: {user_id: net wins that day}}
+
+
+def today() -> int:
+    return date.today().toordinal()
+
+
+class WindowBoard:
+    """Wins summed over days ``start``..``end`` (``end=None`` = through today).
+
+    Holds its own RankIndex, so window queries use the same ranked path as
+    the all-time board. Users whose window total is not positive are left
+    out of the index.
+    """
+
+    def __init__(self, daily: DailyBuckets, start: int, end: Optional[int] = None):
+        self.daily = daily
+        self.start = start
+        self.end = end
+        self.totals: Dict[int, int] = {}
+        self.index = RankIndex()
+        last = end if end is not None else max(daily, default=start)
+        for day in range(start, last + 1):
+            for user_id, delta in daily.get(day, {}).items():
+                self.totals[user_id] = self.totals.get(user_id, 0) + delta
+        self.index.build((uid, total) for uid, total in self.totals.items() if total > 0)
+
+    def _bump(self, user_id: int, delta: int) -> None:
+        total = self.totals.get(user_id, 0) + delta
+        if total:
+            self.totals[user_id] = total
+        else:
+            self.totals.pop(user_id, None)
+        if total > 0:
+            self.index.set(user_id, total)
+        else:
+            self.index.remove(user_id)
+
+    def apply(self, day: int, user_id: int, delta: int) -> None:
+        """Fold one new change into the window if its day is covered."""
+        if self.start <= day and (self.end is None or day <= self.end):
+            self._bump(user_id, delta)
+
+    def slide(self, new_start: int) -> None:
+        """Move the start forward, subtracting the buckets that fall out."""
+        for day in range(self.start, new_start):
+            for user_id, delta in self.daily.get(day, {}).items():
+                self._bump(user_id, -delta)
+        self.start = max(self.start, new_start)
@@ -0,0 +1,4 @@
+"""
+Micro-benchmarks for the bot's caches and indexes.
+Run one from the repository root, e.g.:  python -m benchmarks.bench_rank_index
+"""
@@ -0,0 +1,61 @@
+"""
+Autocomplete latency of PrefixIndex: bulk build, lookups with 1-4
+typed characters, and a single-member update followed by a lookup (the
+insort path taken for gateway events).
+
+Usage:  python -m benchmarks.bench_autocomplete [n_members ...]
+"""
+
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+from Core.member_search import PrefixIndex
+
+from .synthetic import synthetic_details, synthetic_name
+
+LOOKUPS = 2000
+UPDATES = 200
+LIMIT = 25  # Discord shows at most 25 choices
+
+
+def percentiles(samples: List[float]) -> str:
+    cuts = statistics.quantiles(samples, n=100)
+    return f"p50 {cuts[49] * 1e6:.0f} us, p99 {cuts[98] * 1e6:.0f} us"
+
+
+def run(n: int) -> None:
+    details = list(synthetic_details(n))
+    index = PrefixIndex()
+    t = time.perf_counter()
+    for d in details:
+        index.add(d["id"], (d["name"], d["display_name"], d["nick"]))
+    len(index)  # merges the bulk load
+    build = time.perf_counter() - t
+
+    rng = random.Random(3)
+    prefixes = [d["name"][:rng.randint(1, 4)] for d in rng.choices(details, k=LOOKUPS)]
+    lookups = []
+    for prefix in prefixes:
+        t = time.perf_counter()
+        index.complete(prefix, LIMIT)
+        lookups.append(time.perf_counter() - t)
+
+    updates = []
+    for d in rng.sample(details, UPDATES):
+        new_name = synthetic_name(rng)
+        t = time.perf_counter()
+        index.remove(d["id"], (d["name"], d["display_name"], d["nick"]))
+        index.add(d["id"], (new_name, d["display_name"], d["nick"]))
+        index.complete(new_name[:2], LIMIT)
+        updates.append(time.perf_counter() - t)
+
+    print(f"{n:>9,} members: bulk build {build:.2f} s; lookup {percentiles(lookups)}; "
+          f"update + lookup p50 {statistics.median(updates) * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        run(size)
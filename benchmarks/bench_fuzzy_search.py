@@ -0,0 +1,73 @@
+"""
+Latency and recall of TrigramIndex.fuzzy on misspelled queries.
+
+Each query is a member's name with one random typo (substitution,
+insertion, deletion or transposition). Exits with status 1 when the p95
+latency is over BUDGET_MS, so a regression fails loudly.
+
+Usage:  python -m benchmarks.bench_fuzzy_search [n_members] [queries]
+"""
+
+import random
+import statistics
+import string
+import sys
+import time
+from typing import List, Tuple
+
+from Core.member_search import TrigramIndex
+
+from .synthetic import synthetic_details
+
+BUDGET_MS = 50.0  # //search_member must stay well under this at 100k members
+TOP_K = 10
+
+
+def with_typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    kind = rng.choice(("substitute", "insert", "delete", "transpose"))
+    if kind == "substitute":
+        return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+    if kind == "insert":
+        return name[:i] + rng.choice(string.ascii_lowercase) + name[i:]
+    if kind == "delete" and len(name) > 3:
+        return name[:i] + name[i + 1:]
+    i = min(i, len(name) - 2)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100)[int(q) - 1]
+
+
+def run(n: int, count: int) -> Tuple[float, float]:
+    details = list(synthetic_details(n))
+    index = TrigramIndex()
+    t = time.perf_counter()
+    for d in details:
+        index.add(d["id"], (d["name"], d["display_name"], d["nick"]))
+    build = time.perf_counter() - t
+
+    rng = random.Random(7)
+    targets = rng.sample(details, count)
+    latencies, found = [], 0
+    for d in targets:
+        query = with_typo(d["name"], rng)
+        t = time.perf_counter()
+        hits = index.fuzzy(query, TOP_K)
+        latencies.append((time.perf_counter() - t) * 1e3)
+        found += any(member_id == d["id"] for member_id, _ in hits)
+
+    p95 = percentile(latencies, 95)
+    print(f"{n:,} members (index build {build:.2f} s), {count} queries with one typo, top-{TOP_K}:")
+    print(f"  p50 {percentile(latencies, 50):.2f} ms   p95 {p95:.2f} ms   max {max(latencies):.2f} ms")
+    print(f"  recall@{TOP_K}: {found / count:.0%}")
+    return p95, found / count
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    p95, _ = run(*(args + [100_000, 300][len(args):]))
+    if p95 > BUDGET_MS:
+        print(f"❌ p95 {p95:.2f} ms is over the {BUDGET_MS:.0f} ms budget")
+        sys.exit(1)
@@ -0,0 +1,93 @@
+"""
+Memory of the member cache: slotted records with interned roles against
+the name map + details dicts they replaced, measured with tracemalloc.
+Both layouts are built from JSON rows, as a load from disk would, so
+each one pays for its own strings.
+
+Usage:  python -m benchmarks.bench_member_memory [n_members]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+from Core.compile_members import MemberCache
+from Core.member_records import MemberRecord, RoleTable
+from Core.storage import MemberStore
+
+from .synthetic import synthetic_details
+
+
+class RowStore(MemberStore):
+    def __init__(self, rows: List[str]):
+        self.rows = rows
+
+    def load(self):
+        return (json.loads(row) for row in self.rows), None
+
+
+def build_dicts(rows: List[str]) -> Tuple[dict, dict]:
+    """The pre-record layout: members_dict plus member_details with string timestamps."""
+    members_dict, member_details = {}, {}
+    for row in rows:
+        d = json.loads(row)
+        for key in ("joined_at", "created_at"):
+            d[key] = str(datetime.fromtimestamp(d[key], timezone.utc))
+        members_dict[d["id"]] = d["name"]
+        member_details[d["id"]] = d
+    return members_dict, member_details
+
+
+def build_records(rows: List[str]) -> Tuple[dict, RoleTable]:
+    records, roles = {}, RoleTable()
+    for row in rows:
+        record = MemberRecord.from_details(json.loads(row), roles)
+        records[record.id] = record
+    return records, roles
+
+
+def traced(build: Callable[[List[str]], object], rows: List[str]) -> int:
+    """Bytes still held by what ``build`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    kept = build(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def legacy_cache_info(member_details: dict) -> float:
+    """The old get_cache_info size estimate: the repr of every details dict."""
+    return len(str(member_details)) / (1024 * 1024)
+
+
+def run(n: int) -> None:
+    rows = [json.dumps(d) for d in synthetic_details(n)]
+    print(f"{n:,} synthetic members")
+    for label, build in (("before (name map + details dicts)", build_dicts),
+                         ("after (records + role table)", build_records)):
+        size = traced(build, rows)
+        print(f"  {label:<34} {size / 2 ** 20:7.1f} MiB, {size // n} B/member")
+
+    _, member_details = build_dicts(rows)
+    t = time.perf_counter()
+    legacy_cache_info(member_details)
+    legacy = time.perf_counter() - t
+    del member_details
+
+    cache = MemberCache(store=RowStore(rows))
+    cache.load_cache_from_file()
+    t = time.perf_counter()
+    info = cache.get_cache_info()
+    current = time.perf_counter() - t
+    print(f"  get_cache_info: {legacy * 1e3:.1f} ms (len(str(...))) -> {current * 1e3:.3f} ms "
+          f"(reports {info['bytes_per_member']} B/member)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,61 @@
+"""
+TrigramIndex substring search against the linear scan it replaced.
+
+Usage:  python -m benchmarks.bench_member_search [n_members ...]
+"""
+
+import gc
+import sys
+import time
+from typing import Dict, List
+
+from Core.member_search import TrigramIndex
+
+from .synthetic import synthetic_details, synthetic_queries
+
+QUERIES = 200
+LIMIT = 25
+
+
+def linear_search(member_details: Dict[int, dict], query: str) -> List[dict]:
+    """The pre-index MemberCache.search_members."""
+    results = []
+    query_lower = query.lower()
+    for details in member_details.values():
+        if (query_lower in details['name'].lower()
+                or query_lower in details['display_name'].lower()
+                or (details['nick'] and query_lower in details['nick'].lower())):
+            results.append(details)
+    return results
+
+
+def run(n: int) -> None:
+    member_details = {d["id"]: d for d in synthetic_details(n)}
+    queries = synthetic_queries(list(member_details.values()), QUERIES)
+
+    gc.collect()
+    t = time.perf_counter()
+    index = TrigramIndex()
+    for d in member_details.values():
+        index.add(d["id"], (d["name"], d["display_name"], d["nick"]))
+    build = time.perf_counter() - t
+
+    scans = max(3, QUERIES * 10_000 // n)
+    t = time.perf_counter()
+    for query in queries[:scans]:
+        linear_search(member_details, query)
+    linear = (time.perf_counter() - t) / scans
+
+    t = time.perf_counter()
+    hits = 0
+    for query in queries:
+        hits += len(index.search(query, LIMIT))
+    indexed = (time.perf_counter() - t) / QUERIES
+
+    print(f"{n:>9,} members: linear {linear * 1e3:8.2f} ms   trigram {indexed * 1e3:7.3f} ms   "
+          f"(build {build:.2f} s, {hits / QUERIES:.1f} hits/query)")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]:
+        run(size)
@@ -0,0 +1,84 @@
+"""
+The v2 NDJSON member snapshot against the legacy members.json: file
+size, write time, parse time, full cache load and peak memory while
+loading (tracemalloc).
+
+Usage:  python -m benchmarks.bench_member_snapshot [n_members]
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable
+
+from Core.compile_members import MemberCache
+from Core.storage import JsonMemberStore
+
+from .synthetic import synthetic_details
+
+
+def write_legacy(path: str, details: list) -> None:
+    """The pre-v2 save_cache_to_file: every member twice, indent=4, string timestamps."""
+    member_details = {}
+    for d in details:
+        d = dict(d)
+        for key in ("joined_at", "created_at"):
+            d[key] = str(datetime.fromtimestamp(d[key], timezone.utc))
+        member_details[str(d["id"])] = d
+    data = {
+        "members_dict": {str(d["id"]): d["name"] for d in details},
+        "member_details": member_details,
+        "last_updated": datetime.now().isoformat()
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def peak_memory(fn: Callable[[], object]) -> int:
+    """Peak traced bytes during one call of ``fn`` (a separate run: tracing slows it down)."""
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def timed(fn: Callable[..., object], *args) -> float:
+    gc.collect()
+    t = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t
+
+
+def run(n: int) -> None:
+    details = list(synthetic_details(n))
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, "members.json")
+        v2_path = os.path.join(directory, "members.ndjson")
+        log_dir = os.path.join(directory, "log")
+        legacy = JsonMemberStore(os.path.join(directory, "missing.ndjson"), log_dir, legacy_path)
+        v2 = JsonMemberStore(v2_path, log_dir, legacy_path)
+
+        write = {"legacy": timed(write_legacy, legacy_path, details),
+                 "v2": timed(v2.save_all, details, None)}
+        del details
+
+        print(f"{n:,} synthetic members")
+        for label, store, path in (("legacy", legacy, legacy_path), ("v2", v2, v2_path)):
+            parse = timed(lambda: sum(1 for _ in store.load()[0]))
+            load = timed(MemberCache(store=store).load_cache_from_file)
+            peak = peak_memory(MemberCache(store=store).load_cache_from_file)
+            print(f"  {label:<6} file {os.path.getsize(path) / 2 ** 20:6.1f} MiB   write {write[label]:.2f} s   "
+                  f"parse {parse:.2f} s   full load {load:.2f} s   peak {peak / 2 ** 20:.0f} MiB")
+        legacy.close()
+        v2.close()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
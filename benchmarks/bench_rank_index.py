@@ -0,0 +1,91 @@
+"""
+RankIndex against the sort-based get_rank / get_leaderboard it replaced,
+then a board where almost everyone is tied on 0 wins (a freshly cached
+guild): "jump to my position", deep pages and updates inside that tie.
+
+Usage:  python -m benchmarks.bench_rank_index [n_users ...]
+"""
+
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from Core.rank_index import RankIndex
+
+QUERIES = 200
+TIED_SHARE = 0.95  # users on 0 wins in the tied case
+PAGE = 10
+
+
+def sorted_top(scores: Dict[int, dict], top_n: int = 10) -> List[dict]:
+    """The pre-index Leaderboard.get_leaderboard."""
+    return sorted(scores.values(), key=lambda x: x["wins"], reverse=True)[:top_n]
+
+
+def sorted_rank(scores: Dict[int, dict], user_id: int) -> Optional[int]:
+    """The pre-index Leaderboard.get_rank."""
+    sorted_scores = sorted(scores.items(), key=lambda x: x[1]["wins"], reverse=True)
+    for idx, (uid, _) in enumerate(sorted_scores, start=1):
+        if uid == user_id:
+            return idx
+    return None
+
+
+def per_call(fn, calls: int) -> float:
+    """Average seconds per call of ``fn(i)`` over ``calls`` calls."""
+    t = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - t) / calls
+
+
+def run(n: int) -> None:
+    rng = random.Random(n)
+    scores = {uid: {"display_name": f"user{uid}", "wins": int(rng.expovariate(0.2))} for uid in range(n)}
+    users = [rng.randrange(n) for _ in range(QUERIES)]
+    sort_calls = max(3, QUERIES * 1000 // n)
+
+    t = time.perf_counter()
+    index = RankIndex()
+    index.build((uid, entry["wins"]) for uid, entry in scores.items())
+    build = time.perf_counter() - t
+
+    print(f"{n:>9,} users (index build {build * 1000:.1f} ms)")
+    sort_top = per_call(lambda i: sorted_top(scores), sort_calls)
+    sort_rank = per_call(lambda i: sorted_rank(scores, users[i % QUERIES]), sort_calls)
+    print(f"  sorted:  top-10 {sort_top * 1e3:9.3f} ms   rank {sort_rank * 1e3:9.3f} ms")
+    index_top = per_call(lambda i: index.top(10), QUERIES)
+    index_rank = per_call(lambda i: index.rank(users[i]), QUERIES)
+    print(f"  indexed: top-10 {index_top * 1e3:9.3f} ms   rank {index_rank * 1e3:9.3f} ms")
+
+    def add_win(i):
+        uid = users[i]
+        scores[uid]["wins"] += 1
+        index.set(uid, scores[uid]["wins"])
+    print(f"  indexed: add_win update {per_call(add_win, QUERIES) * 1e6:.1f} us")
+
+
+def run_tied(n: int) -> None:
+    rng = random.Random(n)
+    index = RankIndex()
+    index.build((uid, 0 if rng.random() < TIED_SHARE else rng.randint(1, 20)) for uid in range(n))
+    users = [rng.randrange(n) for _ in range(QUERIES)]
+    pages = [rng.randrange(n - PAGE) for _ in range(QUERIES)]
+
+    position = per_call(lambda i: index.position(users[i]), QUERIES)
+    deep_page = per_call(lambda i: index.range(pages[i], pages[i] + PAGE), QUERIES)
+
+    def first_win(i):
+        index.set(users[i], 1)
+        index.set(users[i], 0)
+    print(f"{n:>9,} users, {TIED_SHARE:.0%} tied on 0 wins: position {position * 1e6:.1f} us   "
+          f"deep page {deep_page * 1e6:.1f} us   0 -> 1 -> 0 update {per_call(first_win, QUERIES) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for size in sizes:
+        run(size)
+    for size in sizes + [size * 10 for size in sizes[-1:]]:
+        run_tied(size)
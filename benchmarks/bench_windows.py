@@ -0,0 +1,89 @@
+"""
+Windowed leaderboards over a year of synthetic daily activity.
+
+Builds per-day buckets for 365 days, then times window builds, cached
+window queries, incremental updates and the day-rollover slide against
+recomputing a month from the raw win events.
+
+Usage:  python -m benchmarks.bench_windows [users] [wins_per_day]
+"""
+
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from Core.windows import ROLLING_WINDOWS, DailyBuckets, WindowBoard, today
+
+DAYS = 365
+QUERIES = 1000
+
+
+def synthetic_year(users: int, wins_per_day: int, last_day: int) -> Tuple[DailyBuckets, List[Tuple[int, int]]]:
+    """Day buckets plus the raw (day, user_id) win events they summarize."""
+    rng = random.Random(users * 31 + wins_per_day)
+    weights = [1 / (rank + 1) for rank in range(users)]  # a few regulars win most rounds
+    daily: DailyBuckets = {}
+    events = []
+    for day in range(last_day - DAYS + 1, last_day + 1):
+        bucket = daily.setdefault(day, {})
+        for user_id in rng.choices(range(users), weights, k=wins_per_day):
+            bucket[user_id] = bucket.get(user_id, 0) + 1
+            events.append((day, user_id))
+    return daily, events
+
+
+def recompute_from_events(events: List[Tuple[int, int]], start: int) -> List[Tuple[int, int]]:
+    """What a window costs without buckets: scan the history, sum, sort."""
+    totals: Dict[int, int] = {}
+    for day, user_id in events:
+        if day >= start:
+            totals[user_id] = totals.get(user_id, 0) + 1
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:10]
+
+
+def timed(fn, calls: int = 1) -> float:
+    t = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - t) / calls
+
+
+def run(users: int, wins_per_day: int) -> None:
+    day = today()
+    daily, events = synthetic_year(users, wins_per_day, day)
+    month_start = day - ROLLING_WINDOWS["month"] + 1
+    print(f"{users:,} users, {wins_per_day} wins/day over {DAYS} days ({len(events):,} events)")
+
+    month_build = timed(lambda i: WindowBoard(daily, month_start), 20)
+    season_build = timed(lambda i: WindowBoard(daily, day - DAYS + 1), 5)
+    print(f"  build: month {month_build * 1e3:.2f} ms, {DAYS}-day season {season_build * 1e3:.2f} ms")
+
+    week = WindowBoard(daily, day - ROLLING_WINDOWS["week"] + 1)
+    month = WindowBoard(daily, month_start)
+    season = WindowBoard(daily, day - DAYS + 1)
+    top = max(month.totals, key=month.totals.get)
+    query = timed(lambda i: (month.index.top(10), month.index.rank(top)), QUERIES)
+    print(f"  cached month top-10 + rank: {query * 1e6:.1f} us")
+
+    rng = random.Random(1)
+    winners = [rng.randrange(users) for _ in range(QUERIES)]
+
+    def add_win(i):
+        user_id = winners[i]
+        bucket = daily[day]
+        bucket[user_id] = bucket.get(user_id, 0) + 1
+        for board in (week, month, season):
+            board.apply(day, user_id, 1)
+    print(f"  add_win with 3 live windows: {timed(add_win, QUERIES) * 1e6:.1f} us")
+
+    slide = timed(lambda i: month.slide(month.start + 1), 10)
+    print(f"  day rollover slide (month): {slide * 1e3:.2f} ms")
+
+    recompute = timed(lambda i: recompute_from_events(events, month_start), 5)
+    print(f"  recompute month from raw events: {recompute * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(*(args + [5_000, 300][len(args):]))
@@ -0,0 +1,57 @@
+"""
+Synthetic member details shared by the member-cache benchmarks.
+Names are built from syllables so they share trigrams the way real
+usernames do; about a third of the members have a nickname.
+"""
+
+import random
+from typing import Dict, Iterator, List
+
+SYLLABLES = (
+    "al", "an", "ar", "ba", "be", "co", "da", "de", "el", "en", "fa", "ga", "ha", "in", "jo", "ka",
+    "ki", "la", "le", "li", "lo", "ma", "mi", "mo", "na", "ne", "ni", "no", "ra", "re", "ri", "ro",
+    "sa", "se", "so", "ta", "te", "ti", "to", "va", "vi", "xe", "ya", "yo", "za", "zu"
+)
+ROLES = ("Contestant", "Finalist", "Mentor", "Judge", "Admin", "Python", "Java", "C++", "Rust")
+STATUSES = ("online", "idle", "dnd", "offline")
+EPOCH_2020 = 1577836800
+
+
+def synthetic_name(rng: random.Random) -> str:
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    if rng.random() < 0.4:
+        name += str(rng.randint(1, 999))
+    return name
+
+
+def synthetic_details(n: int, seed: int = 0) -> Iterator[Dict]:
+    """``n`` member details dicts in the cache's persisted shape (epoch-second timestamps)."""
+    rng = random.Random(seed)
+    for i in range(n):
+        name = synthetic_name(rng)
+        nick = synthetic_name(rng).title() if rng.random() < 0.35 else None
+        created = EPOCH_2020 + rng.randrange(5 * 365 * 86400)
+        yield {
+            "id": 100_000_000_000_000_000 + i,
+            "name": name,
+            "display_name": nick or name,
+            "discriminator": "0",
+            "nick": nick,
+            "joined_at": created + rng.randrange(365 * 86400),
+            "created_at": created,
+            "roles": rng.sample(ROLES, rng.randint(0, 3)),
+            "is_bot": False,
+            "status": rng.choice(STATUSES)
+        }
+
+
+def synthetic_queries(details: List[Dict], count: int, length: int = 4, seed: int = 1) -> List[str]:
+    """Substrings of random members' names, as a user would type them."""
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < count:
+        name = rng.choice(details)["name"]
+        if len(name) >= length:
+            start = rng.randrange(len(name) - length + 1)
+            queries.append(name[start:start + length])
+    return queries
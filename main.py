@@ -1,13 +1,26 @@
+import time
+_STARTED = time.perf_counter()  # startup report measures from here
+
 import os
+import typing
 from dotenv import load_dotenv
 import discord
-from discord.ext import commands, tasks
-from datetime import datetime, timedelta
-
-# correct Core imports (case-sensitive)
-from Core.leaderboard import leaderboard
-from Core.ticketing import setup_ticketing, CloseTicketView
+from discord import app_commands
+from discord.ext import commands
+from datetime import datetime
+
+# correct Core imports (case-sensitive); only what registering the bot needs.
+# The leaderboard and search-view modules are imported by the commands that use them.
+from Core.ticketing import TICKET_LIFETIME, setup_ticketing, schedule_ticket_expiry, close_ticket_view
+from Core.ticket_store import ticket_store
+from Core.ticket_queue import ticket_queue
+from Core.ticket_categories import ticket_categories
+from Core.ticket_archive import transcript_archive
 from Core import compile_members
+from Core.warmup import Warmup, WarmingUp
+
+warmup = Warmup(started=_STARTED)
+warmup.mark("import", time.perf_counter() - _STARTED)
 
 # --------------------
 # setup
@@ -21,21 +34,53 @@ bot = commands.Bot(command_prefix="//", intents=intents, help_command=None)  # d
 # --------------------
 setup_ticketing(bot)
 
+# keep the member cache current from join/leave/update events
+compile_members.setup_member_listeners(bot)
+
 # --------------------
 # events
 # --------------------
+_slash_synced = False
+
 @bot.event
 async def on_ready():
-    # load cached members on startup
-    compile_members.load_cache_from_file()
+    global _slash_synced
+    # load the member cache and guild leaderboards in the background
+    warmup.start(bot)
     print(f"✅ Logged in as {bot.user} (id: {bot.user.id})")
 
-    # If the Ticketing cog doesn't provide its own cleanup task, start the fallback cleanup loop.
-    cog = bot.get_cog("Ticketing")
-    if not (cog and hasattr(cog, "cleanup_task") and getattr(cog, "cleanup_task").is_running()):
-        if not _ticket_cleanup_loop.is_running():
-            _ticket_cleanup_loop.start()
+    # register slash commands once per process (sync is rate limited)
+    if not _slash_synced:
+        _slash_synced = True
+        try:
+            synced = await bot.tree.sync()
+            print(f"✅ Synced {len(synced)} slash commands")
+        except discord.HTTPException as e:
+            print(f"❌ Failed to sync slash commands: {e}")
+
+
+@bot.check
+async def warmup_gate(ctx):
+    """Hold commands until the caches are loaded; reply instead of waiting forever."""
+    if await warmup.wait():
+        return True
+    await ctx.send(embed=discord.Embed(
+        description="⏳ The bot is still warming up its caches — try again in a few seconds.",
+        color=discord.Color.orange()
+    ))
+    raise WarmingUp()
+
+
+@bot.event
+async def on_command_completion(ctx):
+    warmup.command_done()
+
 
+@bot.event
+async def on_command_error(ctx, error):
+    if isinstance(error, WarmingUp):
+        return  # already answered by the gate
+    await commands.Bot.on_command_error(bot, ctx, error)
 
 # --------------------
 # HELP (member-only embed)
@@ -51,8 +96,8 @@ async def help_command(ctx):
     embed.add_field(
         name="🏆 Leaderboard",
         value=(
-            "`//leaderboard` - Show the top leaderboard\n"
-            "`//myrank` - Show your rank & wins\n"
+            "`//leaderboard [week|month|season] [page_size]` - Browse the leaderboard\n"
+            "`//myrank [week|month|season]` - Show your rank & wins\n"
             "`//lookup @member` - Look up another member’s stats"
         ),
         inline=False
@@ -62,11 +107,17 @@ async def help_command(ctx):
         name="👥 Members (view/search)",
         value=(
             "`//member_lookup <id>` - Lookup a member by ID\n"
-            "`//search_member <query>` - Search for members"
+            "`//search_member <query>` - Search for members (typos OK, ranked)"
         ),
         inline=False
     )
 
+    embed.add_field(
+        name="⚡ Slash commands",
+        value="`/lookup`, `/member_lookup`, `/search_member` (and `/addwin`, `/subwin` for admins) — member and role names autocomplete as you type",
+        inline=False
+    )
+
     embed.add_field(
         name="🎟️ Ticketing",
         value="`//ticket` - Open a ticket (if enabled)",
@@ -93,7 +144,12 @@ async def help_admin_command(ctx):
         value=(
             "`//cache_leaderboard` - Cache all guild members into the leaderboard\n"
             "`//addwin [@member]` - Add a win (admin only)\n"
-            "`//subwin [@member]` - Subtract a win (admin only)"
+            "`//addwins @a @b ...` - Add a win to several members at once (admin only)\n"
+            "`//import_wins` + CSV/JSONL attachment - Apply `user_id, delta` rows in one batch (admin only)\n"
+            "`//export_leaderboard [csv|jsonl]` - Download the whole board (admin only)\n"
+            "`//subwin [@member]` - Subtract a win (admin only)\n"
+            "`//season_start <name>` - Start a named season today (admin only)\n"
+            "`//season_end` - End the current season (admin only)"
         ),
         inline=False
     )
@@ -101,16 +157,29 @@ async def help_admin_command(ctx):
     embed.add_field(
         name="👥 Members (admin)",
         value=(
-            "`//cache_members` - Cache all members (admin only)\n"
+            "`//cache_members` - Reconcile the member cache with the server (admin only)\n"
             "`//member_lookup <id>` - Lookup a member by ID\n"
-            "`//search_member <query>` - Search for members"
+            "`//search_member <query>` - Search for members (typos OK, ranked)\n"
+            "`//role_members \"<role>\" [\"<without role>\"]` - Members with a role, optionally excluding another"
+        ),
+        inline=False
+    )
+
+    embed.add_field(
+        name="📈 Diagnostics (admin)",
+        value=(
+            "`//render_stats` - Show render cache hit/miss counters\n"
+            "`//startup_report` - Show startup phase timings"
         ),
         inline=False
     )
 
     embed.add_field(
         name="🎟️ Ticketing (admin)",
-        value="`//toggle_ticketing` - Toggle ticketing on/off\n`//ticket` - Open a ticket (users)",
+        value=(
+            "`//toggle_ticketing` - Toggle ticketing on/off\n`//ticket` - Open a ticket (users)\n"
+            "`//transcript <ticket id>` - Fetch the archived transcript of a closed ticket"
+        ),
         inline=False
     )
 
@@ -120,44 +189,77 @@ async def help_admin_command(ctx):
 # --------------------
 # Leaderboard commands (embed outputs)
 # --------------------
+Window = typing.Optional[typing.Literal["week", "month", "season"]]
+
+
+async def guild_board(guild: discord.Guild):
+    """The guild's leaderboard; a cold table is loaded off the event loop."""
+    from Core.leaderboard import leaderboards
+    return await leaderboards.fetch(guild)
+
+
 @bot.command(name="leaderboard")
-async def leaderboard_command(ctx, top_n: int = 10):
-    leaderboard.ensure_member(ctx.author.id, ctx.author.display_name)
-    leaders = leaderboard.get_leaderboard(top_n)
-    if not leaders:
-        await ctx.send(embed=discord.Embed(description="Leaderboard is empty.", color=discord.Color.red()))
-        return
+@commands.guild_only()
+async def leaderboard_command(ctx, window: Window = None, page_size: typing.Optional[int] = None):
+    from Core.leaderboard_view import MAX_PAGE_SIZE, PAGE_SIZE, LeaderboardPager
 
-    embed = discord.Embed(title="🏆 Leaderboard", color=discord.Color.gold())
-    for idx, m in enumerate(leaders, start=1):
-        embed.add_field(name=f"{idx}. {m['display_name']}", value=f"{m['wins']} wins", inline=False)
-    await ctx.send(embed=embed)
+    board = await guild_board(ctx.guild)
+    board.ensure_member(ctx.author.id, ctx.author.display_name)
+    view = LeaderboardPager(ctx.guild, window, max(1, min(page_size or PAGE_SIZE, MAX_PAGE_SIZE)))
+    await ctx.send(embed=view.render(board), view=view)
 
 
 @bot.command(name="myrank")
-async def myrank(ctx):
+@commands.guild_only()
+async def myrank(ctx, window: Window = None):
+    from Core.leaderboard_view import window_title
+    from Core.render_cache import rank_strings
+    from Core.windows import today
+
+    leaderboard = await guild_board(ctx.guild)
     leaderboard.ensure_member(ctx.author.id, ctx.author.display_name)
-    stats = leaderboard.get_member_stats(ctx.author.id)
-    rank = leaderboard.get_rank(ctx.author.id)
+
+    def render():
+        stats = leaderboard.get_member_stats(ctx.author.id)
+        if window is None:
+            wins = stats['wins']
+        else:
+            wins = leaderboard.get_window_wins(ctx.author.id, window)
+        rank = leaderboard.get_rank(ctx.author.id, window)
+        return f"{stats['display_name']} — **{wins} wins** (Rank #{rank or '—'})"
+
     embed = discord.Embed(
-        title="📊 My Rank",
-        description=f"{stats['display_name']} — **{stats['wins']} wins** (Rank #{rank})",
+        title=f"📊 My Rank — {window_title(leaderboard, window)}",
+        description=rank_strings.get_or_render(
+            ("myrank", ctx.guild.id, ctx.author.id, leaderboard.version, window, today()), render
+        ),
         color=discord.Color.blue()
     )
     await ctx.send(embed=embed)
 
 
 @bot.command(name="lookup")
+@commands.guild_only()
 async def lookup(ctx, member: discord.Member):
+    await ctx.send(embed=await lookup_embed(ctx.guild, member))
+
+
+async def lookup_embed(guild: discord.Guild, member: discord.Member) -> discord.Embed:
+    from Core.render_cache import rank_strings
+
+    leaderboard = await guild_board(guild)
     leaderboard.ensure_member(member.id, member.display_name)
     stats = leaderboard.get_member_stats(member.id)
-    rank = leaderboard.get_rank(member.id)
-    embed = discord.Embed(
+
+    def render():
+        rank = leaderboard.get_rank(member.id)
+        return f"Wins: **{stats['wins']}**\nRank: **#{rank}**"
+
+    return discord.Embed(
         title=f"🔍 Stats for {stats['display_name']}",
-        description=f"Wins: **{stats['wins']}**\nRank: **#{rank}**",
+        description=rank_strings.get_or_render(("lookup", guild.id, member.id, leaderboard.version), render),
         color=discord.Color.purple()
     )
-    await ctx.send(embed=embed)
 
 
 # --------------------
@@ -165,31 +267,162 @@ async def lookup(ctx, member: discord.Member):
 # --------------------
 @commands.has_permissions(administrator=True)
 @bot.command(name="addwin")
+@commands.guild_only()
 async def addwin(ctx, member: discord.Member = None):
-    member = member or ctx.author
-    leaderboard.add_win(member.id, member.display_name)
-    await ctx.send(embed=discord.Embed(
+    await ctx.send(embed=await addwin_embed(ctx.guild, member or ctx.author, ctx.author.id))
+
+
+async def addwin_embed(guild: discord.Guild, member: discord.Member, actor_id: int) -> discord.Embed:
+    (await guild_board(guild)).add_win(member.id, member.display_name, actor_id=actor_id)
+    return discord.Embed(
         description=f"✅ Added a win to **{member.display_name}**",
         color=discord.Color.green()
-    ))
+    )
 
 
 @commands.has_permissions(administrator=True)
 @bot.command(name="subwin")
+@commands.guild_only()
 async def subwin(ctx, member: discord.Member = None):
-    member = member or ctx.author
+    await ctx.send(embed=await subwin_embed(ctx.guild, member or ctx.author, ctx.author.id))
+
+
+async def subwin_embed(guild: discord.Guild, member: discord.Member, actor_id: int) -> discord.Embed:
+    leaderboard = await guild_board(guild)
     leaderboard.ensure_member(member.id, member.display_name)
     if leaderboard.get_member_stats(member.id)["wins"] > 0:
-        leaderboard.subtract_win(member.id, member.display_name)
-        await ctx.send(embed=discord.Embed(
+        leaderboard.subtract_win(member.id, member.display_name, actor_id=actor_id)
+        return discord.Embed(
             description=f"➖ Subtracted a win from **{member.display_name}**",
             color=discord.Color.orange()
+        )
+    return discord.Embed(
+        description="❌ Wins cannot go below 0.",
+        color=discord.Color.red()
+    )
+
+
+@commands.has_permissions(administrator=True)
+@bot.command(name="addwins")
+@commands.guild_only()
+async def addwins(ctx, members: commands.Greedy[discord.Member]):
+    if not members:
+        await ctx.send(embed=discord.Embed(
+            description="❌ Mention at least one member: `//addwins @a @b @c`",
+            color=discord.Color.red()
         ))
-    else:
+        return
+    deltas = {}
+    for member in members:
+        deltas[member.id] = deltas.get(member.id, 0) + 1
+    (await guild_board(ctx.guild)).apply_deltas(
+        deltas, {m.id: m.display_name for m in members}, actor_id=ctx.author.id
+    )
+    names = ", ".join(f"**{m.display_name}**" for m in members)
+    await ctx.send(embed=discord.Embed(
+        description=f"✅ Added a win to {names}",
+        color=discord.Color.green()
+    ))
+
+
+@commands.has_permissions(administrator=True)
+@bot.command(name="import_wins")
+@commands.guild_only()
+async def import_wins(ctx):
+    from Core import bulk  # pulls in aiohttp; only needed here
+
+    attachment = ctx.message.attachments[0] if ctx.message.attachments else None
+    filename = attachment.filename.lower() if attachment else ""
+    if not filename.endswith((".csv", ".jsonl")):
+        await ctx.send(embed=discord.Embed(
+            description="❌ Attach a `.csv` or `.jsonl` file with `user_id, delta` rows.",
+            color=discord.Color.red()
+        ))
+        return
+    if attachment.size > bulk.MAX_IMPORT_BYTES:
         await ctx.send(embed=discord.Embed(
-            description="❌ Wins cannot go below 0.",
+            description=f"❌ File is too large (max {bulk.MAX_IMPORT_BYTES // (1024 * 1024)} MB).",
             color=discord.Color.red()
         ))
+        return
+
+    leaderboard = await guild_board(ctx.guild)
+    result = await bulk.parse_deltas(
+        bulk.stream_attachment_lines(attachment.url),
+        "jsonl" if filename.endswith(".jsonl") else "csv",
+        lambda uid: uid in leaderboard.scores or ctx.guild.get_member(uid) is not None
+    )
+    if result.error_count:
+        await ctx.send(embed=discord.Embed(
+            title="❌ Import Rejected",
+            description=(
+                f"**{result.error_count}** invalid row(s); nothing was applied.\n\n"
+                + "\n".join(result.errors)
+            ),
+            color=discord.Color.red()
+        ))
+        return
+
+    names = {}
+    for uid in result.deltas:
+        member = ctx.guild.get_member(uid)
+        if member:
+            names[uid] = member.display_name
+    # the table may have been evicted while the file was downloading
+    leaderboard = await guild_board(ctx.guild)
+    changed = leaderboard.apply_deltas(result.deltas, names, actor_id=ctx.author.id)
+    await leaderboard.flush()
+    await ctx.send(embed=discord.Embed(
+        description=f"✅ Imported **{result.rows}** rows for **{changed}** members.",
+        color=discord.Color.green()
+    ))
+
+
+@commands.has_permissions(administrator=True)
+@bot.command(name="export_leaderboard")
+@commands.guild_only()
+async def export_leaderboard(ctx, fmt: typing.Literal["csv", "jsonl"] = "csv"):
+    from Core import bulk
+
+    out = await bulk.export_board(await guild_board(ctx.guild), fmt)
+    with out:
+        await ctx.send(
+            embed=discord.Embed(description="📤 Leaderboard export", color=discord.Color.blue()),
+            file=discord.File(out, filename=f"leaderboard-{ctx.guild.id}.{fmt}")
+        )
+
+
+@commands.has_permissions(administrator=True)
+@bot.command(name="season_start")
+@commands.guild_only()
+async def season_start(ctx, *, name: str):
+    leaderboard = await guild_board(ctx.guild)
+    try:
+        leaderboard.start_season(name)
+    except ValueError as e:
+        await ctx.send(embed=discord.Embed(description=f"❌ {e}", color=discord.Color.red()))
+        return
+    await leaderboard.flush()
+    await ctx.send(embed=discord.Embed(
+        description=f"🏁 Season **{name}** has started. Use `//leaderboard season` to follow it.",
+        color=discord.Color.green()
+    ))
+
+
+@commands.has_permissions(administrator=True)
+@bot.command(name="season_end")
+@commands.guild_only()
+async def season_end(ctx):
+    leaderboard = await guild_board(ctx.guild)
+    name = leaderboard.end_season()
+    if name is None:
+        await ctx.send(embed=discord.Embed(description="❌ No season is running.", color=discord.Color.red()))
+        return
+    await leaderboard.flush()
+    await ctx.send(embed=discord.Embed(
+        description=f"🏁 Season **{name}** has ended.",
+        color=discord.Color.orange()
+    ))
 
 
 # --------------------
@@ -198,11 +431,26 @@ async def subwin(ctx, member: discord.Member = None):
 @commands.has_permissions(administrator=True)
 @bot.command(name="cache_members")
 async def cache_members(ctx):
-    await compile_members.cache_all_guilds_members(bot)
+    status = await ctx.send(embed=discord.Embed(description="⏳ Caching members...", color=discord.Color.blue()))
+
+    async def progress(index, count, guild_name, done, total, rate):
+        await status.edit(embed=discord.Embed(
+            description=(
+                f"⏳ Caching members — guild **{index}/{count}** ({guild_name})\n"
+                f"{done}/{total} members · {rate:,.0f} members/sec"
+            ),
+            color=discord.Color.blue()
+        ))
+
+    added, updated, removed = await compile_members.cache_all_guilds_members(bot, progress=progress)
     info = compile_members.get_member_cache().get_cache_info()
-    await ctx.send(embed=discord.Embed(
+    await status.edit(embed=discord.Embed(
         title="📥 Members Cached",
-        description=f"✅ Cached **{info['member_count']}** members\nLast updated: {info['last_updated']}",
+        description=(
+            f"✅ Cached **{info['member_count']}** members\n"
+            f"Added {added} · Updated {updated} · Removed {removed}\n"
+            f"Last updated: {info['last_updated']}"
+        ),
         color=discord.Color.green()
     ))
 
@@ -210,38 +458,230 @@ async def cache_members(ctx):
 @commands.has_permissions(administrator=True)
 @bot.command(name="cache_leaderboard")
 async def cache_leaderboard_cmd(ctx):
-    await leaderboard.cache_all_guilds(bot)
+    from Core.leaderboard import leaderboards
+
+    await leaderboards.cache_all_guilds(bot)
     await ctx.send(embed=discord.Embed(
-        description="✅ Cached all guild members into leaderboard.",
+        description="✅ Cached every guild's members into its leaderboard.",
         color=discord.Color.green()
     ))
 
 
+@commands.has_permissions(administrator=True)
+@bot.command(name="render_stats")
+async def render_stats(ctx):
+    from Core.render_cache import leaderboard_renders, rank_strings
+
+    embed = discord.Embed(title="📈 Render Cache", color=discord.Color.blue())
+    for label, cache in (("Leaderboard embeds", leaderboard_renders), ("Rank strings", rank_strings)):
+        stats = cache.stats()
+        embed.add_field(
+            name=label,
+            value=(
+                f"Hits: **{stats['hits']}** · Misses: **{stats['misses']}**\n"
+                f"Hit rate: **{stats['hit_rate']:.0%}** · Entries: {stats['size']}"
+            ),
+            inline=False
+        )
+    await ctx.send(embed=embed)
+
+
+@commands.has_permissions(administrator=True)
+@bot.command(name="startup_report")
+async def startup_report(ctx):
+    embed = discord.Embed(title="⏱️ Startup", color=discord.Color.blue())
+    embed.description = "\n".join(
+        f"{phase}: **{seconds:.2f}s**" for phase, seconds in warmup.timings.items()
+    )
+    if warmup.first_command is not None:
+        embed.description += f"\nfirst command: **{warmup.first_command:.2f}s**"
+    await ctx.send(embed=embed)
+
+
 # --------------------
 # Member lookup / search
 # --------------------
 @bot.command(name="member_lookup")
 async def member_lookup(ctx, member_id: int):
+    await ctx.send(embed=member_lookup_embed(member_id))
+
+
+def member_lookup_embed(member_id: int) -> discord.Embed:
     details = compile_members.get_member_cache().get_member_details(member_id)
     if details:
         roles = details.get("roles", [])
-        await ctx.send(embed=discord.Embed(
+        return discord.Embed(
             title=f"🔍 {details['display_name']}",
             description=f"Roles: {', '.join(roles) if roles else 'None'}",
             color=discord.Color.blue()
-        ))
-    else:
-        await ctx.send(embed=discord.Embed(description="❌ Member not found.", color=discord.Color.red()))
+        )
+    return discord.Embed(description="❌ Member not found.", color=discord.Color.red())
 
 
 @bot.command(name="search_member")
 async def search_member(ctx, *, query: str):
-    results = compile_members.get_member_cache().search_members(query)
-    if results:
-        names = ", ".join([r['display_name'] for r in results])
-        await ctx.send(embed=discord.Embed(description=f"Found: {names}", color=discord.Color.green()))
+    view = search_pager(query)
+    if view:
+        await ctx.send(embed=view.render(), view=view)
+    else:
+        await ctx.send(embed=discord.Embed(description="No members found.", color=discord.Color.red()))
+
+
+def search_pager(query: str, role: typing.Optional[str] = None) -> typing.Optional[discord.ui.View]:
+    # typo-tolerant, ranked; only the top hits are kept and paged
+    from Core.member_search_view import SEARCH_MAX_RESULTS, SearchPager
+
+    cache = compile_members.get_member_cache()
+    if role:
+        allowed = cache.get_member_ids_by_role(role)
+        hits = [(d['id'], score) for d, score in cache.fuzzy_search_members(query, SEARCH_MAX_RESULTS * 4)
+                if d['id'] in allowed][:SEARCH_MAX_RESULTS]
     else:
+        hits = [(d['id'], score) for d, score in cache.fuzzy_search_members(query, SEARCH_MAX_RESULTS)]
+    return SearchPager(query, hits) if hits else None
+
+
+@commands.has_permissions(administrator=True)
+@bot.command(name="role_members")
+async def role_members(ctx, role: str, exclude: typing.Optional[str] = None):
+    """Members with `role`, optionally without `exclude` (e.g. contestants not yet finalists)."""
+    results = compile_members.get_member_cache().query_roles(all_of=[role], none_of=[exclude] if exclude else [])
+    if not results:
         await ctx.send(embed=discord.Embed(description="No members found.", color=discord.Color.red()))
+        return
+    names = sorted(r['display_name'] for r in results)
+    shown = ", ".join(names[:50]) + (f" … (+{len(names) - 50} more)" if len(names) > 50 else "")
+    title = f"👥 {role}" + (f" but not {exclude}" if exclude else "")
+    await ctx.send(embed=discord.Embed(
+        title=f"{title} ({len(names)})", description=shown, color=discord.Color.green()
+    ))
+
+
+# --------------------
+# Slash commands (autocomplete served from the member cache's prefix index)
+# --------------------
+SLASH_WARMUP_WAIT = 2.0  # interactions must be answered within 3 seconds
+
+
+async def slash_ready(interaction: discord.Interaction) -> bool:
+    if await warmup.wait(SLASH_WARMUP_WAIT):
+        return True
+    await interaction.response.send_message(embed=discord.Embed(
+        description="⏳ The bot is still warming up its caches — try again in a few seconds.",
+        color=discord.Color.orange()
+    ), ephemeral=True)
+    return False
+
+
+async def member_autocomplete(interaction: discord.Interaction, current: str) -> typing.List[app_commands.Choice[str]]:
+    if not warmup.ready.is_set():
+        return []
+    guild = interaction.guild
+    choices = []
+    # the cache spans every guild; over-fetch, then keep this guild's members
+    for details in compile_members.get_member_cache().complete_members(current, 50):
+        if guild is not None and guild.get_member(details['id']) is None:
+            continue
+        label = details['display_name'] if details['display_name'] == details['name'] \
+            else f"{details['display_name']} (@{details['name']})"
+        choices.append(app_commands.Choice(name=label[:100], value=str(details['id'])))
+        if len(choices) == 25:
+            break
+    return choices
+
+
+async def role_autocomplete(interaction: discord.Interaction, current: str) -> typing.List[app_commands.Choice[str]]:
+    if not warmup.ready.is_set():
+        return []
+    return [app_commands.Choice(name=role[:100], value=role)
+            for role in compile_members.get_member_cache().complete_roles(current, 25)]
+
+
+def resolve_member(guild: discord.Guild, value: str) -> typing.Optional[discord.Member]:
+    """An autocomplete pick is an id; typed text falls back to the best name match."""
+    if value.isdigit():
+        return guild.get_member(int(value))
+    for details in compile_members.get_member_cache().complete_members(value, 25):
+        member = guild.get_member(details['id'])
+        if member is not None:
+            return member
+    return None
+
+
+async def send_member_not_found(interaction: discord.Interaction):
+    await interaction.response.send_message(
+        embed=discord.Embed(description="❌ Member not found.", color=discord.Color.red()), ephemeral=True
+    )
+
+
+@bot.tree.command(name="lookup", description="Look up a member's wins and rank")
+@app_commands.guild_only()
+@app_commands.autocomplete(member=member_autocomplete)
+async def lookup_slash(interaction: discord.Interaction, member: str):
+    if not await slash_ready(interaction):
+        return
+    target = resolve_member(interaction.guild, member)
+    if target is None:
+        await send_member_not_found(interaction)
+        return
+    await interaction.response.send_message(embed=await lookup_embed(interaction.guild, target))
+
+
+@bot.tree.command(name="member_lookup", description="Show a cached member's roles")
+@app_commands.autocomplete(member=member_autocomplete)
+async def member_lookup_slash(interaction: discord.Interaction, member: str):
+    if not await slash_ready(interaction):
+        return
+    if member.isdigit():
+        member_id = int(member)
+    else:
+        matches = compile_members.get_member_cache().complete_members(member, 1)
+        member_id = matches[0]['id'] if matches else 0
+    await interaction.response.send_message(embed=member_lookup_embed(member_id))
+
+
+@bot.tree.command(name="search_member", description="Search members by name (typos OK)")
+@app_commands.autocomplete(role=role_autocomplete)
+async def search_member_slash(interaction: discord.Interaction, query: str, role: typing.Optional[str] = None):
+    if not await slash_ready(interaction):
+        return
+    view = search_pager(query, role)
+    if view:
+        await interaction.response.send_message(embed=view.render(), view=view)
+    else:
+        await interaction.response.send_message(
+            embed=discord.Embed(description="No members found.", color=discord.Color.red()), ephemeral=True
+        )
+
+
+@bot.tree.command(name="addwin", description="Add a win to a member (admin only)")
+@app_commands.guild_only()
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+@app_commands.autocomplete(member=member_autocomplete)
+async def addwin_slash(interaction: discord.Interaction, member: typing.Optional[str] = None):
+    if not await slash_ready(interaction):
+        return
+    target = resolve_member(interaction.guild, member) if member else interaction.user
+    if target is None:
+        await send_member_not_found(interaction)
+        return
+    await interaction.response.send_message(embed=await addwin_embed(interaction.guild, target, interaction.user.id))
+
+
+@bot.tree.command(name="subwin", description="Subtract a win from a member (admin only)")
+@app_commands.guild_only()
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+@app_commands.autocomplete(member=member_autocomplete)
+async def subwin_slash(interaction: discord.Interaction, member: typing.Optional[str] = None):
+    if not await slash_ready(interaction):
+        return
+    target = resolve_member(interaction.guild, member) if member else interaction.user
+    if target is None:
+        await send_member_not_found(interaction)
+        return
+    await interaction.response.send_message(embed=await subwin_embed(interaction.guild, target, interaction.user.id))
 
 
 # --------------------
@@ -313,15 +753,8 @@ async def ticket_cmd(ctx):
         ))
         return
 
-    # Determine the active tickets store (cog.store or bot fallback)
-    def get_active_store():
-        if cog and hasattr(cog, "active_tickets"):
-            return cog.active_tickets
-        if not hasattr(bot, "_ticket_active"):
-            bot._ticket_active = {}
-        return bot._ticket_active
-
-    active_store = get_active_store()
+    # the cog and this command share the persistent ticket store
+    active_store = cog.active_tickets if (cog and hasattr(cog, "active_tickets")) else ticket_store
 
     # Prevent duplicate open ticket
     if ctx.author.id in active_store:
@@ -335,63 +768,47 @@ async def ticket_cmd(ctx):
         ))
         return
 
-    # Find or create 'Tickets' category
-    try:
-        category = discord.utils.get(guild.categories, name="Tickets")
-        if not category:
-            # creating a category requires Manage Channels
-            category = await guild.create_category("Tickets")
-    except discord.Forbidden:
-        await ctx.send(embed=discord.Embed(
-            title="❌ Permission Denied",
-            description="I don't have permission to create categories/channels. Please grant me `Manage Channels`.",
-            color=discord.Color.red()
-        ))
-        return
-    except Exception as e:
+    # ...or one still being created (no await between these checks and taking the slot)
+    if ticket_queue.in_flight(ctx.author.id):
         await ctx.send(embed=discord.Embed(
-            title="❌ Error",
-            description=f"Failed to create/find ticket category: `{e}`",
-            color=discord.Color.red()
+            description="⏳ Your ticket is already being created.",
+            color=discord.Color.orange()
         ))
         return
 
-    # Build overwrites: hide @everyone, allow author, bot, and roles with Administrator
-    overwrites = {
-        guild.default_role: discord.PermissionOverwrite(view_channel=False),
-        ctx.author: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-        guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True)
-    }
-    for role in guild.roles:
-        if role.permissions.administrator:
-            overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-
-    # Create the ticket channel
-    try:
-        channel_name = f"ticket-{ctx.author.name}".lower()[:90]
-        channel = await guild.create_text_channel(name=channel_name, category=category, overwrites=overwrites)
-    except discord.Forbidden:
+    async def announce_position(position: int):
         await ctx.send(embed=discord.Embed(
-            title="❌ Permission Denied",
-            description="I don't have permission to create channels. Please grant me `Manage Channels`.",
-            color=discord.Color.red()
-        ))
-        return
-    except Exception as e:
-        await ctx.send(embed=discord.Embed(
-            title="❌ Error",
-            description=f"Failed to create ticket channel: `{e}`",
-            color=discord.Color.red()
+            description=f"⏳ Lots of tickets are being opened right now. You're **#{position}** in the queue.",
+            color=discord.Color.orange()
         ))
-        return
-
-    # Record the ticket with 2-day expiry
-    expires = datetime.utcnow() + timedelta(days=2)
-    active_store[ctx.author.id] = {"channel_id": channel.id, "expires": expires}
 
-    # ✅ Add button view
-    view = CloseTicketView(active_store, channel.id, ctx.author.id)
-    bot.add_view(view)  # persistent after restart
+    async with ticket_queue.slot(ctx.author.id, announce_position):
+        # Overwrites: hide @everyone, allow author, bot, and roles with Administrator (cached per guild)
+        overwrites = ticket_queue.ticket_overwrites(guild, ctx.author)
+
+        # Create the ticket channel in a "Tickets"/"Tickets 2"/... category with room
+        try:
+            channel_name = f"ticket-{ctx.author.name}".lower()[:90]
+            channel = await ticket_categories.create_channel(guild, channel_name, overwrites)
+        except discord.Forbidden:
+            await ctx.send(embed=discord.Embed(
+                title="❌ Permission Denied",
+                description="I don't have permission to create categories/channels. Please grant me `Manage Channels`.",
+                color=discord.Color.red()
+            ))
+            return
+        except Exception as e:
+            await ctx.send(embed=discord.Embed(
+                title="❌ Error",
+                description=f"Failed to create ticket channel: `{e}`",
+                color=discord.Color.red()
+            ))
+            return
+
+        # Record the ticket with 2-day expiry
+        expires = datetime.utcnow() + TICKET_LIFETIME
+        active_store[ctx.author.id] = {"channel_id": channel.id, "guild_id": guild.id, "expires": expires}
+        schedule_ticket_expiry(bot, active_store, ctx.author.id, channel.id, expires)
 
     # Send welcome embed in the new channel and confirm to user
     await channel.send(embed=discord.Embed(
@@ -402,7 +819,7 @@ async def ticket_cmd(ctx):
             "It will be deleted in 2 days or you can close it manually below."
         ),
         color=discord.Color.blue()
-    ), view=view)
+    ), view=close_ticket_view(channel.id))  # ✅ close button, handled by CloseTicketButton
 
     await ctx.send(embed=discord.Embed(
         description=f"✅ Ticket created: {channel.mention}",
@@ -410,30 +827,36 @@ async def ticket_cmd(ctx):
     ))
 
 
-# --------------------
-# Ticket cleanup loop (fallback)
-# --------------------
-@tasks.loop(minutes=10)
-async def _ticket_cleanup_loop():
-    # check cog store first, fallback to bot._ticket_active
-    cog = bot.get_cog("Ticketing")
-    store = cog.active_tickets if (cog and hasattr(cog, "active_tickets")) else getattr(bot, "_ticket_active", {})
-    now = datetime.utcnow()
-    expired = [uid for uid, data in list(store.items()) if data.get("expires") and data["expires"] <= now]
-    for uid in expired:
-        data = store.pop(uid, None)
-        if data:
-            ch = bot.get_channel(data.get("channel_id"))
-            if ch:
-                try:
-                    await ch.delete(reason="Ticket expired (2 days)")
-                except Exception:
-                    pass
-
-
-@_ticket_cleanup_loop.before_loop
-async def _before_ticket_cleanup():
-    await bot.wait_until_ready()
+@commands.has_permissions(administrator=True)
+@bot.command(name="transcript")
+@commands.guild_only()
+async def transcript(ctx, ticket_id: int):
+    """Send the archived transcript of a ticket (its channel id) as a .jsonl.gz file."""
+    entry = transcript_archive.lookup(ticket_id)
+    if entry is None or entry["guild_id"] != ctx.guild.id:
+        await ctx.send(embed=discord.Embed(
+            description=f"❌ No transcript found for ticket `{ticket_id}`.",
+            color=discord.Color.red()
+        ))
+        return
+    if os.path.getsize(entry["path"]) > ctx.guild.filesize_limit:
+        await ctx.send(embed=discord.Embed(
+            description=f"⚠️ The transcript is too large to upload here; it is on the bot host at `{entry['path']}`.",
+            color=discord.Color.orange()
+        ))
+        return
+    owner = f"<@{entry['owner_id']}>" if entry.get("owner_id") else "unknown"
+    await ctx.send(
+        embed=discord.Embed(
+            title=f"📜 Transcript of #{entry['channel']}",
+            description=(
+                f"Owner: {owner}\nMessages: {entry['messages']}\n"
+                f"Archived: {entry['archived_at'][:16].replace('T', ' ')} UTC ({entry['reason']})"
+            ),
+            color=discord.Color.blue()
+        ),
+        file=discord.File(entry["path"], filename=f"ticket-{ticket_id}.jsonl.gz")
+    )
 
 
 # --------------------
@@ -445,4 +868,9 @@ if __name__ == "__main__":
     if not token:
         raise ValueError("❌ No token found in .env (COMPILED_TOKEN or DISCORD_TOKEN).")
     print("✅ Token loaded")
-    bot.run(token)
\ No newline at end of file
+    bot.run(token)
+    # write anything still waiting on the write-behind timer
+    from Core.leaderboard import leaderboards
+    leaderboards.save_to_file()
+    compile_members.get_member_cache().flush_sync()
+    ticket_store.flush_sync()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Bulk win import parsing: row validation and oversized attachment lines."""
+
+import asyncio
+
+from aiohttp import web
+
+from Core import bulk
+
+
+async def lines_of(*rows: bytes):
+    for row in rows:
+        yield row
+
+
+def parse(fmt: str, *rows: bytes, known=lambda uid: True) -> bulk.ImportResult:
+    return asyncio.run(bulk.parse_deltas(lines_of(*rows), fmt, known))
+
+
+def test_valid_rows_are_summed_per_user():
+    result = parse("csv", b"user_id,delta\n", b"1,2\n", b" 2 , -1\n", b"1,+3\n")
+    assert result.error_count == 0 and result.rows == 3
+    assert result.deltas == {1: 5, 2: -1}
+
+    result = parse("jsonl", b'{"user_id": 123456789012345678, "delta": 4}\n',
+                   b'{"user_id": "123456789012345678", "delta": "-1"}\n')
+    assert result.error_count == 0
+    assert result.deltas == {123456789012345678: 3}
+
+
+def test_non_integer_values_are_rejected_not_truncated():
+    result = parse("jsonl", b'{"user_id": 1, "delta": 1.9}\n', b'{"user_id": 1.2345678901234567e17, "delta": 1}\n',
+                   b'{"user_id": 1, "delta": true}\n', b'{"user_id": 1, "delta": "1.5"}\n', b'{"user_id": 1}\n')
+    assert result.error_count == 5 and result.deltas == {}
+    assert result.errors[0] == "line 1: delta must be an integer, got 1.9"
+    assert result.errors[1].startswith("line 2: user_id must be an integer")
+
+    result = parse("csv", b"1,1.9\n", b"1,1_000\n", b"x,1\n")
+    assert result.error_count == 3 and result.deltas == {}
+
+
+def test_unknown_members_are_errors():
+    result = parse("csv", b"1,1\n", b"2,1\n", known=lambda uid: uid == 1)
+    assert result.errors == ["line 2: unknown member 2"]
+
+
+def test_oversized_line_is_reported():
+    async def main():
+        app = web.Application()
+        body = b"1,1\n2," + b"9" * (1 << 20) + b"\n3,1\n"
+
+        async def attachment(request):
+            return web.Response(body=body)
+        app.router.add_get("/wins.csv", attachment)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            return await bulk.parse_deltas(
+                bulk.stream_attachment_lines(f"http://127.0.0.1:{port}/wins.csv"), "csv", lambda uid: True
+            )
+        finally:
+            await runner.cleanup()
+
+    result = asyncio.run(main())
+    assert result.errors == ["line 2: line is too long"]
+    assert result.deltas == {1: 1}
@@ -0,0 +1,67 @@
+"""GuildLeaderboards eviction: evicted tables are closed and their final flush completes."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from Core import leaderboard as leaderboard_module
+from Core.leaderboard import BoardClosedError, GuildLeaderboards
+from Core.storage import JsonLeaderboardStore
+
+
+def guild_boards(tmp_path, monkeypatch, **kwargs) -> GuildLeaderboards:
+    monkeypatch.setattr(leaderboard_module, "get_leaderboard_store", lambda guild_id: JsonLeaderboardStore(
+        str(tmp_path / f"{guild_id}.json"), str(tmp_path / f"{guild_id}_log")
+    ))
+    boards = GuildLeaderboards(**kwargs)
+    boards._legacy = {}  # no pre-sharding board to import from
+    return boards
+
+
+def guild(guild_id: int) -> SimpleNamespace:
+    return SimpleNamespace(id=guild_id, get_member=lambda uid: None)
+
+
+def test_evicted_board_rejects_changes_and_reload_sees_its_writes(tmp_path, monkeypatch):
+    async def main():
+        boards = guild_boards(tmp_path, monkeypatch, max_loaded=1)
+        first = await boards.fetch(guild(1))
+        first.add_win(10, "ten")
+
+        await boards.fetch(guild(2))  # evicts guild 1
+        assert first.closed
+        with pytest.raises(BoardClosedError):
+            first.add_win(10, "ten")
+        with pytest.raises(BoardClosedError):
+            first.set_wins(10, "ten", 50)
+        with pytest.raises(BoardClosedError):
+            first.apply_deltas({10: 1}, {})
+        with pytest.raises(BoardClosedError):
+            first.start_season("spring")
+
+        assert boards._closing  # the final flush is held on to until it finishes
+        await asyncio.gather(*boards._closing)
+        assert not boards._closing
+
+        fresh = await boards.fetch(guild(1))
+        assert fresh is not first
+        assert fresh.get_member_stats(10)["wins"] == 1
+        fresh.add_win(10, "ten")
+        assert fresh.get_member_stats(10)["wins"] == 2
+        await boards.flush()
+
+    asyncio.run(main())
+
+
+def test_idle_board_is_evicted_on_next_lookup(tmp_path, monkeypatch):
+    async def main():
+        boards = guild_boards(tmp_path, monkeypatch, idle_seconds=0.05)
+        board = await boards.fetch(guild(1))
+        board.add_win(5, "five")
+        await asyncio.sleep(0.1)
+        await boards.fetch(guild(2))
+        assert board.closed and boards.loaded() == [2]
+        await asyncio.gather(*boards._closing)
+
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""MemberCache startup load racing gateway events and write-behind flushes."""
+
+import asyncio
+from types import SimpleNamespace
+
+from Core.compile_members import MemberCache
+from Core.member_records import record_size
+from Core.storage import JsonMemberStore
+
+MEMBERS = 3000
+BASE_ID = 100_000
+
+
+def details(i: int) -> dict:
+    return {"id": BASE_ID + i, "name": f"member{i:05d}", "display_name": f"member{i:05d}",
+            "discriminator": "0", "nick": None, "joined_at": 1_600_000_000, "created_at": 1_500_000_000,
+            "roles": ["Contestant"] if i % 2 else [], "is_bot": False, "status": "offline"}
+
+
+def fake_member(i: int, name: str, roles=()) -> SimpleNamespace:
+    return SimpleNamespace(id=BASE_ID + i, name=name, display_name=name, discriminator="0", nick=None,
+                           joined_at=None, created_at=None, roles=[SimpleNamespace(name=r) for r in roles],
+                           bot=False, status="online")
+
+
+def member_store(tmp_path) -> JsonMemberStore:
+    return JsonMemberStore(str(tmp_path / "members.ndjson"), str(tmp_path / "log"),
+                           str(tmp_path / "members.json"))
+
+
+def test_events_during_load_win_over_the_snapshot_after_a_flush(tmp_path):
+    store = member_store(tmp_path)
+    store.save_all([details(i) for i in range(MEMBERS)], None)
+    renamed, left, joined_and_left = MEMBERS - 10, MEMBERS - 20, MEMBERS + 5
+
+    async def main():
+        cache = MemberCache(store)
+
+        async def events():
+            while cache.get_member_count() < 100:
+                await asyncio.sleep(0)
+            cache.add_member(fake_member(renamed, "renamed", ["Finalist"]))
+            cache.remove_member(BASE_ID + left)
+            cache.add_member(fake_member(joined_and_left, "newcomer"))
+            await cache.flush()  # the write-behind timer firing mid-load
+            cache.remove_member(BASE_ID + joined_and_left)
+
+        await asyncio.gather(events(), cache.load_cache_async(chunk_size=50))
+        return cache
+
+    cache = asyncio.run(main())
+    store.close()
+
+    assert cache.get_member_count() == MEMBERS - 1
+    assert cache.get_member_name(BASE_ID + renamed) == "renamed"
+    assert cache.get_member_details(BASE_ID + left) is None
+    assert cache.get_member_details(BASE_ID + joined_and_left) is None
+
+    # no index entries left behind by the replaced snapshot record
+    assert [v["id"] for v in cache.complete_members("member%05d" % renamed)] == []
+    assert [v["id"] for v in cache.search_members("member%05d" % renamed)] == []
+    assert [v["id"] for v in cache.complete_members("renamed")] == [BASE_ID + renamed]
+    assert BASE_ID + renamed in cache.get_member_ids_by_role("Finalist")
+    assert BASE_ID + renamed not in cache.get_member_ids_by_role("Contestant")
+    assert BASE_ID + left not in cache.get_member_ids_by_role("Contestant")
+    assert cache._record_bytes == sum(record_size(r) for r in cache._records.values())
+
+
+def test_load_without_events_matches_the_snapshot(tmp_path):
+    store = member_store(tmp_path)
+    store.save_all([details(i) for i in range(MEMBERS)], None)
+
+    cache = MemberCache(store)
+    asyncio.run(cache.load_cache_async(chunk_size=50))
+    store.close()
+    assert cache.get_member_count() == MEMBERS
+    assert len(cache.get_member_ids_by_role("Contestant")) == MEMBERS // 2
+    assert [v["id"] for v in cache.complete_members("member00042")] == [BASE_ID + 42]
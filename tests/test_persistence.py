@@ -0,0 +1,173 @@
+"""Crash recovery of the append-only change log (AppendLog), SnapshotLog and the JSON leaderboard store."""
+
+import json
+import os
+
+from Core.persistence import AppendLog, SnapshotLog
+from Core.storage import JsonLeaderboardStore, empty_state
+from Core.windows import today
+
+
+def segment_path(directory, segment: int) -> str:
+    return os.path.join(str(directory), f"{segment:06d}.jsonl")
+
+
+def test_replay_returns_records_in_order(tmp_path):
+    log = AppendLog(str(tmp_path))
+    for n in range(5):
+        log.append({"n": n})
+    assert [r["n"] for r in log.replay()] == [0, 1, 2, 3, 4]
+
+
+def test_truncated_last_record_is_dropped_and_cut_off(tmp_path):
+    log = AppendLog(str(tmp_path))
+    for n in range(3):
+        log.append({"n": n, "pad": "x" * 20})
+    log.close()
+    path = segment_path(tmp_path, 1)
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 10)  # crash in the middle of the last record
+
+    assert [r["n"] for r in log.replay()] == [0, 1]
+    # the torn tail is gone, so the next append starts on a clean line
+    with open(path, "rb") as f:
+        assert f.read().endswith(b"\n")
+    log.append({"n": 3})
+    assert [r["n"] for r in log.replay()] == [0, 1, 3]
+
+
+def test_complete_json_without_newline_counts_as_torn(tmp_path):
+    log = AppendLog(str(tmp_path))
+    log.append({"n": 0})
+    log.close()
+    with open(segment_path(tmp_path, 1), "ab") as f:
+        f.write(b'{"n":1}')  # the newline never made it to disk
+    assert [r["n"] for r in log.replay()] == [0]
+    log.append({"n": 2})
+    assert [r["n"] for r in log.replay()] == [0, 2]
+
+
+def test_replay_starts_at_position(tmp_path):
+    log = AppendLog(str(tmp_path))
+    log.append({"n": 0})
+    log.append({"n": 1})
+    segment, offset = log.position()
+    log.append({"n": 2})
+    assert [r["n"] for r in log.replay(segment, offset)] == [2]
+
+
+def test_segment_rotation(tmp_path):
+    log = AppendLog(str(tmp_path), rotate_bytes=64)
+    log.append({"n": 0})
+    assert log.checkpoint() == (1, os.path.getsize(segment_path(tmp_path, 1)))  # still small: no rotation
+    for n in range(1, 6):
+        log.append({"n": n, "pad": "x" * 20})
+    position = log.checkpoint()
+    assert position == (2, 0)
+    log.append({"n": 6})
+    log.append({"n": 7})
+
+    assert [r["n"] for r in log.replay()] == list(range(8))
+    assert [r["n"] for r in log.replay(*position)] == [6, 7]
+    # a reopened log continues in the newest segment
+    assert AppendLog(str(tmp_path)).segment == 2
+
+
+def test_torn_record_in_older_segment_is_not_truncated(tmp_path):
+    log = AppendLog(str(tmp_path), rotate_bytes=1)
+    log.append({"n": 0})
+    log.checkpoint()
+    log.append({"n": 1})
+    log.close()
+    older = segment_path(tmp_path, 1)
+    with open(older, "ab") as f:
+        f.write(b'{"n":')
+    size = os.path.getsize(older)
+
+    assert [r["n"] for r in log.replay()] == [0, 1]
+    assert os.path.getsize(older) == size  # old segments are never rewritten
+
+
+def board_store(tmp_path) -> JsonLeaderboardStore:
+    return JsonLeaderboardStore(str(tmp_path / "board.json"), str(tmp_path / "board_log"))
+
+
+def test_store_replays_log_tail_after_snapshot(tmp_path):
+    state = empty_state()
+    store = board_store(tmp_path)
+    store.bind(lambda: state)
+    state["scores"][1] = {"display_name": "a", "wins": 1}
+    state["daily"][today()] = {1: 1}
+    store.record("add", 1, state["scores"][1], delta=1)
+    store.touch()  # no running loop: the snapshot is written right away
+    with open(tmp_path / "board.json", encoding="utf-8") as f:
+        assert json.load(f)["scores"] == {"1": {"display_name": "a", "wins": 1}}
+
+    # changes after the snapshot only reach the log
+    state["scores"][1] = {"display_name": "a", "wins": 2}
+    store.record("add", 1, state["scores"][1], delta=1)
+    state["scores"][2] = {"display_name": "b", "wins": 5}
+    store.record("set", 2, state["scores"][2], delta=5)
+    store.close()
+
+    loaded = board_store(tmp_path).load()
+    assert loaded["scores"] == {1: {"display_name": "a", "wins": 2}, 2: {"display_name": "b", "wins": 5}}
+    # the record folded into the snapshot is not counted twice in the day buckets
+    (bucket,) = loaded["daily"].values()
+    assert bucket == {1: 2, 2: 5}
+
+
+def test_store_survives_crash_mid_record(tmp_path):
+    state = empty_state()
+    store = board_store(tmp_path)
+    store.bind(lambda: state)
+    for wins in (1, 2, 3):
+        state["scores"][7] = {"display_name": "g", "wins": wins}
+        store.record("add", 7, state["scores"][7], delta=1)
+    store.close()
+    path = segment_path(tmp_path / "board_log", 1)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 5)
+
+    loaded = board_store(tmp_path).load()
+    assert loaded["scores"] == {7: {"display_name": "g", "wins": 2}}
+
+
+def test_store_batch_is_all_or_nothing(tmp_path):
+    state = empty_state()
+    store = board_store(tmp_path)
+    store.bind(lambda: state)
+    state["scores"] = {1: {"display_name": "a", "wins": 1}, 2: {"display_name": "b", "wins": 1}}
+    store.record_batch("bulk", [(1, state["scores"][1], 1), (2, state["scores"][2], 1)])
+    store.close()
+    path = segment_path(tmp_path / "board_log", 1)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    assert board_store(tmp_path).load()["scores"] == {}
+
+
+def test_snapshot_log_replays_only_records_after_the_snapshot(tmp_path):
+    items = []
+    snapshots = SnapshotLog(str(tmp_path / "items.json"), str(tmp_path / "items_log"), "item",
+                            lambda: {"items": list(items)})
+    for n in range(3):
+        items.append(n)
+        snapshots.append({"add": n})
+    snapshots.touch()  # no running loop: the snapshot is written right away
+    items.append(3)
+    snapshots.append({"add": 3})
+    snapshots.close()
+
+    reopened = SnapshotLog(str(tmp_path / "items.json"), str(tmp_path / "items_log"), "item",
+                           lambda: {"items": list(items)})
+    data, records = reopened.load()
+    assert data["items"] == [0, 1, 2]
+    records = list(records)
+    assert [r["add"] for r in records] == [3]
+    assert all("ts" in r for r in records)
+    # the replayed tail is folded into the next snapshot
+    reopened.flush_sync()
+    data, records = reopened.load()
+    assert data["items"] == [0, 1, 2, 3] and list(records) == []
@@ -0,0 +1,57 @@
+"""RankIndex against a sort-based model, including large tie groups."""
+
+import random
+
+import pytest
+
+from Core import rank_index
+from Core.rank_index import RankIndex
+
+
+def model_order(wins):
+    return sorted(wins, key=lambda uid: (-wins[uid], uid))
+
+
+def check(index: RankIndex, wins) -> None:
+    order = model_order(wins)
+    assert len(index) == len(wins)
+    assert [uid for _, uid, _ in index.range(0, len(order) + 5)] == order
+    for start, stop in ((0, 10), (3, 17), (len(order) - 7, len(order)), (len(order) // 2, len(order) // 2 + 40)):
+        assert [uid for _, uid, _ in index.range(start, stop)] == order[max(start, 0):stop]
+    for pos, uid in enumerate(order):
+        assert index.position(uid) == pos
+        assert index.rank(uid) == 1 + sum(1 for w in wins.values() if w > wins[uid])
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(rank_index, "TIE_CHUNK", 4)  # exercise chunk splits and emptied chunks
+
+
+def test_random_updates_match_the_model(small_chunks):
+    rng = random.Random(0)
+    index, wins = RankIndex(), {}
+    for step in range(3000):
+        uid = rng.randrange(400)
+        if rng.random() < 0.1 and uid in wins:
+            index.remove(uid)
+            del wins[uid]
+        else:
+            # mostly 0 wins: one huge tie group, like a freshly cached guild
+            wins[uid] = 0 if rng.random() < 0.7 else rng.randrange(6)
+            index.set(uid, wins[uid])
+        if step % 500 == 0:
+            check(index, wins)
+    check(index, wins)
+
+
+def test_build_orders_ties_by_user_id(small_chunks):
+    rng = random.Random(1)
+    wins = {rng.randrange(10 ** 18): rng.choice((0, 0, 0, 1, 2)) for _ in range(500)}
+    index = RankIndex()
+    index.build(wins.items())
+    check(index, wins)
+    for uid in list(wins)[:250]:
+        index.remove(uid)
+        del wins[uid]
+    check(index, wins)
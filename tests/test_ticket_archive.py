@@ -0,0 +1,72 @@
+"""TranscriptArchive against a fake channel: failed archives and concurrent archives of one ticket."""
+
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from Core.ticket_archive import HISTORY_PAGE, TranscriptArchive
+
+
+def fake_message(i: int) -> SimpleNamespace:
+    return SimpleNamespace(id=i, author=SimpleNamespace(id=1),
+                           created_at=datetime.fromtimestamp(i, timezone.utc), edited_at=None,
+                           content=f"message {i}", attachments=[])
+
+
+class FakeChannel:
+    def __init__(self, messages: int, fail_after: int = None):
+        self.id = 42
+        self.name = "ticket-0001"
+        self.guild = SimpleNamespace(id=7)
+        self.messages = messages
+        self.fail_after = fail_after
+        self.history_calls = 0
+
+    async def history(self, limit=None, oldest_first=True):
+        self.history_calls += 1
+        for i in range(self.messages):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            await asyncio.sleep(0)
+            yield fake_message(i)
+
+
+def archive_for(tmp_path) -> TranscriptArchive:
+    return TranscriptArchive(str(tmp_path / "transcripts"), str(tmp_path / "transcripts" / "index.jsonl"))
+
+
+def test_archive_writes_transcript_and_index(tmp_path):
+    archive = archive_for(tmp_path)
+    channel = FakeChannel(HISTORY_PAGE * 2 + 5)
+    entry = asyncio.run(archive.archive(channel, owner_id=1))
+    assert entry["messages"] == channel.messages
+    with gzip.open(entry["path"], "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == list(range(channel.messages))
+    assert archive_for(tmp_path).lookup(channel.id) == entry
+    assert os.listdir(os.path.dirname(entry["path"])) == ["42.jsonl.gz"]
+
+
+def test_failed_archive_leaves_no_temp_file(tmp_path):
+    archive = archive_for(tmp_path)
+    channel = FakeChannel(HISTORY_PAGE * 2, fail_after=HISTORY_PAGE + 10)
+    assert asyncio.run(archive.archive(channel)) is None
+    assert os.listdir(os.path.dirname(archive.path_for(7, channel.id))) == []
+    assert archive.lookup(channel.id) is None
+
+
+def test_channel_already_being_archived_is_not_archived_twice(tmp_path):
+    async def main():
+        archive = archive_for(tmp_path)
+        channel = FakeChannel(HISTORY_PAGE * 3)
+        first, second = await asyncio.gather(archive.archive(channel, reason="expired"),
+                                             archive.archive(channel, reason="closed"))
+        assert channel.history_calls == 1
+        assert first is second and first["reason"] == "expired"
+
+        # once done, the ticket can be archived again
+        assert (await archive.archive(channel))["reason"] == "closed"
+        assert channel.history_calls == 2
+    asyncio.run(main())
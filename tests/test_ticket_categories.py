@@ -0,0 +1,136 @@
+"""Ticket category pool against a fake guild: error handling and category-create races."""
+
+import asyncio
+import itertools
+
+import discord
+import pytest
+
+from Core.ticket_categories import CATEGORY_CAPACITY, TicketCategories, category_name
+
+_ids = itertools.count(1000)
+
+
+class FakeResponse:
+    def __init__(self, status: int, reason: str = ""):
+        self.status = status
+        self.reason = reason
+
+
+def http_error(status: int, message) -> discord.HTTPException:
+    return discord.HTTPException(FakeResponse(status), message)
+
+
+def category_full_error() -> discord.HTTPException:
+    return http_error(400, {
+        "code": 50035, "message": "Invalid Form Body",
+        "errors": {"parent_id": {"_errors": [{
+            "code": "CHANNEL_PARENT_MAX_CHANNELS",
+            "message": "Maximum number of channels in category reached (50)"
+        }]}}
+    })
+
+
+class FakeCategory:
+    def __init__(self, name: str, channels: int = 0):
+        self.id = next(_ids)
+        self.name = name
+        self.channels = [object()] * channels
+
+
+class FakeGuild:
+    def __init__(self, *categories: FakeCategory):
+        self.id = next(_ids)
+        self.name = "guild"
+        self.categories = list(categories)
+        self.errors = []  # raised by the next create_text_channel calls, in order
+        self.on_create_category = None  # runs before create_category returns (gateway event)
+        self.created_categories = []
+
+    async def create_text_channel(self, name, category, overwrites):
+        if self.errors:
+            raise self.errors.pop(0)
+        category.channels.append(object())
+        return f"#{name} in {category.name}"
+
+    async def create_category(self, name):
+        category = FakeCategory(name)
+        self.categories.append(category)
+        self.created_categories.append(category)
+        if self.on_create_category is not None:
+            self.on_create_category(category)
+        return category
+
+
+def real_free(guild: FakeGuild) -> int:
+    return sum(CATEGORY_CAPACITY - len(c.channels) for c in guild.categories)
+
+
+def test_transient_error_releases_the_slot_and_raises():
+    async def main():
+        tickets = FakeCategory("Tickets", 3)
+        guild = FakeGuild(tickets)
+        pools = TicketCategories()
+        for error in (http_error(503, "upstream"), http_error(429, "rate limited"),
+                      http_error(400, {"code": 50035, "message": "Invalid Form Body",
+                                       "errors": {"name": {"_errors": [{"code": "BASE_TYPE_BAD_LENGTH",
+                                                                        "message": "Must be 100 or fewer."}]}}})):
+            guild.errors.append(error)
+            with pytest.raises(discord.HTTPException):
+                await pools.create_channel(guild, "ticket-x", {})
+            pool = pools.pool(guild)
+            assert pool.counts[tickets.id] == 3
+            assert pool.free == real_free(guild)
+        assert guild.created_categories == []
+    asyncio.run(main())
+
+
+def test_forbidden_releases_the_slot_and_raises():
+    async def main():
+        tickets = FakeCategory("Tickets", 3)
+        guild = FakeGuild(tickets)
+        pools = TicketCategories()
+        guild.errors.append(discord.Forbidden(FakeResponse(403), {"code": 50013, "message": "Missing Permissions"}))
+        with pytest.raises(discord.Forbidden):
+            await pools.create_channel(guild, "ticket-x", {})
+        assert pools.pool(guild).counts[tickets.id] == 3
+    asyncio.run(main())
+
+
+def test_full_category_is_skipped():
+    async def main():
+        tickets = FakeCategory("Tickets", 10)  # tracked as 10, but filled by hand since
+        guild = FakeGuild(tickets)
+        pools = TicketCategories()
+        pools.pool(guild)
+        tickets.channels = [object()] * CATEGORY_CAPACITY
+        guild.errors.append(category_full_error())
+        channel = await pools.create_channel(guild, "ticket-x", {})
+        assert channel == f"#ticket-x in {category_name(2)}"
+        pool = pools.pool(guild)
+        assert pool.counts[tickets.id] == CATEGORY_CAPACITY
+        assert pool.free == real_free(guild)
+    asyncio.run(main())
+
+
+def test_category_create_event_before_create_returns():
+    async def main():
+        guild = FakeGuild(FakeCategory("Tickets", CATEGORY_CAPACITY))
+        pools = TicketCategories()
+        # what on_guild_channel_create does for a category the pool does not know yet
+        guild.on_create_category = lambda category: pools.forget(guild.id)
+        channel = await pools.create_channel(guild, "ticket-x", {})
+        assert channel == f"#ticket-x in {category_name(2)}"
+        pool = pools.pool(guild)
+        assert len(pool.categories) == 2
+        assert pool.free == real_free(guild) == CATEGORY_CAPACITY - 1
+    asyncio.run(main())
+
+
+def test_add_is_idempotent():
+    guild = FakeGuild(FakeCategory("Tickets", 5))
+    pools = TicketCategories()
+    pool = pools.pool(guild)
+    pool.add(guild.categories[0], 1)
+    assert pool.counts[guild.categories[0].id] == 5
+    assert pool.free == CATEGORY_CAPACITY - 5
@@ -0,0 +1,159 @@
+"""ExpiryScheduler with thousands of simulated tickets, on a fake clock."""
+
+import asyncio
+import random
+import time
+
+from Core.ticket_expiry import ExpiryScheduler
+
+TICKETS = 5000
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def noop() -> None:
+    pass
+
+
+def scheduled(n: int = TICKETS, seed: int = 0):
+    """A scheduler holding ``n`` tickets with deadlines spread over two days."""
+    clock = FakeClock()
+    scheduler = ExpiryScheduler(clock)
+    rng = random.Random(seed)
+    deadlines = {}
+    for key in range(n):
+        deadlines[key] = clock.now + rng.uniform(0, 2 * 86400)
+        scheduler.schedule(key, deadlines[key], noop)
+    return scheduler, clock, deadlines
+
+
+def heap_size(scheduler: ExpiryScheduler) -> int:
+    return len(scheduler._heap)
+
+
+def test_pop_due_returns_exactly_the_expired_keys_in_deadline_order():
+    scheduler, clock, deadlines = scheduled()
+    assert len(scheduler) == TICKETS
+    fired = []
+    for hours in range(0, 49, 6):
+        clock.now = 1_000_000.0 + hours * 3600
+        due = [key for key, _ in scheduler.pop_due()]
+        assert all(deadlines[key] <= clock.now for key in due)
+        assert [deadlines[key] for key in due] == sorted(deadlines[key] for key in due)
+        fired += due
+        assert all(deadlines[key] > clock.now for key in range(TICKETS) if key in scheduler)
+    assert sorted(fired) == list(range(TICKETS))
+    assert len(scheduler) == 0
+    assert scheduler.next_deadline() is None
+
+
+def test_pop_due_returns_each_action():
+    clock = FakeClock()
+    scheduler = ExpiryScheduler(clock)
+    actions = {key: (lambda: noop()) for key in range(10)}
+    for key, action in actions.items():
+        scheduler.schedule(key, clock.now + key, action)
+    assert dict(scheduler.pop_due(clock.now + 100)) == actions
+
+
+def test_cancelled_tickets_never_fire():
+    scheduler, clock, deadlines = scheduled()
+    cancelled = set(range(0, TICKETS, 2))
+    for key in cancelled:
+        assert scheduler.cancel(key)
+    assert not scheduler.cancel(0)  # already cancelled
+    assert not scheduler.cancel(TICKETS + 1)  # never scheduled
+    assert len(scheduler) == TICKETS - len(cancelled)
+
+    due = {key for key, _ in scheduler.pop_due(clock.now + 3 * 86400)}
+    assert due == set(range(TICKETS)) - cancelled
+
+
+def test_reschedule_replaces_the_earlier_deadline():
+    scheduler, clock, deadlines = scheduled()
+    rng = random.Random(1)
+    moved = rng.sample(range(TICKETS), TICKETS // 5)
+    for key in moved:
+        deadlines[key] += rng.choice((-1, 1)) * rng.uniform(0, 86400)
+        scheduler.schedule(key, deadlines[key], noop)
+        assert scheduler.deadline(key) == deadlines[key]
+    assert len(scheduler) == TICKETS
+
+    fired = []
+    for hours in range(-24, 73, 3):
+        now = 1_000_000.0 + hours * 3600
+        due = [key for key, _ in scheduler.pop_due(now)]
+        assert all(deadlines[key] <= now for key in due)
+        fired += due
+    # every ticket fires once, at its latest deadline
+    assert sorted(fired) == list(range(TICKETS))
+
+
+def test_next_deadline_skips_cancelled_and_rescheduled_entries():
+    scheduler, clock, deadlines = scheduled()
+    order = sorted(deadlines, key=deadlines.get)
+    for key in order[:100]:
+        scheduler.cancel(key)
+    scheduler.schedule(order[100], deadlines[order[100]] + 86400 * 10, noop)
+    assert scheduler.next_deadline() == deadlines[order[101]]
+
+
+def test_compaction_bounds_the_heap():
+    scheduler, clock, deadlines = scheduled()
+    for key in range(TICKETS - 100):
+        scheduler.cancel(key)
+        assert heap_size(scheduler) <= 2 * len(scheduler) + 64
+    assert heap_size(scheduler) <= 2 * 100 + 64
+    due = {key for key, _ in scheduler.pop_due(clock.now + 3 * 86400)}
+    assert due == set(range(TICKETS - 100, TICKETS))
+
+    # repeated reschedules of the same tickets do not grow the heap either
+    scheduler, clock, deadlines = scheduled(500)
+    for rounds in range(20):
+        for key in range(500):
+            scheduler.schedule(key, deadlines[key] + rounds, noop)
+    assert heap_size(scheduler) <= 2 * 500 + 64
+    assert len(scheduler) == 500
+
+
+def test_clear_drops_everything():
+    scheduler, clock, _ = scheduled(100)
+    scheduler.clear()
+    assert len(scheduler) == 0
+    assert scheduler.pop_due(clock.now + 3 * 86400) == []
+
+
+def test_runner_fires_due_actions_and_skips_cancelled():
+    async def main():
+        scheduler = ExpiryScheduler()
+        fired = []
+        done = asyncio.Event()
+        count = 2000
+
+        def action(key):
+            async def run():
+                fired.append(key)
+                if len(fired) == count // 2:
+                    done.set()
+            return run
+
+        now = time.time()
+        for key in range(count):
+            scheduler.schedule(key, now + (key % 50) / 1000, action(key))
+        for key in range(1, count, 2):
+            scheduler.cancel(key)
+        try:
+            await asyncio.wait_for(done.wait(), 5)
+            await asyncio.sleep(0.1)  # nothing cancelled fires late
+        finally:
+            scheduler.stop()
+        return fired
+
+    fired = asyncio.run(main())
+    assert sorted(fired) == list(range(0, 2000, 2))